@@ -57,6 +57,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'orders.context_processors.guest_cart',
             ],
         },
     },
@@ -68,6 +69,11 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Concurrent writers wait for the lock instead of failing at once
+        'OPTIONS': {'timeout': 20},
+        # A file rather than shared-cache memory, so tests can run
+        # concurrent checkouts on separate connections
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 INTERNAL_IPS = [
@@ -117,6 +123,47 @@ DEFAULT_FROM_EMAIL = env.str('DEFAULT_FROM_EMAIL', 'noreply@bricky.com')
 # Token Configuration - 24 hours in seconds (86400 seconds)
 PASSWORD_RESET_TIMEOUT = env.int('PASSWORD_RESET_TIMEOUT', 86400)
 
+# Checkout stock reservations - 15 minutes in seconds
+STOCK_RESERVATION_TTL = env.int('STOCK_RESERVATION_TTL', 900)
+
+# Idempotency keys for order placement and cart actions - 24 hours in seconds
+IDEMPOTENCY_KEY_TTL = env.int('IDEMPOTENCY_KEY_TTL', 86400)
+
+# Shipping rates - seconds between checks for a newly published rate table
+SHIPPING_RATES_CHECK_INTERVAL = env.int('SHIPPING_RATES_CHECK_INTERVAL', 60)
+SHIPPING_DOMESTIC_COUNTRIES = env.list('SHIPPING_DOMESTIC_COUNTRIES', ['tr', 'turkey', 'türkiye', 'turkiye'])
+
+# Background jobs - run inline instead of queueing when JOBS_RUN_SYNC is set
+JOBS_RUN_SYNC = env.bool('JOBS_RUN_SYNC', False)
+JOB_MAX_ATTEMPTS = env.int('JOB_MAX_ATTEMPTS', 5)
+JOB_RETRY_BACKOFF = env.int('JOB_RETRY_BACKOFF', 30)  # seconds, doubled per attempt
+JOB_LOCK_TIMEOUT = env.int('JOB_LOCK_TIMEOUT', 600)  # seconds before a running job is considered lost
+JOB_REQUEUE_INTERVAL = env.int('JOB_REQUEUE_INTERVAL', 60)  # seconds between sweeps for lost jobs and emails
+
+# Email outbox - send attempts before dead-lettering, seconds an idle SMTP connection is kept open
+EMAIL_OUTBOX_MAX_ATTEMPTS = env.int('EMAIL_OUTBOX_MAX_ATTEMPTS', 8)
+EMAIL_OUTBOX_IDLE_TIMEOUT = env.int('EMAIL_OUTBOX_IDLE_TIMEOUT', 30)
+
+# Newsletter campaigns - default emails per second and subscribers per checkpointed chunk
+NEWSLETTER_SEND_RATE = env.int('NEWSLETTER_SEND_RATE', 20)
+NEWSLETTER_CHUNK_SIZE = env.int('NEWSLETTER_CHUNK_SIZE', 500)
+
+# Sales rollups - seconds of order events re-read by each refresh, longer than any transaction writing them
+ROLLUP_REFRESH_LAG = env.int('ROLLUP_REFRESH_LAG', 300)
+
+# Order archive - completed orders older than this many days move to the archive tables
+ORDER_ARCHIVE_AFTER_DAYS = env.int('ORDER_ARCHIVE_AFTER_DAYS', 365)
+
+# Cart sweeper - empty carts kept this many seconds, untouched carts this many days
+EMPTY_CART_GRACE = env.int('EMPTY_CART_GRACE', 3600)
+CART_ABANDONED_AFTER_DAYS = env.int('CART_ABANDONED_AFTER_DAYS', 30)
+
+# Restock forecasting - demand half-life, supplier lead time and stock to cover after it, in days
+RESTOCK_HALF_LIFE_DAYS = env.int('RESTOCK_HALF_LIFE_DAYS', 28)
+RESTOCK_LEAD_TIME_DAYS = env.int('RESTOCK_LEAD_TIME_DAYS', 14)
+RESTOCK_COVER_DAYS = env.int('RESTOCK_COVER_DAYS', 30)
+RESTOCK_HISTORY_DAYS = env.int('RESTOCK_HISTORY_DAYS', 730)
+
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_DIRS = [
@@ -1,6 +1,8 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import ContactMessage, HelpCategory, HelpArticle
+from .jobs import retry_failed_jobs
+from .models import ContactMessage, HelpCategory, HelpArticle, Job, EmailOutbox
+from .outbox import retry_failed_emails
 
 
 @admin.register(ContactMessage)
@@ -55,3 +57,70 @@ class ContactMessageAdmin(admin.ModelAdmin):
     
     ordering = ('-created_at',)
 
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """
+    Admin interface for Job model
+    """
+    list_display = ('name', 'status_badge', 'attempts', 'max_attempts', 'run_at', 'created_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'last_error')
+    readonly_fields = ('attempts', 'locked_by', 'locked_at', 'last_error', 'created_at')
+    actions = ['retry_jobs']
+
+    def status_badge(self, obj):
+        """Display status as colored badge"""
+        status_colors = {
+            'queued': '#17a2b8',
+            'running': '#ffc107',
+            'failed': '#dc3545',
+        }
+        color = status_colors.get(obj.status, '#6c757d')
+        return format_html(
+            '<span style="background-color: {}; color: white; padding: 5px 10px; border-radius: 3px; font-weight: bold;">{}</span>',
+            color,
+            obj.get_status_display()
+        )
+    status_badge.short_description = 'Status'
+
+    def retry_jobs(self, request, queryset):
+        retried = retry_failed_jobs(queryset)
+        self.message_user(request, f'{retried} failed jobs queued again')
+    retry_jobs.short_description = 'Retry selected failed jobs'
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    """
+    Admin interface for EmailOutbox model
+    """
+    list_display = ('subject', 'recipients', 'status_badge', 'attempts', 'max_attempts', 'run_at', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('subject', 'last_error')
+    readonly_fields = ('attempts', 'locked_by', 'locked_at', 'last_error', 'created_at')
+    actions = ['retry_emails']
+
+    def recipients(self, obj):
+        return ', '.join(obj.to)
+    recipients.short_description = 'To'
+
+    def status_badge(self, obj):
+        """Display status as colored badge"""
+        status_colors = {
+            'queued': '#17a2b8',
+            'sending': '#ffc107',
+            'failed': '#dc3545',
+        }
+        color = status_colors.get(obj.status, '#6c757d')
+        return format_html(
+            '<span style="background-color: {}; color: white; padding: 5px 10px; border-radius: 3px; font-weight: bold;">{}</span>',
+            color,
+            obj.get_status_display()
+        )
+    status_badge.short_description = 'Status'
+
+    def retry_emails(self, request, queryset):
+        retried = retry_failed_emails(queryset)
+        self.message_user(request, f'{retried} failed emails queued again')
+    retry_emails.short_description = 'Retry selected failed emails'
@@ -0,0 +1,127 @@
+"""Compiled email templates.
+
+An email template is rendered once per (template, fields, language)
+with a placeholder standing in for every per-recipient field, and the
+result is split into static fragments. Rendering a message afterwards
+only joins those fragments with the recipient's values, producing the
+HTML part and the plain-text part in the same pass. Tags, filters,
+``{% url %}``, ``{% static %}`` and translations are evaluated once.
+
+Per-recipient values are output as-is, so templates must use them as
+plain ``{{ field }}`` variables (no filters, tags or attribute lookups
+on them); compute anything derived before rendering.
+
+Usage:
+    text, html = render_email('users/email/verify.html', {'verify_url': url})
+
+    template = EmailTemplate('notifications/email/campaign.html', ('email', 'unsubscribe_url'), 'en', {'content': html})
+    for text, html in template.render_many(rows):
+        ...
+"""
+import html as html_lib
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.dispatch import receiver
+from django.template.loader import render_to_string
+from django.utils import translation
+from django.utils.autoreload import file_changed
+from django.utils.html import conditional_escape
+
+OPEN, CLOSE = '\ue000', '\ue001'  # private-use characters, never escaped
+FIELD_RE = re.compile(f'{OPEN}(\\w+){CLOSE}')
+
+# Plain-text conversion
+DROP_RE = re.compile(r'<(head|style|script)\b.*?</\1\s*>', re.S | re.I)
+LINK_RE = re.compile(r'<a\b[^>]*?href="([^"]*)"[^>]*>(.*?)</a\s*>', re.S | re.I)
+BREAK_RE = re.compile(r'<br\s*/?>|</(p|div|h[1-6]|li|tr|table)\s*>', re.I)
+TAG_RE = re.compile(r'<[^>]+>')
+SPACE_RE = re.compile(r'[ \t\r\f\v]+')
+
+
+def html_to_text(html):
+    """Plain-text version of an HTML email; links become ``text (url)``."""
+    def link(match):
+        url, text = match.group(1), TAG_RE.sub('', match.group(2)).strip()
+        return text if not text or text == url else f'{text} ({url})'
+
+    text = DROP_RE.sub('', html)
+    text = LINK_RE.sub(link, text)
+    text = BREAK_RE.sub('\n', text)
+    text = html_lib.unescape(TAG_RE.sub('', text))
+    lines = [SPACE_RE.sub(' ', line).strip() for line in text.split('\n')]
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip() + '\n'
+
+
+class EmailTemplate:
+    """A template pre-rendered into static fragments and field slots."""
+
+    def __init__(self, template_name, fields, language, context=None):
+        """
+        Args:
+            template_name: template path
+            fields: names of the per-recipient fields
+            language: language code the template is rendered in
+            context: values shared by every message, evaluated normally
+        """
+        self.template_name = template_name
+        self.fields = tuple(fields)
+        self.language = language
+        placeholders = {field: f'{OPEN}{field}{CLOSE}' for field in self.fields}
+        with translation.override(language):
+            skeleton = render_to_string(template_name, {**(context or {}), **placeholders})
+        self.html_parts = FIELD_RE.split(skeleton)
+        self.text_parts = FIELD_RE.split(html_to_text(skeleton))
+
+    @staticmethod
+    def _join(parts, values, escape):
+        # split() alternates static text and field names
+        return ''.join(
+            part if i % 2 == 0 else (conditional_escape(values[part]) if escape else str(values[part]))
+            for i, part in enumerate(parts)
+        )
+
+    def render(self, values):
+        """Render one message.
+
+        Args:
+            values: dict with a value for every field
+
+        Returns:
+            tuple: (text, html)
+        """
+        return self._join(self.text_parts, values, False), self._join(self.html_parts, values, True)
+
+    def render_many(self, rows):
+        """Render a message per values dict, lazily."""
+        for values in rows:
+            yield self.render(values)
+
+
+@lru_cache(maxsize=256)
+def compiled_template(template_name, fields, language=None):
+    """Cached ``EmailTemplate`` for a template, its field names and a language."""
+    return EmailTemplate(template_name, fields, language or settings.LANGUAGE_CODE)
+
+
+def render_email(template_name, context, language=None):
+    """Render an email template with per-recipient ``context``.
+
+    Args:
+        template_name: template path
+        context: field values; every key is a per-recipient field
+        language: language code, the active language by default
+
+    Returns:
+        tuple: (text, html)
+    """
+    template = compiled_template(template_name, tuple(sorted(context)), language or translation.get_language())
+    return template.render(context)
+
+
+@receiver(file_changed, dispatch_uid='core.emails.template_changed')
+def template_changed(sender, file_path, **kwargs):
+    """Drop compiled templates when the dev server sees a template change."""
+    if file_path.suffix == '.html':
+        compiled_template.cache_clear()
@@ -0,0 +1,166 @@
+"""Database-backed background jobs.
+
+Slow side effects (mostly email) are queued as ``core.models.Job`` rows
+and executed by ``manage.py run_workers``; no external broker is needed.
+
+Usage:
+    @job()
+    def send_welcome(user_id):
+        ...
+
+    send_welcome.delay(user.pk)
+
+Arguments must be JSON-serializable. A job enqueued inside a
+transaction is only visible to workers once it commits, and disappears
+if it rolls back.
+"""
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.models import Job
+
+logger = logging.getLogger(__name__)
+
+
+# ===== Enqueueing =====
+
+def job(max_attempts=None):
+    """Register a function as a background job.
+
+    Adds ``func.delay(*args, **kwargs)`` which queues the call and
+    returns the Job row. With ``JOBS_RUN_SYNC`` enabled the call runs
+    immediately instead, which is handy in development.
+    """
+    def decorator(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+
+        def delay(*args, run_at=None, **kwargs):
+            if settings.JOBS_RUN_SYNC:
+                func(*args, **kwargs)
+                return None
+            return Job.objects.create(
+                name=name,
+                args=list(args),
+                kwargs=kwargs,
+                max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+                run_at=run_at or timezone.now(),
+            )
+
+        func.delay = delay
+        func.job_name = name
+        return func
+    return decorator
+
+
+# ===== Claiming =====
+
+def claim_jobs(limit):
+    """Claim up to ``limit`` due jobs for this worker.
+
+    Candidates are picked without locks, then taken with one UPDATE
+    that only matches rows still queued. Rows grabbed by another worker
+    in between are skipped, so no job runs twice.
+
+    Returns:
+        list: claimed Job instances
+    """
+    now = timezone.now()
+    candidates = list(
+        Job.objects.filter(status=Job.StatusChoice.QUEUED, run_at__lte=now)
+        .order_by('run_at')
+        .values_list('pk', flat=True)[:limit]
+    )
+    if not candidates:
+        return []
+
+    token = uuid.uuid4().hex
+    Job.objects.filter(pk__in=candidates, status=Job.StatusChoice.QUEUED).update(
+        status=Job.StatusChoice.RUNNING,
+        locked_by=token,
+        locked_at=now,
+        attempts=F('attempts') + 1,
+    )
+    return list(Job.objects.filter(locked_by=token, status=Job.StatusChoice.RUNNING))
+
+
+def requeue_stale_jobs():
+    """Requeue running jobs whose worker died (locked past ``JOB_LOCK_TIMEOUT``).
+
+    Returns:
+        int: number of jobs requeued
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    return Job.objects.filter(status=Job.StatusChoice.RUNNING, locked_at__lt=cutoff).update(
+        status=Job.StatusChoice.QUEUED,
+        locked_by='',
+        locked_at=None,
+    )
+
+
+# ===== Execution =====
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2x base, 4x base... capped at one day."""
+    return min(settings.JOB_RETRY_BACKOFF * 2 ** (attempts - 1), 86400)
+
+
+def run_job(job):
+    """Run a claimed job, then delete it or schedule a retry.
+
+    Returns:
+        bool: True if the job succeeded
+    """
+    try:
+        import_string(job.name)(*job.args, **job.kwargs)
+    except Exception as e:
+        logger.error(f'Job {job.pk} {job.name} failed: {e}', exc_info=True)
+        if job.attempts >= job.max_attempts:
+            changes = {'status': Job.StatusChoice.FAILED}
+        else:
+            changes = {
+                'status': Job.StatusChoice.QUEUED,
+                'run_at': timezone.now() + timedelta(seconds=retry_delay(job.attempts)),
+            }
+        Job.objects.filter(pk=job.pk).update(locked_by='', locked_at=None, last_error=repr(e), **changes)
+        return False
+    Job.objects.filter(pk=job.pk).delete()
+    return True
+
+
+def work(stop_event, batch_size=10, poll_interval=1.0, burst=False):
+    """Worker loop: claim and run jobs until ``stop_event`` is set.
+
+    Args:
+        stop_event: threading or multiprocessing Event
+        batch_size: jobs claimed per UPDATE
+        poll_interval: seconds to sleep when the queue is empty
+        burst: return as soon as the queue is empty
+    """
+    try:
+        while not stop_event.is_set():
+            close_old_connections()
+            jobs = claim_jobs(batch_size)
+            for claimed in jobs:
+                run_job(claimed)
+            if not jobs:
+                if burst:
+                    return
+                stop_event.wait(poll_interval)
+    finally:
+        connections.close_all()
+
+
+def retry_failed_jobs(jobs):
+    """Put failed jobs back in the queue with a fresh attempt budget."""
+    return jobs.filter(status=Job.StatusChoice.FAILED).update(
+        status=Job.StatusChoice.QUEUED,
+        attempts=0,
+        run_at=timezone.now(),
+    )
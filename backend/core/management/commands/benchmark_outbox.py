@@ -0,0 +1,89 @@
+"""Measure outbox throughput against the local SMTP sink.
+
+Queues ``--count`` test emails, drains them through a sink started on a
+free port and compares with sending the same number of messages over
+one connection each, the way ``send_mail`` does. The test emails are
+removed afterwards.
+
+    python manage.py benchmark_outbox --count 2000 --connect-delay 0.05
+"""
+import threading
+import time
+
+from django.core.mail import send_mail
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from core.models import EmailOutbox
+from core.outbox import drain
+from core.smtp_sink import SMTPSink
+
+
+class Command(BaseCommand):
+    help = 'Benchmark outbox sending against a local SMTP sink'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--connect-delay', type=float, default=0.0,
+                            help='Seconds the sink stalls each new connection')
+        parser.add_argument('--baseline', type=int, default=100,
+                            help='Messages sent one connection each for comparison (0 to skip)')
+
+    def handle(self, *args, **options):
+        count = options['count']
+        sink = SMTPSink(port=0, connect_delay=options['connect_delay']).start()
+        smtp = {
+            'EMAIL_BACKEND': 'django.core.mail.backends.smtp.EmailBackend',
+            'EMAIL_HOST': '127.0.0.1',
+            'EMAIL_PORT': sink.port,
+            'EMAIL_USE_TLS': False,
+            'EMAIL_USE_SSL': False,
+            'EMAIL_HOST_USER': '',
+            'EMAIL_HOST_PASSWORD': '',
+            'JOBS_RUN_SYNC': False,
+        }
+        first_pk = (EmailOutbox.objects.order_by('-pk').values_list('pk', flat=True).first() or 0) + 1
+        try:
+            with override_settings(**smtp):
+                started = time.monotonic()
+                EmailOutbox.objects.bulk_create(
+                    [
+                        EmailOutbox(subject=f'Benchmark {i}', body='Benchmark', to=[f'benchmark{i}@example.com'])
+                        for i in range(count)
+                    ],
+                    batch_size=1000,
+                )
+                queued = time.monotonic() - started
+                self.stdout.write(f'Queued {count} emails in {queued:.2f}s ({queued / count * 1e6:.0f}us each)')
+
+                stop_event = threading.Event()
+                workers = [
+                    threading.Thread(target=drain, args=(stop_event, options['batch_size'], 0.1, True))
+                    for _ in range(options['workers'])
+                ]
+                started = time.monotonic()
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+                elapsed = time.monotonic() - started
+                self.stdout.write(self.style.SUCCESS(
+                    f'Outbox: {sink.messages} messages over {sink.connections} connections '
+                    f'in {elapsed:.2f}s ({sink.messages / elapsed:.0f}/s)'
+                ))
+
+                if options['baseline']:
+                    delivered, connected = sink.messages, sink.connections
+                    started = time.monotonic()
+                    for i in range(options['baseline']):
+                        send_mail(f'Baseline {i}', 'Baseline', None, [f'baseline{i}@example.com'])
+                    elapsed = time.monotonic() - started
+                    self.stdout.write(
+                        f'send_mail: {sink.messages - delivered} messages over {sink.connections - connected} '
+                        f'connections in {elapsed:.2f}s ({options["baseline"] / elapsed:.0f}/s)'
+                    )
+        finally:
+            EmailOutbox.objects.filter(pk__gte=first_pk, subject__startswith='Benchmark ').delete()
+            sink.stop()
@@ -0,0 +1,80 @@
+"""Run background job workers.
+
+Starts a pool of worker threads (or processes with ``--processes``)
+that claim jobs from the ``core.models.Job`` table. While they run, jobs
+of dead workers are requeued every ``JOB_REQUEUE_INTERVAL`` seconds.
+Stops gracefully on SIGINT/SIGTERM after the jobs in hand finish.
+"""
+import multiprocessing
+import signal
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.jobs import requeue_stale_jobs, work
+
+
+class Command(BaseCommand):
+    help = 'Process queued background jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Number of concurrent workers')
+        parser.add_argument('--processes', action='store_true',
+                            help='Run workers as processes instead of threads')
+        parser.add_argument('--batch-size', type=int, default=10,
+                            help='Jobs claimed by a worker at once')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait when the queue is empty')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once the queue is empty')
+
+    def requeue_stale(self):
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} stale jobs')
+
+    def handle(self, *args, **options):
+        self.requeue_stale()
+
+        if options['processes']:
+            # Forked children must not share the parent's connection
+            connections.close_all()
+            stop_event = multiprocessing.Event()
+            worker_class = multiprocessing.Process
+        else:
+            stop_event = threading.Event()
+            worker_class = threading.Thread
+
+        def stop(signum, frame):
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+
+        workers = [
+            worker_class(
+                target=work,
+                args=(stop_event, options['batch_size'], options['poll_interval'], options['burst']),
+                daemon=True,
+            )
+            for _ in range(options['workers'])
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(self.style.SUCCESS(
+            f"Started {len(workers)} {'process' if options['processes'] else 'thread'} workers"
+        ))
+
+        next_requeue = time.monotonic() + settings.JOB_REQUEUE_INTERVAL
+        while any(worker.is_alive() for worker in workers):
+            # Short joins keep the main thread responsive to signals
+            for worker in workers:
+                worker.join(timeout=0.5)
+            if time.monotonic() >= next_requeue:
+                self.requeue_stale()
+                next_requeue = time.monotonic() + settings.JOB_REQUEUE_INTERVAL
+        self.stdout.write('Workers stopped')
@@ -0,0 +1,72 @@
+"""Send queued emails from the outbox.
+
+Starts sender threads that each keep one SMTP connection open and
+drain ``core.models.EmailOutbox`` in batches. While they run, emails of
+dead senders are requeued every ``JOB_REQUEUE_INTERVAL`` seconds. Stops
+gracefully on SIGINT/SIGTERM after the batch in hand is sent.
+"""
+import signal
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.outbox import drain, requeue_stale_emails
+
+
+class Command(BaseCommand):
+    help = 'Send queued emails over reused SMTP connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2,
+                            help='Number of concurrent senders (one SMTP connection each)')
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='Emails claimed by a sender at once')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait when the outbox is empty')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once the outbox is empty')
+
+    def requeue_stale(self):
+        requeued = requeue_stale_emails()
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} stale emails')
+
+    def handle(self, *args, **options):
+        self.requeue_stale()
+
+        stop_event = threading.Event()
+
+        def stop(signum, frame):
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+
+        sent = []
+        workers = [
+            threading.Thread(
+                target=lambda: sent.append(
+                    drain(stop_event, options['batch_size'], options['poll_interval'], options['burst'])
+                ),
+                daemon=True,
+            )
+            for _ in range(options['workers'])
+        ]
+        started = time.monotonic()
+        for worker in workers:
+            worker.start()
+        self.stdout.write(self.style.SUCCESS(f'Started {len(workers)} senders'))
+
+        next_requeue = started + settings.JOB_REQUEUE_INTERVAL
+        while any(worker.is_alive() for worker in workers):
+            # Short joins keep the main thread responsive to signals
+            for worker in workers:
+                worker.join(timeout=0.5)
+            if time.monotonic() >= next_requeue:
+                self.requeue_stale()
+                next_requeue = time.monotonic() + settings.JOB_REQUEUE_INTERVAL
+        elapsed = time.monotonic() - started
+        total = sum(sent)
+        self.stdout.write(f'Sent {total} emails in {elapsed:.1f}s ({total / elapsed:.0f}/s)')
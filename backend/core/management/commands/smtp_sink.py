@@ -0,0 +1,39 @@
+"""Run a local SMTP server that accepts and discards mail.
+
+Point the SMTP backend at it for development or load tests:
+
+    python manage.py smtp_sink --port 1025 --connect-delay 0.2
+    EMAIL_BACKEND=django.core.mail.backends.smtp.EmailBackend EMAIL_HOST=127.0.0.1 \
+        EMAIL_PORT=1025 EMAIL_USE_TLS=false python manage.py send_outbox --burst
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.smtp_sink import SMTPSink
+
+
+class Command(BaseCommand):
+    help = 'Run a local SMTP sink that counts and discards messages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=1025)
+        parser.add_argument('--connect-delay', type=float, default=0.0,
+                            help='Seconds to stall each new connection, simulating TLS and login')
+
+    def handle(self, *args, **options):
+        sink = SMTPSink(options['host'], options['port'], options['connect_delay']).start()
+        self.stdout.write(self.style.SUCCESS(f"SMTP sink listening on {options['host']}:{sink.port}"))
+        reported = 0
+        try:
+            while True:
+                time.sleep(5)
+                if sink.messages != reported:
+                    reported = sink.messages
+                    self.stdout.write(f'{sink.messages} messages over {sink.connections} connections')
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sink.stop()
+        self.stdout.write(f'{sink.messages} messages over {sink.connections} connections')
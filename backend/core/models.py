@@ -3,9 +3,12 @@
 Contains models for:
 - Contact messages from visitors
 - Help/FAQ system with categories and articles
+- Background job queue
+- Outgoing email outbox
 """
 import uuid
 from django.db import models
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
@@ -115,3 +118,81 @@ class HelpArticle(models.Model):
             models.Index(fields=['is_active']),
             models.Index(fields=['category']),
         ]
+
+
+class Job(models.Model):
+    """Model for a queued call to a background job function.
+
+    The table is the queue: workers claim queued rows with a conditional
+    UPDATE, run them and delete them on success. Failed attempts are
+    rescheduled with exponential backoff until ``max_attempts`` is
+    reached, then kept with status Failed for inspection.
+    """
+    class StatusChoice(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        FAILED = "failed", "Failed"
+
+    name = models.CharField(max_length=255, help_text='Dotted path of the job function')
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=StatusChoice.choices, default=StatusChoice.QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.get_status_display()})"
+
+    class Meta:
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
+        ordering = ['run_at']
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+        ]
+
+
+class EmailOutbox(models.Model):
+    """Model for an email waiting to be sent.
+
+    Requests only insert a row; ``core.outbox`` workers claim rows the
+    same way job workers do and send them over one long-lived SMTP
+    connection per worker. Sent rows are deleted. Failed sends are
+    retried with exponential backoff and dead-lettered (status Failed)
+    after ``max_attempts`` or on a permanent (5xx) SMTP rejection.
+    """
+    class StatusChoice(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        SENDING = "sending", "Sending"
+        FAILED = "failed", "Failed"
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255, blank=True, help_text='Empty for DEFAULT_FROM_EMAIL')
+    to = models.JSONField(default=list)
+    headers = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=StatusChoice.choices, default=StatusChoice.QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=8)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"{self.subject} -> {', '.join(self.to)}"
+
+    class Meta:
+        verbose_name = 'Outgoing Email'
+        verbose_name_plural = 'Email Outbox'
+        ordering = ['run_at']
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+        ]
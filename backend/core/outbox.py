@@ -0,0 +1,251 @@
+"""Database-backed email outbox.
+
+``queue_email`` stores a message as a ``core.models.EmailOutbox`` row,
+which costs one INSERT in the request. ``manage.py send_outbox`` runs
+senders that claim rows in batches and push them through one SMTP
+connection per sender, kept open while mail keeps coming, instead of a
+connect/TLS/login round trip per message.
+
+Usage:
+    queue_email('Welcome', html, [user.email], html_message=html)
+
+Like jobs, an email queued inside a transaction is only sent once the
+transaction commits.
+"""
+import logging
+import smtplib
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import close_old_connections, connections
+from django.db.models import F
+from django.utils import timezone
+
+from core.jobs import retry_delay
+from core.models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+# The server answered with an error reply; the connection is still usable
+SMTP_REJECTIONS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException)
+
+
+def is_permanent(error):
+    """True for 5xx SMTP rejections, which retrying will not fix.
+
+    4xx replies (greylisting, mailbox full, rate limits) are temporary
+    and should be retried. A refused recipient list is permanent only if
+    every recipient got a 5xx.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return bool(error.recipients) and all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, (smtplib.SMTPSenderRefused, smtplib.SMTPDataError)):
+        return error.smtp_code >= 500
+    return False
+
+
+# ===== Queueing =====
+
+def queue_email(subject, message, recipient_list, html_message=None, from_email=None, headers=None):
+    """Queue an email; arguments mirror ``django.core.mail.send_mail``.
+
+    With ``JOBS_RUN_SYNC`` enabled the email is sent immediately instead.
+
+    Returns:
+        EmailOutbox: the queued row
+    """
+    email = EmailOutbox.objects.create(
+        subject=subject,
+        body=message,
+        html_body=html_message or '',
+        from_email=from_email or '',
+        to=list(recipient_list),
+        headers=headers or {},
+        max_attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    )
+    if settings.JOBS_RUN_SYNC:
+        sender = Sender()
+        try:
+            sender.send(claim_emails(1, pks=[email.pk]))
+        finally:
+            sender.close()
+    return email
+
+
+def build_message(email, connection=None):
+    """Turn an outbox row into an ``EmailMultiAlternatives``."""
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email or None,
+        to=email.to,
+        headers=email.headers,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+# ===== Claiming =====
+
+def claim_emails(limit, pks=None):
+    """Claim up to ``limit`` due emails, like ``core.jobs.claim_jobs``.
+
+    Returns:
+        list: claimed EmailOutbox instances, oldest first
+    """
+    now = timezone.now()
+    candidates = EmailOutbox.objects.filter(status=EmailOutbox.StatusChoice.QUEUED, run_at__lte=now)
+    if pks is not None:
+        candidates = candidates.filter(pk__in=pks)
+    candidates = list(candidates.order_by('run_at').values_list('pk', flat=True)[:limit])
+    if not candidates:
+        return []
+
+    token = uuid.uuid4().hex
+    EmailOutbox.objects.filter(pk__in=candidates, status=EmailOutbox.StatusChoice.QUEUED).update(
+        status=EmailOutbox.StatusChoice.SENDING,
+        locked_by=token,
+        locked_at=now,
+        attempts=F('attempts') + 1,
+    )
+    return list(EmailOutbox.objects.filter(locked_by=token, status=EmailOutbox.StatusChoice.SENDING).order_by('run_at'))
+
+
+def requeue_stale_emails():
+    """Requeue emails whose sender died (locked past ``JOB_LOCK_TIMEOUT``).
+
+    Returns:
+        int: number of emails requeued
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    return EmailOutbox.objects.filter(status=EmailOutbox.StatusChoice.SENDING, locked_at__lt=cutoff).update(
+        status=EmailOutbox.StatusChoice.QUEUED,
+        locked_by='',
+        locked_at=None,
+    )
+
+
+def retry_failed_emails(emails):
+    """Put dead-lettered emails back in the queue with a fresh attempt budget."""
+    return emails.filter(status=EmailOutbox.StatusChoice.FAILED).update(
+        status=EmailOutbox.StatusChoice.QUEUED,
+        attempts=0,
+        run_at=timezone.now(),
+    )
+
+
+# ===== Sending =====
+
+class Sender:
+    """Sends claimed emails over a single reusable mail connection.
+
+    The connection is opened on first use and kept until ``close()`` or
+    until it has been idle for ``EMAIL_OUTBOX_IDLE_TIMEOUT`` seconds. A
+    connection the server dropped is reopened once per message.
+    """
+
+    def __init__(self):
+        self.connection = None
+        self.last_used = 0.0
+
+    def open(self):
+        if self.connection is None:
+            self.connection = get_connection(fail_silently=False)
+            self.connection.open()
+        self.last_used = time.monotonic()
+        return self.connection
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
+
+    def close_if_idle(self):
+        if self.connection is not None and time.monotonic() - self.last_used > settings.EMAIL_OUTBOX_IDLE_TIMEOUT:
+            self.close()
+
+    def deliver(self, message):
+        """Send one ``EmailMessage`` over the shared connection."""
+        try:
+            return self.open().send_messages([message])
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            return self.open().send_messages([message])
+
+    def send(self, emails):
+        """Send claimed emails, then delete them or schedule retries.
+
+        Returns:
+            int: number of emails sent
+        """
+        sent, retries, dead = [], {}, {}
+        for email in emails:
+            try:
+                self.deliver(build_message(email))
+            except Exception as e:
+                logger.warning(f'Email {email.pk} to {email.to} failed: {e!r}')
+                if is_permanent(e) or email.attempts >= email.max_attempts:
+                    dead[email.pk] = repr(e)
+                else:
+                    retries[email.pk] = (email.attempts, repr(e))
+                if not isinstance(e, SMTP_REJECTIONS):
+                    # Connection state is unknown after a transport error
+                    self.close()
+            else:
+                sent.append(email.pk)
+
+        if sent:
+            EmailOutbox.objects.filter(pk__in=sent).delete()
+        now = timezone.now()
+        for pk, (attempts, error) in retries.items():
+            EmailOutbox.objects.filter(pk=pk).update(
+                status=EmailOutbox.StatusChoice.QUEUED,
+                run_at=now + timedelta(seconds=retry_delay(attempts)),
+                locked_by='', locked_at=None, last_error=error,
+            )
+        for pk, error in dead.items():
+            logger.error(f'Email {pk} dead-lettered: {error}')
+            EmailOutbox.objects.filter(pk=pk).update(
+                status=EmailOutbox.StatusChoice.FAILED,
+                locked_by='', locked_at=None, last_error=error,
+            )
+        return len(sent)
+
+
+def drain(stop_event, batch_size=50, poll_interval=1.0, burst=False):
+    """Sender loop: claim and send emails until ``stop_event`` is set.
+
+    Args:
+        stop_event: threading or multiprocessing Event
+        batch_size: emails claimed per UPDATE
+        poll_interval: seconds to sleep when the outbox is empty
+        burst: return as soon as the outbox is empty
+
+    Returns:
+        int: number of emails sent
+    """
+    sender = Sender()
+    total = 0
+    try:
+        while not stop_event.is_set():
+            close_old_connections()
+            emails = claim_emails(batch_size)
+            if emails:
+                total += sender.send(emails)
+                continue
+            if burst:
+                break
+            sender.close_if_idle()
+            stop_event.wait(poll_interval)
+    finally:
+        sender.close()
+        connections.close_all()
+    return total
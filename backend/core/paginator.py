@@ -0,0 +1,29 @@
+"""Paginator for admin changelists over very large tables."""
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that avoids a full COUNT(*) on huge unfiltered tables.
+
+    On PostgreSQL the planner's row estimate is used when the changelist
+    is unfiltered and the table holds more than ``EXACT_COUNT_LIMIT``
+    rows. Filtered lists and other databases get an exact count.
+    """
+    EXACT_COUNT_LIMIT = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row and row[0] > self.EXACT_COUNT_LIMIT:
+                return row[0]
+        return super().count
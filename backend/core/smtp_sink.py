@@ -0,0 +1,103 @@
+"""Local SMTP stand-in for development, tests and benchmarks.
+
+Speaks just enough SMTP for ``smtplib`` (and so Django's SMTP backend)
+to deliver mail, then throws the messages away and counts them.
+``connect_delay`` simulates the cost of a real connection (TCP + TLS
+handshake + AUTH), which is what the outbox saves by reusing
+connections. Recipients starting with ``bounce`` are refused with a
+550 to exercise dead-lettering, and those starting with ``greylist``
+with a temporary 451 to exercise retries.
+
+Usage:
+    sink = SMTPSink(port=1025, connect_delay=0.2)
+    sink.start()            # background thread
+    ...
+    sink.stop()
+    sink.messages, sink.connections
+"""
+import socketserver
+import threading
+import time
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """One SMTP session."""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        sink = self.server
+        sink.count('connections')
+        time.sleep(sink.connect_delay)
+        self.reply('220 bricky-sink ESMTP')
+        recipients = 0
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('latin-1').strip()
+            verb = command[:4].upper()
+            if verb in ('EHLO', 'HELO'):
+                self.reply('250-bricky-sink' if verb == 'EHLO' else '250 bricky-sink')
+                if verb == 'EHLO':
+                    self.reply('250 8BITMIME')
+            elif verb == 'MAIL':
+                recipients = 0
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                address = command.partition(':')[2].strip(' <>').lower()
+                if address.startswith('bounce'):
+                    self.reply('550 No such user')
+                elif address.startswith('greylist'):
+                    self.reply('451 Greylisted, try again later')
+                else:
+                    recipients += 1
+                    self.reply('250 OK')
+            elif verb == 'DATA':
+                if not recipients:
+                    self.reply('503 No valid recipients')
+                    continue
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                while self.rfile.readline() not in (b'.\r\n', b'.\n', b''):
+                    pass
+                sink.count('messages')
+                self.reply('250 OK queued')
+            elif verb in ('RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """Threaded SMTP server that discards and counts messages."""
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=1025, connect_delay=0.0):
+        super().__init__((host, port), SMTPSinkHandler)
+        self.connect_delay = connect_delay
+        self.messages = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
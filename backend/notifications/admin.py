@@ -1,11 +1,12 @@
 """Admin interface for notifications app.
 
-Handles newsletter subscription management in Django admin.
+Handles newsletter subscription and campaign management in Django admin.
 """
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.utils.html import format_html
 
-from notifications.models import NewsletterSubscription
+from notifications.campaigns import pause_campaigns, send_campaign
+from notifications.models import NewsletterSubscription, Campaign, CampaignDelivery
 
 
 @admin.register(NewsletterSubscription)
@@ -46,3 +47,76 @@ class NewsletterSubscriptionAdmin(admin.ModelAdmin):
     status_badge.short_description = 'Status'
     
     ordering = ('-subscribed_at',)
+
+
+@admin.register(Campaign)
+class CampaignAdmin(admin.ModelAdmin):
+    """Admin interface for Campaign model."""
+
+    list_display = ('subject', 'segment', 'status_badge', 'progress', 'failed_count', 'created_at', 'finished_at')
+    list_filter = ('status', 'segment')
+    search_fields = ('subject',)
+    readonly_fields = ('status', 'recipients', 'sent_count', 'failed_count', 'created_at', 'started_at', 'finished_at')
+    actions = ['start_sending', 'pause_sending']
+
+    fieldsets = (
+        ('Message', {
+            'fields': ('subject', 'content', 'template_name')
+        }),
+        ('Audience', {
+            'fields': ('segment', 'rate')
+        }),
+        ('Progress', {
+            'fields': ('status', 'recipients', 'sent_count', 'failed_count', 'created_at', 'started_at', 'finished_at'),
+        }),
+    )
+
+    def status_badge(self, obj):
+        """Display status as colored badge."""
+        status_colors = {
+            'draft': '#6c757d',
+            'sending': '#17a2b8',
+            'paused': '#ffc107',
+            'sent': '#28a745',
+        }
+        color = status_colors.get(obj.status, '#6c757d')
+        return format_html(
+            '<span style="background-color: {}; color: white; padding: 5px 10px; border-radius: 3px; font-weight: bold;">{}</span>',
+            color,
+            obj.get_status_display()
+        )
+    status_badge.short_description = 'Status'
+
+    def progress(self, obj):
+        """Emails handled out of the audience size at start."""
+        return f'{obj.sent_count + obj.failed_count} / {obj.recipients}'
+    progress.short_description = 'Progress'
+
+    @admin.action(description='Start or resume sending')
+    def start_sending(self, request, queryset):
+        campaigns = queryset.exclude(status=Campaign.StatusChoice.SENT)
+        for campaign in campaigns:
+            send_campaign.delay(campaign.pk)
+        self.message_user(request, f'{len(campaigns)} campaign(s) queued for sending', messages.SUCCESS)
+
+    @admin.action(description='Pause sending')
+    def pause_sending(self, request, queryset):
+        paused = pause_campaigns(queryset)
+        self.message_user(request, f'{paused} campaign(s) will pause after the current chunk', messages.SUCCESS)
+
+
+@admin.register(CampaignDelivery)
+class CampaignDeliveryAdmin(admin.ModelAdmin):
+    """Admin interface for CampaignDelivery model."""
+
+    list_display = ('campaign', 'subscription', 'status', 'error')
+    list_filter = ('status', 'campaign')
+    list_select_related = ('campaign', 'subscription')
+    raw_id_fields = ('campaign', 'subscription')
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,43 @@
+"""Import a partner newsletter list.
+
+Reads a CSV (or one address per line) with the email in the first
+column, from a file or stdin:
+
+    python manage.py import_subscribers partners.csv
+    zcat list.csv.gz | python manage.py import_subscribers - --reactivate
+"""
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.utils import IMPORT_BATCH_SIZE, import_subscribers, read_emails
+
+
+class Command(BaseCommand):
+    help = 'Import newsletter subscribers from a CSV file in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file, or - for stdin')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+                            help='Addresses upserted per statement')
+        parser.add_argument('--reactivate', action='store_true',
+                            help='Resubscribe addresses that had unsubscribed')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        source = sys.stdin if options['path'] == '-' else open(options['path'], newline='', encoding='utf-8-sig')
+        try:
+            counts = import_subscribers(
+                read_emails(source),
+                reactivate=options['reactivate'],
+                batch_size=options['batch_size'],
+            )
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        self.stdout.write(self.style.SUCCESS(
+            f"Inserted {counts['inserted']}, reactivated {counts['reactivated']}, "
+            f"skipped {counts['skipped']}, invalid {counts['invalid']} "
+            f"in {time.monotonic() - started:.1f}s"
+        ))
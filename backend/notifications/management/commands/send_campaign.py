@@ -0,0 +1,32 @@
+"""Send (or resume) a newsletter campaign in the foreground.
+
+    python manage.py send_campaign 3 --rate 50
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from notifications.campaigns import send_campaign
+from notifications.models import Campaign
+
+
+class Command(BaseCommand):
+    help = 'Send a newsletter campaign, resuming after its last checkpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('campaign', type=int, help='Campaign id')
+        parser.add_argument('--chunk-size', type=int, default=None,
+                            help='Subscribers per checkpointed chunk')
+        parser.add_argument('--rate', type=int, default=None,
+                            help='Emails per second (overrides the campaign rate)')
+
+    def handle(self, *args, **options):
+        if not Campaign.objects.filter(pk=options['campaign']).exists():
+            raise CommandError(f"Campaign {options['campaign']} does not exist")
+        started = time.monotonic()
+        sent = send_campaign(options['campaign'], chunk_size=options['chunk_size'], rate=options['rate'])
+        campaign = Campaign.objects.get(pk=options['campaign'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Sent {sent} emails in {time.monotonic() - started:.1f}s; campaign {campaign.get_status_display().lower()}, '
+            f'{campaign.sent_count} sent and {campaign.failed_count} failed of {campaign.recipients}'
+        ))
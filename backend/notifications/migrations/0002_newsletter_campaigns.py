@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Campaign',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255)),
+                ('content', models.TextField(help_text='HTML body, inserted into the campaign email layout')),
+                ('template_name', models.CharField(default='notifications/email/campaign.html', max_length=255)),
+                ('segment', models.CharField(blank=True, choices=[('champions', 'Champions'), ('loyal', 'Loyal'), ('new', 'New customers'), ('promising', 'Promising'), ('at_risk', 'At risk'), ('hibernating', 'Hibernating'), ('lost', 'Lost'), ('prospect', 'Prospects')], help_text='Only subscribers whose account is in this customer segment; empty for everyone', max_length=12)),
+                ('rate', models.PositiveIntegerField(blank=True, help_text='Emails per second; empty for the default', null=True)),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('sending', 'Sending'), ('paused', 'Paused'), ('sent', 'Sent')], db_index=True, default='draft', max_length=10)),
+                ('cursor', models.UUIDField(blank=True, editable=False, null=True)),
+                ('recipients', models.PositiveIntegerField(default=0, editable=False)),
+                ('sent_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('failed_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('locked_by', models.CharField(blank=True, editable=False, max_length=64)),
+                ('locked_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Campaign',
+                'verbose_name_plural': 'Campaigns',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CampaignDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'Sent'), (2, 'Failed')])),
+                ('error', models.CharField(blank=True, max_length=255)),
+            ],
+            options={
+                'verbose_name': 'Campaign Delivery',
+                'verbose_name_plural': 'Campaign Deliveries',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='newslettersubscription',
+            index=models.Index(fields=['status', 'id'], name='notificatio_status_9d70fc_idx'),
+        ),
+        migrations.AddField(
+            model_name='campaigndelivery',
+            name='campaign',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='notifications.campaign'),
+        ),
+        migrations.AddField(
+            model_name='campaigndelivery',
+            name='subscription',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='notifications.newslettersubscription'),
+        ),
+        migrations.AddConstraint(
+            model_name='campaigndelivery',
+            constraint=models.UniqueConstraint(fields=('campaign', 'subscription'), name='unique_campaign_delivery'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 import uuid
 from django.db import models
 
+from orders.models import CustomerSegment
+
 
 class NewsletterSubscription(models.Model):
     """Model for storing newsletter subscriptions."""
@@ -31,4 +33,79 @@ class NewsletterSubscription(models.Model):
             models.Index(fields=['email']),
             models.Index(fields=['status']),
             models.Index(fields=['subscribed_at']),
+            models.Index(fields=['status', 'id']),
+        ]
+
+
+class Campaign(models.Model):
+    """Model for a newsletter email sent to active subscribers.
+
+    ``notifications.campaigns`` sends it in keyset chunks ordered by
+    subscription id. ``cursor`` is the last subscription id handled and
+    is saved with the counters after every chunk, so an interrupted run
+    resumes where it stopped. ``locked_by``/``locked_at`` keep two
+    senders from running the same campaign; the lock is refreshed every
+    chunk and may be taken over once stale.
+    """
+
+    class StatusChoice(models.TextChoices):
+        DRAFT = "draft", "Draft"
+        SENDING = "sending", "Sending"
+        PAUSED = "paused", "Paused"
+        SENT = "sent", "Sent"
+
+    subject = models.CharField(max_length=255)
+    content = models.TextField(help_text='HTML body, inserted into the campaign email layout')
+    template_name = models.CharField(max_length=255, default='notifications/email/campaign.html')
+    segment = models.CharField(
+        max_length=12,
+        choices=CustomerSegment.Segment.choices,
+        blank=True,
+        help_text='Only subscribers whose account is in this customer segment; empty for everyone'
+    )
+    rate = models.PositiveIntegerField(blank=True, null=True, help_text='Emails per second; empty for the default')
+    status = models.CharField(max_length=10, choices=StatusChoice.choices, default=StatusChoice.DRAFT, db_index=True)
+    cursor = models.UUIDField(blank=True, null=True, editable=False)
+    recipients = models.PositiveIntegerField(default=0, editable=False)
+    sent_count = models.PositiveIntegerField(default=0, editable=False)
+    failed_count = models.PositiveIntegerField(default=0, editable=False)
+    locked_by = models.CharField(max_length=64, blank=True, editable=False)
+    locked_at = models.DateTimeField(blank=True, null=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self) -> str:
+        return f"{self.subject} ({self.get_status_display()})"
+
+    class Meta:
+        verbose_name = 'Campaign'
+        verbose_name_plural = 'Campaigns'
+        ordering = ['-created_at']
+
+
+class CampaignDelivery(models.Model):
+    """Model recording the outcome of a campaign email for one subscriber.
+
+    Kept narrow (two foreign keys and a small status) because a campaign
+    writes one row per recipient. Failed rows carry the error.
+    """
+
+    class StatusChoice(models.IntegerChoices):
+        SENT = 1, "Sent"
+        FAILED = 2, "Failed"
+
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name='deliveries')
+    subscription = models.ForeignKey(NewsletterSubscription, on_delete=models.CASCADE, related_name='+')
+    status = models.PositiveSmallIntegerField(choices=StatusChoice.choices)
+    error = models.CharField(max_length=255, blank=True)
+
+    def __str__(self) -> str:
+        return f"{self.campaign_id} -> {self.subscription_id}: {self.get_status_display()}"
+
+    class Meta:
+        verbose_name = 'Campaign Delivery'
+        verbose_name_plural = 'Campaign Deliveries'
+        constraints = [
+            models.UniqueConstraint(fields=['campaign', 'subscription'], name='unique_campaign_delivery'),
         ]
@@ -1,6 +1,6 @@
 """URL configuration for notifications app.
 
-Handles newsletter subscriptions and unsubscriptions.
+Handles newsletter subscriptions, unsubscriptions and list imports.
 """
 from django.urls import path
 from notifications import views
@@ -11,4 +11,9 @@ urlpatterns = [
     # ===== Newsletter Management =====
     path('newsletter/subscribe/', views.NewsletterSubscribeView.as_view(), name='newsletter_subscribe'),
     path('newsletter/unsubscribe/', views.NewsletterUnsubscribeView.as_view(), name='newsletter_unsubscribe'),
-]
\ No newline at end of file
+    path('newsletter/unsubscribe/<str:token>/', views.NewsletterOneClickUnsubscribeView.as_view(),
+         name='newsletter_one_click_unsubscribe'),
+    path('newsletter/subscribe/ajax/', views.NewsletterSubscribeView.as_view(), name='newsletter_subscribe_ajax'),
+    path('newsletter/unsubscribe/ajax/', views.NewsletterUnsubscribeView.as_view(), name='newsletter_unsubscribe_ajax'),
+    path('newsletter/import/', views.NewsletterImportView.as_view(), name='newsletter_import'),
+]
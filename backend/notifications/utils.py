@@ -0,0 +1,221 @@
+"""Utility functions for notifications app.
+
+Newsletter subscription writes, each a single statement:
+- ``subscribe``: INSERT ... ON CONFLICT upsert that also reactivates
+- ``unsubscribe``: conditional UPDATE
+- ``import_subscribers``: multi-row upserts for partner lists
+
+plus stateless signed unsubscribe links for newsletter emails.
+
+The upserts use ``RETURNING id``: a returned id equal to the one just
+generated means the row was inserted, another id means an existing row
+was reactivated, and no row means the address was already active (or,
+for imports without reactivation, present at all). This needs
+PostgreSQL or SQLite 3.35+.
+"""
+import csv
+import re
+import uuid
+from itertools import islice
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from notifications.models import NewsletterSubscription
+
+ACTIVE = NewsletterSubscription.StatusChoice.ACTIVE
+UNSUBSCRIBED = NewsletterSubscription.StatusChoice.UNSUBSCRIBED
+
+# Rows per INSERT statement (four parameters each)
+IMPORT_BATCH_SIZE = 1000
+
+# Plain ASCII addresses, a strict subset of what validate_email accepts
+SIMPLE_EMAIL_RE = re.compile(
+    r'[a-z0-9_%+-]+(?:\.[a-z0-9_%+-]+)*@(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,63}'
+)
+MAX_EMAIL_LENGTH = NewsletterSubscription._meta.get_field('email').max_length
+
+
+def normalize_email(value):
+    """Lower-cased, trimmed email address, or None if it is not valid."""
+    email = (value or '').strip().strip('<>"\'').strip().lower()
+    if len(email) > MAX_EMAIL_LENGTH:
+        return None
+    if SIMPLE_EMAIL_RE.fullmatch(email):
+        return email
+    try:
+        validate_email(email)
+    except ValidationError:
+        return None
+    return email
+
+
+def _upsert(emails, reactivate):
+    """Insert ``emails`` (unique, normalized) in one statement.
+
+    Returns:
+        tuple: (inserted, reactivated) counts
+    """
+    meta = NewsletterSubscription._meta
+    table = connection.ops.quote_name(meta.db_table)
+    now = meta.get_field('subscribed_at').get_db_prep_value(timezone.now(), connection)
+    # What UUIDField.get_db_prep_value does, without the per-row overhead
+    native_uuid = connection.features.has_native_uuid_field
+
+    ids, params = set(), []
+    for email in emails:
+        pk = uuid.uuid4() if native_uuid else uuid.uuid4().hex
+        ids.add(pk)
+        params += [pk, email, now, ACTIVE]
+
+    if reactivate:
+        conflict = f'DO UPDATE SET status = %s, unsubscribed_at = NULL WHERE {table}.status <> %s'
+        params += [ACTIVE, ACTIVE]
+    else:
+        conflict = 'DO NOTHING'
+    values = ', '.join(['(%s, %s, %s, %s, NULL)'] * len(emails))
+    sql = (
+        f'INSERT INTO {table} (id, email, subscribed_at, status, unsubscribed_at) VALUES {values} '
+        f'ON CONFLICT (email) {conflict} RETURNING id'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        returned = [row[0] for row in cursor.fetchall()]
+    inserted = sum(1 for pk in returned if pk in ids)
+    return inserted, len(returned) - inserted
+
+
+# ===== Single Subscriptions =====
+
+def subscribe(email):
+    """Subscribe or reactivate a normalized email address.
+
+    Returns:
+        str: 'created', 'reactivated' or 'active' (already subscribed)
+    """
+    inserted, reactivated = _upsert([email], reactivate=True)
+    if inserted:
+        return 'created'
+    return 'reactivated' if reactivated else 'active'
+
+
+def unsubscribe(email):
+    """Unsubscribe an active address.
+
+    Returns:
+        bool: True if an active subscription was unsubscribed
+    """
+    return NewsletterSubscription.objects.filter(email=email, status=ACTIVE).update(
+        status=UNSUBSCRIBED,
+        unsubscribed_at=timezone.now(),
+    ) == 1
+
+
+def unsubscribe_subscription(subscription_id):
+    """Unsubscribe by subscription id (from a verified unsubscribe token).
+
+    Returns:
+        bool: True if an active subscription was unsubscribed
+    """
+    return NewsletterSubscription.objects.filter(pk=subscription_id, status=ACTIVE).update(
+        status=UNSUBSCRIBED,
+        unsubscribed_at=timezone.now(),
+    ) == 1
+
+
+# ===== Unsubscribe Links =====
+
+# Separate salt so these signatures are useless anywhere else
+UNSUBSCRIBE_SALT = 'notifications.unsubscribe'
+
+
+def unsubscribe_signer():
+    """Signer for unsubscribe tokens; reuse one instance for bulk signing."""
+    return signing.Signer(salt=UNSUBSCRIBE_SALT)
+
+
+def unsubscribe_token(subscription_id, signer=None):
+    """Signed token naming a subscription, e.g. ``<id hex>:<signature>``.
+
+    Stateless: nothing is stored, and verifying it needs no lookup.
+    """
+    return (signer or unsubscribe_signer()).sign(uuid.UUID(str(subscription_id)).hex)
+
+
+def read_unsubscribe_token(token):
+    """Subscription id from a token, or None if the signature is invalid."""
+    try:
+        return uuid.UUID(unsubscribe_signer().unsign(token))
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def unsubscribe_url_prefix(domain):
+    """Absolute unsubscribe URL up to the token, computed once per send."""
+    protocol = "https" if not settings.DEBUG else "http"
+    placeholder = 'TOKEN'
+    path = reverse('notifications:newsletter_one_click_unsubscribe', kwargs={'token': placeholder})
+    return f'{protocol}://{domain}{path}'.removesuffix(f'{placeholder}/')
+
+
+def unsubscribe_url(subscription_id, domain, signer=None, prefix=None):
+    """Absolute one-click unsubscribe URL for a subscription.
+
+    For bulk rendering pass a shared ``signer`` and ``prefix``
+    (``unsubscribe_url_prefix``) so each link costs one HMAC.
+    """
+    prefix = prefix or unsubscribe_url_prefix(domain)
+    return f'{prefix}{unsubscribe_token(subscription_id, signer)}/'
+
+
+# ===== Bulk Import =====
+
+def read_emails(lines):
+    """Raw addresses from CSV lines (first column; a header row counts as invalid)."""
+    for row in csv.reader(lines):
+        if row:
+            yield row[0]
+
+
+def import_subscribers(values, reactivate=False, batch_size=IMPORT_BATCH_SIZE):
+    """Import raw email addresses in batches.
+
+    Addresses are normalized, invalid ones and duplicates within a batch
+    are dropped, and every batch is one upsert. Duplicates across
+    batches are caught by the unique email index, so memory stays flat
+    for lists of any size. Unsubscribed addresses are left alone unless
+    ``reactivate`` is set, since a partner list is no opt-in.
+
+    Args:
+        values: iterable of raw email strings
+        reactivate: resubscribe addresses that had unsubscribed
+        batch_size: rows per statement
+
+    Returns:
+        dict: counts of inserted, reactivated, skipped (known or
+        duplicate) and invalid rows
+    """
+    counts = {'inserted': 0, 'reactivated': 0, 'skipped': 0, 'invalid': 0}
+    values = iter(values)
+    while True:
+        batch = list(islice(values, batch_size))
+        if not batch:
+            break
+        emails, valid = {}, 0
+        for value in batch:
+            email = normalize_email(value)
+            if email is not None:
+                emails[email] = None
+                valid += 1
+        counts['invalid'] += len(batch) - valid
+        if emails:
+            inserted, reactivated = _upsert(list(emails), reactivate)
+            counts['inserted'] += inserted
+            counts['reactivated'] += reactivated
+            counts['skipped'] += valid - inserted - reactivated
+    return counts
@@ -1,16 +1,26 @@
 """Views for notifications app.
 
 Handles newsletter subscription and unsubscription via both
-traditional forms and AJAX requests.
+traditional forms and AJAX requests, and staff list imports.
 """
+import codecs
+
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.shortcuts import render
 from django.views.generic import TemplateView, View
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
 from django.contrib import messages
 from django.urls import reverse_lazy
 import json
 
 from notifications.models import NewsletterSubscription
 from notifications.forms import NewsletterSubscriptionForm
+from notifications.utils import (
+    import_subscribers, normalize_email, read_emails, read_unsubscribe_token, subscribe, unsubscribe,
+    unsubscribe_subscription
+)
 
 
 # ===== Newsletter Views =====
@@ -40,15 +50,21 @@ class NewsletterSubscribeView(View):
             # Get email from JSON or POST data
             if is_ajax:
                 data = json.loads(request.body)
-                email = data.get('email', '').strip().lower()
+                email = data.get('email', '')
             else:
-                email = request.POST.get('email', '').strip().lower()
+                email = request.POST.get('email', '')
             
-            if not email:
+            if not email.strip():
                 return self._response(False, 'Email is required.', is_ajax, 400)
             
-            # Check if already subscribed
-            if NewsletterSubscription.objects.filter(email=email, status='active').exists():
+            email = normalize_email(email)
+            if email is None:
+                return self._response(False, 'Please enter a valid email address.', is_ajax, 400)
+            
+            # Create or reactivate subscription in one upsert
+            result = subscribe(email)
+            
+            if result == 'active':
                 return self._response(
                     False,
                     'This email is already subscribed.',
@@ -56,22 +72,11 @@ class NewsletterSubscribeView(View):
                     400
                 )
             
-            # Create or reactivate subscription
-            subscription, created = NewsletterSubscription.objects.get_or_create(
-                email=email,
-                defaults={'status': 'active'}
-            )
-            
-            if not created and subscription.status == 'unsubscribed':
-                subscription.status = 'active'
-                subscription.unsubscribed_at = None
-                subscription.save()
-            
             return self._response(
                 True,
                 'Thank you for subscribing to our newsletter!',
                 is_ajax,
-                201 if created else 200
+                201 if result == 'created' else 200
             )
         
         except json.JSONDecodeError:
@@ -126,31 +131,23 @@ class NewsletterUnsubscribeView(View):
                     'message': 'Email is required.'
                 }, status=400)
             
-            # Find and unsubscribe
-            try:
-                subscription = NewsletterSubscription.objects.get(email=email)
-                
-                if subscription.status == 'active':
-                    from django.utils import timezone
-                    subscription.status = 'unsubscribed'
-                    subscription.unsubscribed_at = timezone.now()
-                    subscription.save()
-                    
-                    return JsonResponse({
-                        'success': True,
-                        'message': 'You have been unsubscribed.'
-                    })
-                else:
-                    return JsonResponse({
-                        'success': False,
-                        'message': 'This email is not currently subscribed.'
-                    }, status=400)
+            # Unsubscribe with one conditional UPDATE
+            if unsubscribe(email):
+                return JsonResponse({
+                    'success': True,
+                    'message': 'You have been unsubscribed.'
+                })
             
-            except NewsletterSubscription.DoesNotExist:
+            # Nothing updated: tell a missing address from an inactive one
+            if NewsletterSubscription.objects.filter(email=email).exists():
                 return JsonResponse({
                     'success': False,
-                    'message': 'Email not found in our newsletter list.'
-                }, status=404)
+                    'message': 'This email is not currently subscribed.'
+                }, status=400)
+            return JsonResponse({
+                'success': False,
+                'message': 'Email not found in our newsletter list.'
+            }, status=404)
         
         except json.JSONDecodeError:
             return JsonResponse({
@@ -162,3 +159,68 @@ class NewsletterUnsubscribeView(View):
                 'success': False,
                 'message': 'An error occurred. Please try again.'
             }, status=500)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class NewsletterOneClickUnsubscribeView(View):
+    """Unsubscribe through a signed link from a newsletter email.
+    
+    The token in the URL is verified without touching the database.
+    
+    GET: Show a confirmation page. Link scanners and mail filters fetch
+         URLs in emails, so a GET never unsubscribes (RFC 8058).
+    POST: Unsubscribe with one UPDATE. Handles both the confirmation
+          form and the ``List-Unsubscribe=One-Click`` POST that mail
+          clients send for the ``List-Unsubscribe-Post`` header; the
+          latter gets an empty 200.
+    """
+    template_name = 'notifications/subscribe/newsletter_unsubscribe.html'
+
+    def get(self, request, token):
+        """Display unsubscribe confirmation."""
+        valid = read_unsubscribe_token(token) is not None
+        return render(request, self.template_name, {'valid': valid, 'done': False}, status=200 if valid else 400)
+
+    def post(self, request, token):
+        """Unsubscribe the subscription named by the token."""
+        subscription_id = read_unsubscribe_token(token)
+        one_click = request.POST.get('List-Unsubscribe') == 'One-Click'
+        if subscription_id is None:
+            if one_click:
+                return HttpResponse(status=400)
+            return render(request, self.template_name, {'valid': False, 'done': False}, status=400)
+        
+        # Already unsubscribed is fine too: the outcome is the same
+        unsubscribe_subscription(subscription_id)
+        if one_click:
+            return HttpResponse(status=200)
+        return render(request, self.template_name, {'valid': True, 'done': True})
+
+
+# ===== Bulk Import =====
+
+class NewsletterImportView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """Import a partner email list posted by staff.
+    
+    Accepts an uploaded ``file`` or a raw CSV request body with the email
+    address in the first column. The body is decoded and imported as a
+    stream in batches. ``?reactivate=1`` also resubscribes addresses
+    that had unsubscribed. Returns JSON with the inserted/reactivated/
+    skipped/invalid counters.
+    """
+    login_url = 'users:login'
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get('file')
+        source = upload if upload is not None else request
+        try:
+            counts = import_subscribers(
+                read_emails(codecs.iterdecode(source, 'utf-8-sig')),
+                reactivate=request.GET.get('reactivate') in ('1', 'true'),
+            )
+        except UnicodeDecodeError as e:
+            return JsonResponse({'success': False, 'message': f'Unreadable file: {e}'}, status=400)
+        return JsonResponse({'success': True, **counts})
@@ -1,6 +1,23 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.utils.html import format_html
-from orders.models import Customer, Order, OrderElement, Delivery, Cart, CartItem
+from core.paginator import EstimatedCountPaginator
+from orders.models import (
+    Customer, Order, OrderElement, Delivery, Cart, CartItem, StockReservation, OrderEvent,
+    ShippingRate, ShippingRateTable, DailyProductSales, DailyCategorySales, DailyStatusSales,
+    ArchivedOrder, ArchivedOrderElement, ArchivedDelivery, ArchivedOrderEvent, RestockSuggestion,
+    CustomerSegment
+)
+from orders.archive import restore_orders
+from orders.forecasting import forecast_restock
+from orders.rollups import sales_totals
+from orders.segmentation import segment_customers
+from orders.shipping import invalidate_rates
+from orders.transitions import (
+    InvalidTransition, record_order_created, transition_order, transition_orders, transition_delivery,
+    transition_deliveries
+)
 
 
 class OrderElementInline(admin.TabularInline):
@@ -8,6 +25,10 @@ class OrderElementInline(admin.TabularInline):
     extra = 1
     readonly_fields = ['total_price']
     fields = ['product', 'price', 'quantity', 'total_price']
+    autocomplete_fields = ['product']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('product')
 
 
 class DeliveryInline(admin.TabularInline):
@@ -36,19 +57,60 @@ class DeliveryInline(admin.TabularInline):
     status_badge.short_description = 'Status'
 
 
+class OrderEventInline(admin.TabularInline):
+    """Read-only status timeline of an order."""
+    model = OrderEvent
+    extra = 0
+    can_delete = False
+    fields = ['created_at', 'kind', 'from_status', 'status']
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+def _bulk_transition_action(transition, status, label):
+    """Build an admin action moving selected rows to ``status``."""
+    def action(modeladmin, request, queryset):
+        moved = transition(queryset, status)
+        skipped = queryset.count() - moved
+        modeladmin.message_user(request, f'{moved} moved to {label}, {skipped} skipped', messages.SUCCESS)
+    action.__name__ = f'mark_{status}'
+    action.short_description = f'Mark selected as {label}'
+    return action
+
+
 @admin.register(Customer)
 class CustomerAdmin(admin.ModelAdmin):
     list_display = ['get_username', 'phone', 'get_orders_count']
     search_fields = ['user__username', 'user__email', 'phone']
     readonly_fields = ['id', 'user']
+    list_select_related = ['user']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    
+    def get_queryset(self, request):
+        # Correlated count is evaluated for the displayed page only
+        orders_count = (
+            Order.objects.filter(customer=OuterRef('pk'))
+            .order_by()
+            .values('customer')
+            .annotate(count=Count('pk'))
+            .values('count')
+        )
+        return super().get_queryset(request).annotate(
+            orders_count=Coalesce(Subquery(orders_count), Value(0))
+        )
     
     def get_username(self, obj):
         return obj.user.username
     get_username.short_description = 'Username'
+    get_username.admin_order_field = 'user__username'
     
     def get_orders_count(self, obj):
-        return obj.orders.count()
+        return obj.orders_count
     get_orders_count.short_description = 'Orders'
+    get_orders_count.admin_order_field = 'orders_count'
 
 
 @admin.register(Order)
@@ -56,8 +118,16 @@ class OrderAdmin(admin.ModelAdmin):
     list_display = ['customer', 'status', 'total_price', 'registered_at']
     list_filter = ['status', 'registered_at', 'is_draft']
     search_fields = ['customer__user__username', 'address']
-    readonly_fields = ['registered_at', 'id']
-    inlines = [OrderElementInline, DeliveryInline]
+    readonly_fields = ['registered_at', 'id', 'called_at', 'delivered_at']
+    list_select_related = ['customer__user']
+    autocomplete_fields = ['customer']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    inlines = [OrderElementInline, DeliveryInline, OrderEventInline]
+    actions = [
+        _bulk_transition_action(transition_orders, status, status.label)
+        for status in [Order.StatusChoice.PROCESSED, Order.StatusChoice.SHIPPED, Order.StatusChoice.COMPLETED]
+    ]
     fieldsets = (
         ('Customer Information', {
             'fields': ('customer', 'address', 'order_note')
@@ -74,6 +144,23 @@ class OrderAdmin(admin.ModelAdmin):
         }),
     )
 
+    def save_model(self, request, obj, form, change):
+        """Route status edits through the transition engine.
+        
+        Orders added here start their timeline like placed orders do.
+        """
+        new_status = obj.status
+        if change and 'status' in form.changed_data:
+            obj.status = form.initial['status']
+        super().save_model(request, obj, form, change)
+        if not change:
+            record_order_created(obj)
+        if new_status != obj.status:
+            try:
+                transition_order(obj, new_status)
+            except InvalidTransition as e:
+                self.message_user(request, str(e), messages.ERROR)
+
 
 @admin.register(Delivery)
 class DeliveryAdmin(admin.ModelAdmin):
@@ -85,6 +172,18 @@ class DeliveryAdmin(admin.ModelAdmin):
     search_fields = ['tracking_number', 'order__id', 'delivery_address']
     readonly_fields = ['id', 'created_at', 'updated_at']
     ordering = ['-created_at']
+    list_select_related = ['order__customer__user']
+    raw_id_fields = ['order']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = [
+        _bulk_transition_action(transition_deliveries, status, status.label)
+        for status in [
+            Delivery.DeliveryStatus.IN_TRANSIT,
+            Delivery.DeliveryStatus.OUT_FOR_DELIVERY,
+            Delivery.DeliveryStatus.DELIVERED,
+        ]
+    ]
 
     fieldsets = (
         ('Delivery Information', {
@@ -97,7 +196,7 @@ class DeliveryAdmin(admin.ModelAdmin):
             'fields': ('estimated_delivery_date', 'actual_delivery_date', 'signature_required')
         }),
         ('Costs', {
-            'fields': ('delivery_cost', 'insurance', 'insurance_cost'),
+            'fields': ('delivery_cost', 'rate_version', 'insurance', 'insurance_cost'),
             'classes': ('collapse',)
         }),
         ('System Information', {
@@ -106,6 +205,18 @@ class DeliveryAdmin(admin.ModelAdmin):
         }),
     )
 
+    def save_model(self, request, obj, form, change):
+        """Route status edits through the transition engine."""
+        new_status = obj.status
+        if change and 'status' in form.changed_data:
+            obj.status = form.initial['status']
+        super().save_model(request, obj, form, change)
+        if new_status != obj.status:
+            try:
+                transition_delivery(obj, new_status)
+            except InvalidTransition as e:
+                self.message_user(request, str(e), messages.ERROR)
+
     def status_badge(self, obj):
         """Display delivery status as colored badge"""
         status_colors = {
@@ -130,6 +241,10 @@ class OrderElementAdmin(admin.ModelAdmin):
     list_filter = ['order__status']
     search_fields = ['order__customer__user__username', 'product__name']
     readonly_fields = ['id']
+    list_select_related = ['order__customer__user', 'product']
+    raw_id_fields = ['order', 'product']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 class CartItemInline(admin.TabularInline):
@@ -139,25 +254,34 @@ class CartItemInline(admin.TabularInline):
     readonly_fields = ['product', 'price', 'added_at', 'updated_at']
     fields = ['product', 'quantity', 'price']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('product')
+
 
 @admin.register(Cart)
 class CartAdmin(admin.ModelAdmin):
     """Admin interface for Cart model."""
     
     list_display = ['user', 'get_total_items', 'get_total_price', 'created_at']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['created_at', 'updated_at', 'item_count', 'subtotal']
     search_fields = ['user__username', 'user__email']
     inlines = [CartItemInline]
+    list_select_related = ['user']
+    raw_id_fields = ['user']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def get_total_items(self, obj):
-        """Get total number of items."""
-        return obj.get_total_items()
+        """Get total number of items from the cart header."""
+        return obj.item_count
     get_total_items.short_description = 'Items'
+    get_total_items.admin_order_field = 'item_count'
 
     def get_total_price(self, obj):
-        """Get total price."""
-        return f'${obj.get_total_price()}'
+        """Get total price from the cart header."""
+        return f'${obj.subtotal}'
     get_total_price.short_description = 'Total Price'
+    get_total_price.admin_order_field = 'subtotal'
 
 
 @admin.register(CartItem)
@@ -168,8 +292,216 @@ class CartItemAdmin(admin.ModelAdmin):
     list_filter = ['added_at', 'updated_at']
     readonly_fields = ['added_at', 'updated_at']
     search_fields = ['product__name', 'cart__user__username']
+    list_select_related = ['product', 'cart__user']
+    raw_id_fields = ['product', 'cart']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def get_total_price(self, obj):
         """Get total price for item."""
         return f'${obj.get_total_price()}'
     get_total_price.short_description = 'Total'
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    """Admin interface for StockReservation model."""
+    
+    list_display = ['product', 'user', 'quantity', 'expires_at', 'created_at']
+    list_filter = ['expires_at']
+    search_fields = ['product__name', 'user__username']
+    list_select_related = ['product', 'user']
+    raw_id_fields = ['product', 'user']
+    readonly_fields = ['created_at']
+
+
+class ShippingRateInline(admin.TabularInline):
+    model = ShippingRate
+    extra = 0
+    fields = ['method', 'zone', 'base_cost', 'per_kg_cost', 'included_weight', 'free_over', 'min_days', 'max_days']
+
+
+@admin.register(ShippingRateTable)
+class ShippingRateTableAdmin(admin.ModelAdmin):
+    """Admin interface for versioned shipping rate tables.
+    
+    Saving an active table deactivates the others, so exactly one
+    version is live at a time.
+    """
+    
+    list_display = ['version', 'is_active', 'notes', 'created_at']
+    readonly_fields = ['created_at']
+    inlines = [ShippingRateInline]
+    
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if obj.is_active:
+            ShippingRateTable.objects.exclude(pk=obj.pk).update(is_active=False)
+        invalidate_rates()
+    
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        invalidate_rates()
+
+
+class SalesRollupAdmin(admin.ModelAdmin):
+    """Read-only admin for daily sales rollups.
+    
+    The changelist shows totals for the current filters, summed from
+    the rollup rows only.
+    """
+    change_list_template = 'admin/orders/sales_change_list.html'
+    date_hierarchy = 'day'
+    list_per_page = 50
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+    
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        if hasattr(response, 'context_data') and 'cl' in response.context_data:
+            response.context_data['sales_totals'] = sales_totals(response.context_data['cl'].queryset)
+        return response
+
+
+@admin.register(DailyProductSales)
+class DailyProductSalesAdmin(SalesRollupAdmin):
+    list_display = ['day', 'product', 'units', 'revenue']
+    list_select_related = ['product']
+    search_fields = ['product__name']
+
+
+@admin.register(DailyCategorySales)
+class DailyCategorySalesAdmin(SalesRollupAdmin):
+    list_display = ['day', 'category', 'units', 'revenue']
+    list_filter = ['category']
+    list_select_related = ['category']
+
+
+@admin.register(DailyStatusSales)
+class DailyStatusSalesAdmin(SalesRollupAdmin):
+    list_display = ['day', 'status', 'orders', 'units', 'revenue', 'total']
+    list_filter = ['status']
+
+
+@admin.register(RestockSuggestion)
+class RestockSuggestionAdmin(admin.ModelAdmin):
+    """Restock report: most urgent products first."""
+    list_display = ['product', 'stock', 'daily_demand', 'days_of_cover', 'suggested_quantity', 'urgency_badge', 'computed_at']
+    list_filter = ['urgency', 'product__category']
+    search_fields = ['product__name']
+    list_select_related = ['product']
+    show_full_result_count = False
+    actions = ['recompute']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def urgency_badge(self, obj):
+        """Display urgency as colored badge"""
+        colors = {
+            RestockSuggestion.Urgency.OK: '#28a745',
+            RestockSuggestion.Urgency.SOON: '#ffc107',
+            RestockSuggestion.Urgency.CRITICAL: '#fd7e14',
+            RestockSuggestion.Urgency.OUT_OF_STOCK: '#dc3545',
+        }
+        return format_html(
+            '<span style="background-color: {}; color: white; padding: 5px 10px; border-radius: 3px; font-weight: bold;">{}</span>',
+            colors.get(obj.urgency, '#6c757d'),
+            obj.get_urgency_display()
+        )
+    urgency_badge.short_description = 'Urgency'
+    urgency_badge.admin_order_field = 'urgency'
+
+    @admin.action(description='Recompute the forecast for the whole catalog')
+    def recompute(self, request, queryset):
+        forecast_restock.delay()
+        self.message_user(request, 'Restock forecast queued', messages.SUCCESS)
+
+
+@admin.register(CustomerSegment)
+class CustomerSegmentAdmin(admin.ModelAdmin):
+    """RFM segments, recomputed as a whole by the segmentation job."""
+    list_display = ['customer', 'segment', 'rfm', 'recency_days', 'frequency', 'monetary', 'computed_at']
+    list_filter = ['segment']
+    search_fields = ['customer__user__email', 'customer__user__username']
+    list_select_related = ['customer__user']
+    show_full_result_count = False
+    actions = ['recompute']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.action(description='Recompute segments for all customers')
+    def recompute(self, request, queryset):
+        segment_customers.delay()
+        self.message_user(request, 'Customer segmentation queued', messages.SUCCESS)
+
+
+class ArchivedInline(admin.TabularInline):
+    """Read-only rows of an archived order."""
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class ArchivedOrderElementInline(ArchivedInline):
+    model = ArchivedOrderElement
+    fields = ['product', 'price', 'quantity']
+    readonly_fields = fields
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('product')
+
+
+class ArchivedDeliveryInline(ArchivedInline):
+    model = ArchivedDelivery
+    fields = ['method', 'status', 'tracking_number', 'delivery_cost', 'actual_delivery_date']
+    readonly_fields = fields
+
+
+class ArchivedOrderEventInline(ArchivedInline):
+    model = ArchivedOrderEvent
+    fields = ['created_at', 'kind', 'from_status', 'status']
+    readonly_fields = fields
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    """Read-only view of archived orders; restore one to edit it."""
+    list_display = ['uuid', 'customer', 'status', 'total_price', 'registered_at', 'archived_at']
+    list_filter = ['registered_at', 'archived_at']
+    search_fields = ['uuid', 'customer__user__username']
+    list_select_related = ['customer__user']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    inlines = [ArchivedOrderElementInline, ArchivedDeliveryInline, ArchivedOrderEventInline]
+    actions = ['restore']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.action(description='Restore selected orders to the live tables')
+    def restore(self, request, queryset):
+        restored = restore_orders(queryset)
+        self.message_user(request, f'{restored} order(s) restored', messages.SUCCESS)
@@ -0,0 +1,131 @@
+"""Archival of old completed orders.
+
+Completed orders older than ``ORDER_ARCHIVE_AFTER_DAYS`` are moved with
+their lines, delivery and events into the ``Archived*`` tables, which
+share the hot tables' columns and primary keys. Each chunk is one
+transaction of INSERT ... SELECT statements followed by deletes, so rows
+never travel through Python and a failed chunk leaves both sides as
+they were. ``restore_orders`` moves orders back the same way, e.g. for
+a dispute.
+
+Reads that must see both sides (order history, order detail, sales
+rollups) go through ``orders.utils`` and ``orders.rollups``.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from orders.models import (
+    ArchivedDelivery, ArchivedOrder, ArchivedOrderElement, ArchivedOrderEvent, Delivery, Order,
+    OrderElement, OrderEvent
+)
+
+BATCH_SIZE = 500
+
+# (hot model, archive model, column holding the order id), parents first
+TABLES = [
+    (Order, ArchivedOrder, 'id'),
+    (OrderElement, ArchivedOrderElement, 'order_id'),
+    (Delivery, ArchivedDelivery, 'order_id'),
+    (OrderEvent, ArchivedOrderEvent, 'order_id'),
+]
+
+
+def _copy_rows(source, target, column, ids, extra=None):
+    """INSERT the rows of ``source`` whose ``column`` is in ``ids`` into ``target``.
+
+    Copies every column of ``target`` except those given in ``extra``.
+
+    Args:
+        extra: optional {column: value} set on every copied row
+    """
+    extra = extra or {}
+    quote = connection.ops.quote_name
+    columns = [field.column for field in target._meta.concrete_fields if field.column not in extra]
+    placeholders = ', '.join(['%s'] * len(ids))
+    sql = (
+        f'INSERT INTO {quote(target._meta.db_table)} '
+        f'({", ".join(quote(name) for name in columns + list(extra))}) '
+        f'SELECT {", ".join([quote(name) for name in columns] + ["%s"] * len(extra))} '
+        f'FROM {quote(source._meta.db_table)} WHERE {quote(column)} IN ({placeholders})'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*extra.values(), *ids])
+
+
+def archivable_orders(before=None):
+    """Placed, completed orders registered before ``before``.
+
+    Defaults to ``ORDER_ARCHIVE_AFTER_DAYS`` ago.
+    """
+    if before is None:
+        before = timezone.now() - timedelta(days=settings.ORDER_ARCHIVE_AFTER_DAYS)
+    return Order.objects.filter(
+        status=Order.StatusChoice.COMPLETED,
+        is_draft=False,
+        registered_at__lt=before,
+    )
+
+
+# ===== Archiving =====
+
+def _archive_chunk(ids, before):
+    with transaction.atomic():
+        # Re-check inside the transaction: an order may have been reopened
+        ids = list(archivable_orders(before).filter(pk__in=ids).select_for_update().values_list('pk', flat=True))
+        if not ids:
+            return 0
+        now = timezone.now()
+        for hot, archive, column in TABLES:
+            _copy_rows(hot, archive, column, ids, {'archived_at': now} if archive is ArchivedOrder else None)
+        # Lines, delivery and events go with the order (cascade)
+        Order.objects.filter(pk__in=ids).delete()
+    return len(ids)
+
+
+def archive_orders(before=None, batch_size=BATCH_SIZE):
+    """Move archivable orders to the archive, one transaction per chunk.
+
+    Orders are walked by primary key, so the run can be interrupted and
+    restarted at any point.
+
+    Yields:
+        int: number of orders archived by each chunk
+    """
+    if before is None:
+        before = timezone.now() - timedelta(days=settings.ORDER_ARCHIVE_AFTER_DAYS)
+    last_pk = 0
+    while True:
+        ids = list(
+            archivable_orders(before).filter(pk__gt=last_pk)
+            .order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return
+        last_pk = ids[-1]
+        yield _archive_chunk(ids, before)
+
+
+# ===== Restoring =====
+
+def restore_orders(archived, batch_size=BATCH_SIZE):
+    """Move archived orders back into the hot tables.
+
+    Args:
+        archived: ArchivedOrder queryset
+
+    Returns:
+        int: number of orders restored
+    """
+    restored = 0
+    ids = list(archived.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(ids), batch_size):
+        chunk = ids[start:start + batch_size]
+        with transaction.atomic():
+            for hot, archive, column in TABLES:
+                _copy_rows(archive, hot, column, chunk)
+            ArchivedOrder.objects.filter(pk__in=chunk).delete()
+        restored += len(chunk)
+    return restored
@@ -0,0 +1,137 @@
+"""Order total integrity audit.
+
+An order's ``total_price`` should equal the sum of its lines
+(``price * quantity``) plus its delivery cost, which is what checkout
+stores. The audit walks placed orders in id ranges; per chunk it reads
+(order id, price, quantity) lines and (order id, total, delivery cost)
+headers as flat tuples, recomputes every total with NumPy group sums
+over integer cents and reports the orders that differ. Mismatches can
+be fixed in the same pass.
+
+Placed orders without a Delivery row are legacy orders whose total
+already includes shipping; their expected total cannot be known, so
+they are skipped and reported separately, never fixed.
+"""
+from decimal import Decimal
+from typing import NamedTuple
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Max, Min
+
+from orders.models import (
+    ArchivedDelivery, ArchivedOrder, ArchivedOrderElement, Delivery, Order, OrderElement
+)
+
+CHUNK_SIZE = 50000
+
+# (order model, line model, delivery model) per table set
+SOURCES = {
+    'live': (Order, OrderElement, Delivery),
+    'archive': (ArchivedOrder, ArchivedOrderElement, ArchivedDelivery),
+}
+
+
+class Mismatch(NamedTuple):
+    order_id: int
+    stored: Decimal
+    expected: Decimal
+
+    @property
+    def difference(self) -> Decimal:
+        return self.stored - self.expected
+
+
+def _cents(values):
+    """Money values (Decimal, float, int or None) as an int64 array of cents."""
+    return np.rint(np.array(values, dtype=np.float64) * 100).astype(np.int64)
+
+
+def _from_cents(cents):
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def recompute_totals(order_ids, delivery_cents, line_order_ids, line_cents):
+    """Vectorized expected totals, in cents.
+
+    Args:
+        order_ids: sorted int64 array of order ids
+        delivery_cents: int64 array aligned with ``order_ids``
+        line_order_ids: sorted int64 array, one entry per line
+        line_cents: int64 array of ``price * quantity`` per line
+    """
+    expected = delivery_cents.copy()
+    if len(line_order_ids):
+        starts = np.flatnonzero(np.r_[True, line_order_ids[1:] != line_order_ids[:-1]])
+        group_ids = line_order_ids[starts]
+        sums = np.add.reduceat(line_cents, starts)
+        positions = np.minimum(np.searchsorted(order_ids, group_ids), len(order_ids) - 1)
+        # Lines of orders not in ``order_ids`` (drafts) are ignored
+        known = order_ids[positions] == group_ids
+        expected[positions[known]] += sums[known]
+    return expected
+
+
+def _audit_chunk(order_model, line_model, lower, upper):
+    orders = list(
+        order_model.objects.filter(is_draft=False, pk__gte=lower, pk__lt=upper)
+        .order_by('pk')
+        .values_list('pk', 'total_price', 'delivery__pk', 'delivery__delivery_cost')
+    )
+    skipped = [pk for pk, _, delivery_id, _ in orders if delivery_id is None]
+    orders = [(pk, total, cost) for pk, total, delivery_id, cost in orders if delivery_id is not None]
+    if not orders:
+        return [], skipped
+    lines = list(
+        line_model.objects.filter(order_id__gte=lower, order_id__lt=upper)
+        .order_by('order_id')
+        .values_list('order_id', 'price', 'quantity')
+    )
+
+    order_ids, totals, delivery_costs = zip(*orders)
+    order_ids = np.array(order_ids, dtype=np.int64)
+    stored = _cents(totals)
+    delivery_cents = _cents([cost or 0 for cost in delivery_costs])
+    if lines:
+        line_order_ids, prices, quantities = zip(*lines)
+        line_order_ids = np.array(line_order_ids, dtype=np.int64)
+        line_cents = _cents(prices) * np.array(quantities, dtype=np.int64)
+    else:
+        line_order_ids = line_cents = np.empty(0, dtype=np.int64)
+
+    expected = recompute_totals(order_ids, delivery_cents, line_order_ids, line_cents)
+    wrong = np.flatnonzero(stored != expected)
+    mismatches = [
+        Mismatch(int(order_ids[i]), _from_cents(stored[i]), _from_cents(expected[i]))
+        for i in wrong
+    ]
+    return mismatches, skipped
+
+
+def audit_order_totals(source='live', chunk_size=CHUNK_SIZE, fix=False):
+    """Check every placed order's total, one id range at a time.
+
+    Args:
+        source: 'live' or 'archive'
+        chunk_size: order ids covered per chunk
+        fix: write the expected totals of mismatching orders
+
+    Yields:
+        tuple: (upper id of the chunk, list of Mismatch in the chunk,
+        ids of orders skipped for lacking a Delivery row)
+    """
+    order_model, line_model, _ = SOURCES[source]
+    bounds = order_model.objects.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return
+    for lower in range(bounds['low'], bounds['high'] + 1, chunk_size):
+        upper = lower + chunk_size
+        mismatches, skipped = _audit_chunk(order_model, line_model, lower, upper)
+        if fix and mismatches:
+            with transaction.atomic():
+                order_model.objects.bulk_update(
+                    [order_model(pk=m.order_id, total_price=m.expected) for m in mismatches],
+                    ['total_price'],
+                    batch_size=500,
+                )
+        yield min(upper - 1, bounds['high']), mismatches, skipped
@@ -0,0 +1,12 @@
+"""Template context processors for orders app."""
+from orders.guest_cart import GuestCart
+
+
+def guest_cart(request):
+    """Expose the guest cart item count to templates.
+
+    Reads the signed cookie only; no database queries.
+    """
+    if request.user.is_authenticated:
+        return {}
+    return {'guest_cart_count': len(GuestCart(request))}
@@ -0,0 +1,144 @@
+"""Restock forecasting.
+
+Daily unit sales per product are read as flat (product, day, units)
+rows, from ``DailyProductSales`` when rollups exist and from order
+lines otherwise, and turned into NumPy arrays. Demand, days of cover,
+reorder quantities and urgency are then computed for the whole catalog
+in one vectorized pass:
+
+- daily demand is an exponentially weighted average of daily sales
+  with a half-life of ``RESTOCK_HALF_LIFE_DAYS``, so days without sales
+  count as zero and recent days weigh most
+- days of cover is stock divided by daily demand
+- the suggested quantity tops stock up to cover the supplier lead time
+  plus ``RESTOCK_COVER_DAYS``
+
+Results replace the ``RestockSuggestion`` table in one transaction.
+"""
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core.jobs import job
+from orders.models import DailyProductSales, OrderElement, RestockSuggestion
+from store.models import Product
+
+Urgency = RestockSuggestion.Urgency
+
+
+def daily_sales_rows(start):
+    """(product id, day, units) rows of sales from ``start`` on.
+
+    Uses the daily rollups once they have been built (see
+    ``backfill_sales_rollups``), order lines otherwise.
+    """
+    if DailyProductSales.objects.exists():
+        return DailyProductSales.objects.filter(day__gte=start).values_list('product_id', 'day', 'units')
+    start_at = timezone.make_aware(datetime.combine(start, time.min))
+    return (
+        OrderElement.objects.filter(
+            order__is_draft=False, order__registered_at__gte=start_at, product__isnull=False
+        )
+        .annotate(day=TruncDate('order__registered_at'))
+        .values('product_id', 'day')
+        .annotate(units=Sum('quantity'))
+        .values_list('product_id', 'day', 'units')
+        .order_by()
+    )
+
+
+def forecast(stock, product_age, sale_index, sale_age, sale_units, half_life, history_days, lead_time, cover_days):
+    """Vectorized forecast for a catalog.
+
+    Args:
+        stock: units in stock per product
+        product_age: days each product has been listed
+        sale_index: product position of every (product, day) sales row
+        sale_age: age in days of every sales row (0 is today)
+        sale_units: units of every sales row
+
+    Returns:
+        tuple of arrays: (daily demand, days of cover (NaN without
+        demand), suggested quantity, urgency)
+    """
+    decay = 0.5 ** (1 / half_life)
+    weighted = np.bincount(sale_index, weights=sale_units * decay ** sale_age, minlength=len(stock))
+    # Normalize over the days each product could have sold, zero-sale days included
+    window = np.clip(product_age + 1, 1, history_days)
+    demand = weighted * (1 - decay) / (1 - decay ** window)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cover = np.where(demand > 0, stock / demand, np.nan)
+    target = np.ceil(demand * (lead_time + cover_days))
+    suggested = np.clip(target - stock, 0, None).astype(np.int64)
+    urgency = np.select(
+        [(stock == 0) & (demand > 0), cover < lead_time, suggested > 0],
+        [Urgency.OUT_OF_STOCK, Urgency.CRITICAL, Urgency.SOON],
+        Urgency.OK,
+    )
+    return demand, cover, suggested, urgency
+
+
+@job(max_attempts=1)
+def forecast_restock(today=None):
+    """Recompute restock suggestions for every active product.
+
+    Returns:
+        int: number of suggestions written
+    """
+    today = today or timezone.localdate()
+    history_days = settings.RESTOCK_HISTORY_DAYS
+    start = today - timedelta(days=history_days - 1)
+
+    products = list(Product.objects.filter(is_active=True).values_list('pk', 'stock', 'created_at'))
+    if not products:
+        RestockSuggestion.objects.all().delete()
+        return 0
+    product_ids, stock, created = zip(*products)
+    position = {pk: i for i, pk in enumerate(product_ids)}
+    stock = np.array(stock, dtype=np.int64)
+    product_age = np.array([(today - timezone.localdate(at)).days for at in created], dtype=np.int64)
+
+    rows = list(daily_sales_rows(start))
+    if rows:
+        sale_products, sale_days, sale_units = zip(*rows)
+        sale_index = np.fromiter((position.get(pk, -1) for pk in sale_products), dtype=np.int64, count=len(rows))
+        sale_age = (np.datetime64(today, 'D') - np.array(sale_days, dtype='datetime64[D]')).astype(np.int64)
+        sale_units = np.array(sale_units, dtype=np.float64)
+        # Inactive products and sales after ``today`` are left out
+        keep = (sale_index >= 0) & (sale_age >= 0)
+        sale_index, sale_age, sale_units = sale_index[keep], sale_age[keep], sale_units[keep]
+    else:
+        sale_index = sale_age = np.empty(0, dtype=np.int64)
+        sale_units = np.empty(0, dtype=np.float64)
+
+    demand, cover, suggested, urgency = forecast(
+        stock, product_age, sale_index, sale_age, sale_units,
+        half_life=settings.RESTOCK_HALF_LIFE_DAYS,
+        history_days=history_days,
+        lead_time=settings.RESTOCK_LEAD_TIME_DAYS,
+        cover_days=settings.RESTOCK_COVER_DAYS,
+    )
+
+    now = timezone.now()
+    suggestions = [
+        RestockSuggestion(
+            product_id=pk,
+            stock=int(stock[i]),
+            daily_demand=round(float(demand[i]), 4),
+            days_of_cover=None if np.isnan(cover[i]) else round(float(cover[i]), 1),
+            suggested_quantity=int(suggested[i]),
+            urgency=int(urgency[i]),
+            computed_at=now,
+        )
+        for i, pk in enumerate(product_ids)
+    ]
+    with transaction.atomic():
+        RestockSuggestion.objects.all().delete()
+        RestockSuggestion.objects.bulk_create(suggestions, batch_size=2000)
+    return len(suggestions)
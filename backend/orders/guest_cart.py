@@ -0,0 +1,173 @@
+"""Guest cart for anonymous visitors.
+
+Stores product ids and quantities in a compact signed cookie, so
+browsing visitors can build a cart without any database writes.
+Prices are resolved at render time with one batched product query,
+and the cart is merged into ``orders.models.Cart`` on login.
+"""
+import uuid
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from orders.models import Cart, CartItem
+from store.models import Product
+
+
+class GuestCartItem:
+    """Cart line resolved from the cookie and the product catalog.
+
+    Mirrors the attributes of ``CartItem`` used by the cart templates.
+    The product id doubles as the item id for guest cart actions.
+    """
+
+    def __init__(self, product, quantity):
+        self.id = product.pk
+        self.product = product
+        self.product_id = product.pk
+        self.quantity = quantity
+        self.price = product.price
+
+    def get_total_price(self) -> Decimal:
+        """Calculate total price for this item."""
+        return self.price * self.quantity
+
+
+class GuestCart:
+    """Cookie-backed shopping cart for anonymous users.
+
+    Cookie format is ``<product hex>:<quantity>`` pairs joined by ``|``,
+    signed with Django's signing framework.
+    """
+    COOKIE_NAME = 'guest_cart'
+    SALT = 'orders.guest_cart'
+    MAX_AGE = 60 * 60 * 24 * 30  # 30 days
+    MAX_LINES = 50  # keeps the cookie well under 4KB
+
+    def __init__(self, request):
+        self.request = request
+        self.lines = self._load()
+        self.modified = False
+
+    def _load(self) -> dict:
+        raw = self.request.get_signed_cookie(
+            self.COOKIE_NAME, default='', salt=self.SALT, max_age=self.MAX_AGE
+        )
+        lines = {}
+        for pair in raw.split('|') if raw else []:
+            try:
+                product_hex, quantity = pair.split(':')
+                quantity = int(quantity)
+                product_id = uuid.UUID(hex=product_hex)
+            except ValueError:
+                continue
+            if quantity > 0:
+                lines[product_id] = quantity
+        return lines
+
+    @staticmethod
+    def _key(product_id) -> uuid.UUID:
+        return product_id if isinstance(product_id, uuid.UUID) else uuid.UUID(str(product_id))
+
+    def __len__(self) -> int:
+        return sum(self.lines.values())
+
+    def __bool__(self) -> bool:
+        return bool(self.lines)
+
+    def get_quantity(self, product_id) -> int:
+        return self.lines.get(self._key(product_id), 0)
+
+    def add(self, product_id, quantity) -> bool:
+        """Add quantity of a product. Returns False if the cart is full."""
+        key = self._key(product_id)
+        if key not in self.lines and len(self.lines) >= self.MAX_LINES:
+            return False
+        self.lines[key] = self.lines.get(key, 0) + quantity
+        self.modified = True
+        return True
+
+    def set(self, product_id, quantity) -> None:
+        """Set product quantity, removing the line if quantity < 1."""
+        key = self._key(product_id)
+        if quantity < 1:
+            self.lines.pop(key, None)
+        else:
+            self.lines[key] = quantity
+        self.modified = True
+
+    def remove(self, product_id) -> bool:
+        """Remove a product line. Returns False if it was not in the cart."""
+        self.modified = True
+        return self.lines.pop(self._key(product_id), None) is not None
+
+    def clear(self) -> None:
+        self.lines = {}
+        self.modified = True
+
+    def get_items(self) -> list:
+        """Resolve lines against active products in one query."""
+        if not self.lines:
+            return []
+        products = Product.objects.filter(
+            pk__in=self.lines, is_active=True
+        ).select_related('category')
+        return [GuestCartItem(product, self.lines[product.pk]) for product in products]
+
+    def save(self, response) -> None:
+        """Write the cart cookie on the response if it changed."""
+        if not self.modified:
+            return
+        if self.lines:
+            response.set_signed_cookie(
+                self.COOKIE_NAME,
+                '|'.join(f'{product_id.hex}:{quantity}' for product_id, quantity in self.lines.items()),
+                salt=self.SALT,
+                max_age=self.MAX_AGE,
+                httponly=True,
+                samesite='Lax',
+            )
+        else:
+            response.delete_cookie(self.COOKIE_NAME, samesite='Lax')
+
+    def merge_into(self, user) -> None:
+        """Move guest lines into the user's database cart in bulk.
+
+        Quantities are added to existing lines and capped at stock;
+        inactive or sold-out products are dropped. Merged lines and the
+        cart header are stamped as updated, so the merge counts as cart
+        activity for the abandoned cart sweeper.
+        """
+        if not self.lines:
+            return
+
+        products = {
+            product.pk: product
+            for product in Product.objects.filter(pk__in=self.lines, is_active=True, stock__gt=0)
+        }
+        if products:
+            with transaction.atomic():
+                cart, _ = Cart.objects.get_or_create(user=user)
+                existing = {item.product_id: item for item in cart.items.filter(product_id__in=products)}
+                new_items = []
+                now = timezone.now()
+                for product_id, product in products.items():
+                    quantity = self.lines[product_id]
+                    if product_id in existing:
+                        item = existing[product_id]
+                        item.quantity = min(item.quantity + quantity, product.stock)
+                        item.updated_at = now
+                    else:
+                        new_items.append(CartItem(
+                            cart=cart,
+                            product=product,
+                            quantity=min(quantity, product.stock),
+                            price=product.price,
+                        ))
+                CartItem.objects.bulk_create(new_items)
+                CartItem.objects.bulk_update(existing.values(), ['quantity', 'updated_at'])
+                # Also stamps the cart's updated_at
+                cart.recalculate_totals()
+
+        self.clear()
@@ -0,0 +1,143 @@
+"""Idempotency keys for retried POST requests.
+
+Clients send a key in the ``Idempotency-Key`` header or an
+``idempotency_key`` form field. The first request with a key runs the
+view and stores a compact copy of its response per (user, key); any
+replay within ``IDEMPOTENCY_KEY_TTL`` seconds gets that copy back
+without touching the cart or the order tables again.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+
+from orders.models import IdempotencyKey
+from orders.sweeper import PAUSE, delete_in_chunks
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+FIELD = 'idempotency_key'
+MAX_KEY_LENGTH = 64
+
+
+def get_request_key(request):
+    """Return the idempotency key sent with a request, or None."""
+    key = request.META.get(HEADER) or request.POST.get(FIELD)
+    if not key or len(key) > MAX_KEY_LENGTH:
+        return None
+    return key
+
+
+def claim_key(user, key):
+    """Claim a key for a new request.
+
+    Returns:
+        IdempotencyKey: the claimed row if the request should run,
+        or the existing row if the key was used before
+        bool: True if the key was claimed by this call
+    """
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(user=user, key=key, expires_at=expires_at), True
+    except IntegrityError:
+        pass
+
+    # Reuse the slot of an expired key not yet purged
+    if IdempotencyKey.objects.filter(user=user, key=key, expires_at__lte=now).update(
+        status_code=None, content_type='', body='', expires_at=expires_at
+    ):
+        return IdempotencyKey.objects.get(user=user, key=key), True
+    return IdempotencyKey.objects.get(user=user, key=key), False
+
+
+def store_response(record, response):
+    """Save a compact copy of the response, or free the key.
+
+    Redirects keep only their location and JSON responses their body.
+    Server errors and other responses release the key so a retry runs
+    the request again.
+    """
+    if response.status_code < 500 and response.has_header('Location'):
+        body = response['Location']
+    elif response.status_code < 500 and response.get('Content-Type', '').startswith('application/json'):
+        body = response.content.decode(response.charset)
+    else:
+        record.delete()
+        return
+    IdempotencyKey.objects.filter(pk=record.pk).update(
+        status_code=response.status_code,
+        content_type=response['Content-Type'],
+        body=body,
+    )
+
+
+def replay_response(record):
+    """Rebuild the stored response of a completed key."""
+    if 300 <= record.status_code < 400:
+        response = HttpResponse(status=record.status_code)
+        response['Location'] = record.body
+        return response
+    return HttpResponse(record.body, status=record.status_code, content_type=record.content_type)
+
+
+def wait_for_response(record, timeout=5.0, interval=0.1):
+    """Poll an in-flight key until its response is stored.
+
+    Returns:
+        IdempotencyKey or None: the completed row, or None if the first
+        request did not finish in time or failed
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(interval)
+        record = IdempotencyKey.objects.filter(pk=record.pk).first()
+        if record is None or record.status_code is not None:
+            return record
+    return None
+
+
+def purge_expired_keys(batch_size=1000, pause=PAUSE):
+    """Delete expired idempotency keys with ``sweeper.delete_in_chunks``.
+
+    Returns:
+        int: number of keys deleted
+    """
+    return delete_in_chunks(
+        IdempotencyKey.objects.filter(expires_at__lte=timezone.now()), 'expires_at', batch_size, pause
+    )
+
+
+class IdempotentPostMixin:
+    """Make a view's POST handler idempotent for authenticated users.
+
+    Requests without a key, and anonymous requests (whose guest cart
+    lives in a cookie, not the database), run as usual.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        key = get_request_key(request) if request.method == 'POST' else None
+        if key is None or not request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+
+        record, claimed = claim_key(request.user, key)
+        if not claimed:
+            if record.status_code is None:
+                record = wait_for_response(record)
+            if record is None or record.status_code is None:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'This request is already being processed'
+                }, status=409)
+            return replay_response(record)
+
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+        store_response(record, response)
+        return response
@@ -0,0 +1,38 @@
+"""Move old completed orders to the archive tables.
+
+Runs in chunked transactions keyed on the order id, so it can be
+stopped and rerun at any time. Schedule it nightly, e.g.:
+
+    0 4 * * * python manage.py archive_orders
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from orders.archive import BATCH_SIZE, archivable_orders, archive_orders
+
+
+class Command(BaseCommand):
+    help = 'Archive completed orders older than ORDER_ARCHIVE_AFTER_DAYS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.ORDER_ARCHIVE_AFTER_DAYS,
+                            help='Archive completed orders registered more than this many days ago')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help='Orders moved per transaction')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only count the orders that would be archived')
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['days'])
+        if options['dry_run']:
+            self.stdout.write(f'{archivable_orders(before).count()} order(s) would be archived')
+            return
+
+        archived = 0
+        for moved in archive_orders(before, options['batch_size']):
+            archived += moved
+            self.stdout.write(f'Archived {archived} order(s)')
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} order(s) registered before {before:%Y-%m-%d}'))
@@ -0,0 +1,69 @@
+"""Check stored order totals against their lines and delivery cost.
+
+Walks placed orders in id-range chunks with vectorized recomputation,
+so it is safe to run over the whole history. With ``--fix`` the
+expected totals are written back in bulk. Legacy orders without a
+delivery row are skipped and counted separately.
+"""
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.audit import CHUNK_SIZE, SOURCES, audit_order_totals
+
+
+class Command(BaseCommand):
+    help = 'Report (and optionally fix) orders whose total does not match lines plus delivery cost'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', choices=list(SOURCES), default='live',
+                            help='Audit live or archived orders')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                            help='Order ids covered per chunk')
+        parser.add_argument('--fix', action='store_true',
+                            help='Write the expected totals of mismatching orders')
+        parser.add_argument('--output',
+                            help='Write mismatches to this CSV file')
+        parser.add_argument('--show', type=int, default=20,
+                            help='Mismatches printed to the console')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+        writer = None
+        output = open(options['output'], 'w', newline='', encoding='utf-8') if options['output'] else None
+        if output is not None:
+            writer = csv.writer(output)
+            writer.writerow(['order_id', 'stored', 'expected', 'difference'])
+
+        found = skipped = 0
+        try:
+            for upper, mismatches, no_delivery in audit_order_totals(
+                options['source'], options['chunk_size'], options['fix']
+            ):
+                skipped += len(no_delivery)
+                if no_delivery and options['verbosity'] > 1:
+                    self.stdout.write(f"Skipped orders without a delivery row: {', '.join(map(str, no_delivery))}")
+                for mismatch in mismatches:
+                    if found < options['show']:
+                        self.stdout.write(
+                            f'Order {mismatch.order_id}: stored {mismatch.stored}, '
+                            f'expected {mismatch.expected} ({mismatch.difference:+})'
+                        )
+                    if writer is not None:
+                        writer.writerow([mismatch.order_id, mismatch.stored, mismatch.expected, mismatch.difference])
+                    found += 1
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'Checked up to order {upper}, {found} mismatch(es)')
+        finally:
+            if output is not None:
+                output.close()
+
+        message = f'{found} order(s) with a wrong total'
+        if options['fix'] and found:
+            message += ', fixed'
+        if skipped:
+            self.stdout.write(self.style.WARNING(
+                f'{skipped} order(s) without a delivery row skipped (legacy totals, not checked)'
+            ))
+        self.stdout.write(self.style.SUCCESS(message) if not found or options['fix'] else self.style.WARNING(message))
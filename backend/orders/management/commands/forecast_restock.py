@@ -0,0 +1,24 @@
+"""Recompute restock suggestions for the whole catalog.
+
+Run nightly after the sales rollups, e.g.:
+
+    30 4 * * * python manage.py forecast_restock
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from orders.forecasting import forecast_restock
+from orders.models import RestockSuggestion
+
+
+class Command(BaseCommand):
+    help = 'Forecast demand and write restock suggestions'
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        written = forecast_restock()
+        urgent = RestockSuggestion.objects.filter(urgency__gte=RestockSuggestion.Urgency.CRITICAL).count()
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {written} suggestion(s), {urgent} urgent, in {time.monotonic() - started:.1f}s'
+        ))
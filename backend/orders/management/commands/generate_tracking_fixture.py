@@ -0,0 +1,75 @@
+"""Write a fake carrier tracking file for local benchmarks.
+
+Picks deliveries that have a tracking number (optionally assigning fake
+numbers to those without one first) and emits plausible status updates,
+mixed with a share of unknown parcels and malformed rows.
+"""
+import csv
+import json
+import random
+import sys
+
+from django.core.management.base import BaseCommand
+
+from orders.models import Delivery
+
+CARRIER_STATUSES = ['picked_up', 'in_transit', 'out_for_delivery', 'delivered', 'exception', 'returned']
+
+
+class Command(BaseCommand):
+    help = 'Generate a fake carrier tracking file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=10000, help='Rows to generate')
+        parser.add_argument('--output', default='-', help="Output file, or '-' for stdout")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv')
+        parser.add_argument('--noise', type=float, default=0.05,
+                            help='Share of unknown or malformed rows')
+        parser.add_argument('--assign', action='store_true',
+                            help='Give fake tracking numbers to deliveries without one')
+        parser.add_argument('--seed', type=int, help='Random seed for repeatable files')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        if options['assign']:
+            self._assign_tracking_numbers()
+
+        tracking_numbers = list(
+            Delivery.objects.exclude(tracking_number__isnull=True)
+            .values_list('tracking_number', flat=True)[:options['count']]
+        )
+        if not tracking_numbers:
+            self.stderr.write('No deliveries with tracking numbers; use --assign')
+            return
+
+        rows = (self._row(rng, tracking_numbers, options['noise']) for _ in range(options['count']))
+        stream = sys.stdout if options['output'] == '-' else open(options['output'], 'w', newline='', encoding='utf-8')
+        try:
+            if options['format'] == 'csv':
+                writer = csv.DictWriter(stream, fieldnames=['tracking_number', 'status', 'delivered_on'])
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                for row in rows:
+                    stream.write(json.dumps(row) + '\n')
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+                self.stdout.write(self.style.SUCCESS(f"Wrote {options['count']} rows to {options['output']}"))
+
+    def _row(self, rng, tracking_numbers, noise):
+        roll = rng.random()
+        if roll < noise / 2:
+            return {'tracking_number': f'UNKNOWN{rng.randrange(10 ** 9)}', 'status': 'in_transit', 'delivered_on': ''}
+        if roll < noise:
+            return {'tracking_number': rng.choice(tracking_numbers), 'status': 'lost_in_space', 'delivered_on': ''}
+        status = rng.choice(CARRIER_STATUSES)
+        delivered_on = f'2024-01-{rng.randint(1, 28):02d}' if status == 'delivered' else ''
+        return {'tracking_number': rng.choice(tracking_numbers), 'status': status, 'delivered_on': delivered_on}
+
+    def _assign_tracking_numbers(self):
+        deliveries = list(Delivery.objects.filter(tracking_number__isnull=True).only('id'))
+        for delivery in deliveries:
+            delivery.tracking_number = f'FAKE{delivery.id.hex[:16].upper()}'
+        Delivery.objects.bulk_update(deliveries, ['tracking_number'], batch_size=1000)
+        self.stdout.write(f'Assigned {len(deliveries)} fake tracking numbers')
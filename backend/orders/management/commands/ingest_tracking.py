@@ -0,0 +1,42 @@
+"""Apply a carrier tracking file to deliveries.
+
+Reads CSV, JSON Lines or JSON from a file or stdin ('-') and applies the
+updates in batches, printing how many rows matched, changed and were
+rejected.
+"""
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.tracking import BATCH_SIZE, ingest_tracking_updates, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Ingest carrier tracking updates from a CSV/JSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Carrier file, or '-' for stdin")
+        parser.add_argument('--format', choices=['csv', 'jsonl', 'json'],
+                            help='File format, guessed from the extension by default')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help='Tracking numbers matched per query')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or self._guess_format(path)
+
+        if path == '-':
+            report = ingest_tracking_updates(read_rows(sys.stdin, file_format), options['batch_size'])
+        else:
+            try:
+                with open(path, newline='', encoding='utf-8') as stream:
+                    report = ingest_tracking_updates(read_rows(stream, file_format), options['batch_size'])
+            except OSError as e:
+                raise CommandError(f'Cannot read {path}: {e}')
+        self.stdout.write(self.style.SUCCESS(f'Tracking ingested: {report}'))
+
+    def _guess_format(self, path):
+        for extension in ('jsonl', 'json', 'csv'):
+            if path.endswith(f'.{extension}'):
+                return extension
+        return 'csv'
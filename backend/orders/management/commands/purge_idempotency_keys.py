@@ -0,0 +1,28 @@
+"""Purge expired idempotency keys.
+
+Every cart action and order placement with a key stores a row with a
+copy of its response for ``IDEMPOTENCY_KEY_TTL`` seconds (a day by
+default). Expired keys are no longer replayed, but their rows stay
+until this command deletes them, so without it the table grows by one
+row per request. Run it daily:
+
+    0 4 * * * python manage.py purge_idempotency_keys
+"""
+from django.core.management.base import BaseCommand
+
+from orders.idempotency import purge_expired_keys
+from orders.sweeper import PAUSE
+
+
+class Command(BaseCommand):
+    help = 'Delete expired idempotency keys in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Keys deleted per statement')
+        parser.add_argument('--pause', type=float, default=PAUSE,
+                            help='Seconds to sleep between chunks')
+
+    def handle(self, *args, **options):
+        purged = purge_expired_keys(batch_size=options['batch_size'], pause=options['pause'])
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} expired idempotency keys'))
@@ -0,0 +1,27 @@
+"""Release expired checkout stock reservations.
+
+A hold past ``STOCK_RESERVATION_TTL`` no longer counts against
+availability, but its row stays until this command deletes it, and
+every availability check sums over the rows left. Run it a few times
+per TTL, e.g. every five minutes:
+
+    */5 * * * * python manage.py release_reservations
+"""
+from django.core.management.base import BaseCommand
+
+from orders.sweeper import PAUSE
+from orders.utils import release_expired_reservations
+
+
+class Command(BaseCommand):
+    help = 'Delete expired stock reservations in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Reservations deleted per statement')
+        parser.add_argument('--pause', type=float, default=PAUSE,
+                            help='Seconds to sleep between chunks')
+
+    def handle(self, *args, **options):
+        released = release_expired_reservations(batch_size=options['batch_size'], pause=options['pause'])
+        self.stdout.write(self.style.SUCCESS(f'Released {released} expired reservations'))
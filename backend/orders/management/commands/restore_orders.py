@@ -0,0 +1,20 @@
+"""Move archived orders back to the live tables, e.g. for a dispute."""
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.archive import restore_orders
+from orders.models import ArchivedOrder
+
+
+class Command(BaseCommand):
+    help = 'Restore archived orders by uuid'
+
+    def add_arguments(self, parser):
+        parser.add_argument('uuids', nargs='+', help='Order uuids to restore')
+
+    def handle(self, *args, **options):
+        archived = ArchivedOrder.objects.filter(uuid__in=options['uuids'])
+        missing = set(options['uuids']) - {str(uuid) for uuid in archived.values_list('uuid', flat=True)}
+        if missing:
+            raise CommandError(f'Not in the archive: {", ".join(sorted(missing))}')
+        restored = restore_orders(archived)
+        self.stdout.write(self.style.SUCCESS(f'Restored {restored} order(s)'))
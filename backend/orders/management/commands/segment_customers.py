@@ -0,0 +1,25 @@
+"""Recompute customer RFM segments.
+
+Run nightly, e.g.:
+
+    45 4 * * * python manage.py segment_customers
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from orders.models import CustomerSegment
+from orders.segmentation import segment_customers
+
+
+class Command(BaseCommand):
+    help = 'Score customers by recency, frequency and monetary value and store their segments'
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        sizes = segment_customers()
+        for segment in CustomerSegment.Segment:
+            self.stdout.write(f'{segment.label}: {sizes.get(segment.value, 0)}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Segmented {sum(sizes.values())} customer(s) in {time.monotonic() - started:.1f}s'
+        ))
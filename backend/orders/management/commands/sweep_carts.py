@@ -0,0 +1,48 @@
+"""Delete empty carts, abandoned carts and expired sessions.
+
+Deletes in small chunks with a pause in between, so it is safe to run
+during peak hours (cron, systemd timer), e.g. hourly:
+
+    0 * * * * python manage.py sweep_carts
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from orders.sweeper import (
+    BATCH_SIZE, PAUSE, abandoned_carts, clear_expired_sessions, delete_in_chunks, empty_carts,
+    expired_sessions
+)
+
+
+class Command(BaseCommand):
+    help = 'Delete empty and abandoned carts and expired sessions in rate-limited chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.CART_ABANDONED_AFTER_DAYS,
+                            help='Delete carts untouched for this many days')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help='Rows deleted per statement')
+        parser.add_argument('--pause', type=float, default=PAUSE,
+                            help='Seconds to sleep between chunks')
+        parser.add_argument('--skip-sessions', action='store_true',
+                            help='Leave expired sessions alone')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only count what would be deleted')
+
+    def handle(self, *args, **options):
+        batch_size, pause = options['batch_size'], options['pause']
+        if options['dry_run']:
+            self.stdout.write(f'{empty_carts().count()} empty cart(s)')
+            self.stdout.write(f'{abandoned_carts(options["days"]).count()} abandoned cart(s)')
+            if not options['skip_sessions']:
+                self.stdout.write(f'{expired_sessions().count()} expired session(s)')
+            return
+
+        deleted = delete_in_chunks(empty_carts(), 'updated_at', batch_size, pause)
+        self.stdout.write(f'Deleted {deleted} empty cart(s)')
+        deleted = delete_in_chunks(abandoned_carts(options['days']), 'updated_at', batch_size, pause)
+        self.stdout.write(f'Deleted {deleted} abandoned cart(s)')
+        if not options['skip_sessions']:
+            deleted = clear_expired_sessions(batch_size, pause)
+            self.stdout.write('Cleared expired sessions' if deleted is None else f'Deleted {deleted} expired session(s)')
+        self.stdout.write(self.style.SUCCESS('Sweep finished'))
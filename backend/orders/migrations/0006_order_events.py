@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:31
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def backfill_order_events(apps, schema_editor):
+    """Seed each existing order's timeline with its current status.
+
+    Uses the best-known timestamp for that status.
+    """
+    Order = apps.get_model('orders', 'Order')
+    OrderEvent = apps.get_model('orders', 'OrderEvent')
+    batch = []
+    for order in Order.objects.only('pk', 'status', 'registered_at', 'called_at', 'delivered_at').iterator():
+        if order.status == 'C':
+            created_at = order.delivered_at or order.called_at or order.registered_at
+        elif order.status in ('P', 'S'):
+            created_at = order.called_at or order.registered_at
+        else:
+            created_at = order.registered_at
+        batch.append(OrderEvent(order_id=order.pk, kind='order', status=order.status, created_at=created_at))
+        if len(batch) >= 1000:
+            OrderEvent.objects.bulk_create(batch)
+            batch = []
+    OrderEvent.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_order_history_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('order', 'Order status'), ('delivery', 'Delivery status')], default='order', max_length=10)),
+                ('from_status', models.CharField(blank=True, max_length=20)),
+                ('status', models.CharField(max_length=20)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='orders.order')),
+            ],
+            options={
+                'verbose_name': 'Order Event',
+                'verbose_name_plural': 'Order Events',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['order', 'created_at'], name='orders_orde_order_i_4c5f76_idx'), models.Index(fields=['status', 'created_at'], name='orders_orde_status_6cf641_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_order_events, migrations.RunPython.noop),
+    ]
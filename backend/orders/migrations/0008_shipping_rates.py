@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:37
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_idempotency_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShippingRateTable',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(unique=True)),
+                ('is_active', models.BooleanField(db_index=True, default=False)),
+                ('notes', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Shipping Rate Table',
+                'verbose_name_plural': 'Shipping Rate Tables',
+                'ordering': ['-version'],
+            },
+        ),
+        migrations.AddField(
+            model_name='delivery',
+            name='rate_version',
+            field=models.PositiveIntegerField(blank=True, help_text='Shipping rate table version the cost was quoted from', null=True),
+        ),
+        migrations.CreateModel(
+            name='ShippingRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(choices=[('standard', 'Standard Delivery (5-7 days)'), ('express', 'Express Delivery (2-3 days)'), ('overnight', 'Overnight Delivery (Next day)'), ('pickup', 'In-Store Pickup')], max_length=20)),
+                ('zone', models.CharField(choices=[('domestic', 'Domestic'), ('international', 'International')], default='domestic', max_length=20)),
+                ('base_cost', models.DecimalField(decimal_places=2, max_digits=8, validators=[django.core.validators.MinValueValidator(0)])),
+                ('per_kg_cost', models.DecimalField(decimal_places=2, default=0, max_digits=8, validators=[django.core.validators.MinValueValidator(0)])),
+                ('included_weight', models.PositiveIntegerField(default=2000, help_text='Grams covered by the base cost')),
+                ('free_over', models.DecimalField(blank=True, decimal_places=2, help_text='Subtotal from which shipping is free', max_digits=10, null=True)),
+                ('min_days', models.PositiveSmallIntegerField(default=0)),
+                ('max_days', models.PositiveSmallIntegerField(default=0)),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rates', to='orders.shippingratetable')),
+            ],
+            options={
+                'verbose_name': 'Shipping Rate',
+                'verbose_name_plural': 'Shipping Rates',
+                'unique_together': {('table', 'method', 'zone')},
+            },
+        ),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:47
+
+import django.db.models.deletion
+import django.utils.timezone
+import phonenumber_field.modelfields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0009_sales_rollups'),
+        ('store', '0003_product_weight'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('uuid', models.UUIDField(editable=False, unique=True)),
+                ('status', models.CharField(choices=[('N', 'New order'), ('P', 'Processed'), ('S', 'Shipped order'), ('C', 'Completed order')], max_length=1)),
+                ('address', models.TextField()),
+                ('is_draft', models.BooleanField(default=False)),
+                ('order_note', models.TextField(blank=True, max_length=200)),
+                ('registered_at', models.DateTimeField()),
+                ('called_at', models.DateTimeField(blank=True, null=True)),
+                ('delivered_at', models.DateTimeField(blank=True, null=True)),
+                ('total_price', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_orders', to='orders.customer')),
+            ],
+            options={
+                'verbose_name': 'Archived Order',
+                'verbose_name_plural': 'Archived Orders',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedDelivery',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('method', models.CharField(choices=[('standard', 'Standard Delivery (5-7 days)'), ('express', 'Express Delivery (2-3 days)'), ('overnight', 'Overnight Delivery (Next day)'), ('pickup', 'In-Store Pickup')], max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in_transit', 'In Transit'), ('out_for_delivery', 'Out for Delivery'), ('delivered', 'Delivered'), ('failed', 'Delivery Failed'), ('returned', 'Returned')], max_length=20)),
+                ('tracking_number', models.CharField(blank=True, db_index=True, max_length=100, null=True)),
+                ('delivery_cost', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('rate_version', models.PositiveIntegerField(blank=True, null=True)),
+                ('estimated_delivery_date', models.DateField(blank=True, null=True)),
+                ('actual_delivery_date', models.DateField(blank=True, null=True)),
+                ('delivery_address', models.TextField()),
+                ('delivery_notes', models.TextField(blank=True)),
+                ('recipient_name', models.CharField(blank=True, max_length=255)),
+                ('recipient_phone', phonenumber_field.modelfields.PhoneNumberField(blank=True, max_length=128, region=None)),
+                ('signature_required', models.BooleanField(default=False)),
+                ('insurance', models.BooleanField(default=False)),
+                ('insurance_cost', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='delivery', to='orders.archivedorder')),
+            ],
+            options={
+                'verbose_name': 'Archived Delivery',
+                'verbose_name_plural': 'Archived Deliveries',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrderElement',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('quantity', models.PositiveIntegerField(default=1)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_items', to='orders.archivedorder')),
+                ('product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_order_elements', to='store.product')),
+            ],
+            options={
+                'verbose_name': 'Archived Order Element',
+                'verbose_name_plural': 'Archived Order Elements',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrderEvent',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('order', 'Order status'), ('delivery', 'Delivery status')], max_length=10)),
+                ('from_status', models.CharField(blank=True, max_length=20)),
+                ('status', models.CharField(max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='orders.archivedorder')),
+            ],
+            options={
+                'verbose_name': 'Archived Order Event',
+                'verbose_name_plural': 'Archived Order Events',
+                'ordering': ['created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['customer', 'is_draft', '-registered_at'], name='orders_arch_custome_c254d0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedorderevent',
+            index=models.Index(fields=['order', 'created_at'], name='orders_arch_order_i_9aa390_idx'),
+        ),
+    ]
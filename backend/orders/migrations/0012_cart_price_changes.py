@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0011_cart_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='prices_changed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='cartitem',
+            name='previous_price',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Price before the last catalog repricing, until shown at checkout', max_digits=10, null=True),
+        ),
+    ]
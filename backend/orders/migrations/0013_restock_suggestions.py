@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:06
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0012_cart_price_changes'),
+        ('store', '0003_product_weight'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RestockSuggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stock', models.PositiveIntegerField(default=0)),
+                ('daily_demand', models.FloatField(default=0)),
+                ('days_of_cover', models.FloatField(blank=True, help_text='Empty when there is no demand', null=True)),
+                ('suggested_quantity', models.PositiveIntegerField(default=0)),
+                ('urgency', models.PositiveSmallIntegerField(choices=[(0, 'Enough stock'), (1, 'Reorder soon'), (2, 'Runs out within lead time'), (3, 'Out of stock')], default=0)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='restock_suggestion', to='store.product')),
+            ],
+            options={
+                'verbose_name': 'Restock Suggestion',
+                'verbose_name_plural': 'Restock Suggestions',
+                'ordering': ['-urgency', 'days_of_cover'],
+                'indexes': [models.Index(fields=['-urgency', 'days_of_cover'], name='orders_rest_urgency_357338_idx')],
+            },
+        ),
+    ]
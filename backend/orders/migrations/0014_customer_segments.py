@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0013_restock_suggestions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('segment', models.CharField(choices=[('champions', 'Champions'), ('loyal', 'Loyal'), ('new', 'New customers'), ('promising', 'Promising'), ('at_risk', 'At risk'), ('hibernating', 'Hibernating'), ('lost', 'Lost'), ('prospect', 'Prospects')], db_index=True, max_length=12)),
+                ('rfm', models.CharField(help_text='Recency, frequency and monetary scores, e.g. 545', max_length=3)),
+                ('recency_days', models.PositiveIntegerField(blank=True, null=True)),
+                ('frequency', models.PositiveIntegerField(default=0)),
+                ('monetary', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='segment', to='orders.customer')),
+            ],
+            options={
+                'verbose_name': 'Customer Segment',
+                'verbose_name_plural': 'Customer Segments',
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0014_customer_segments'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='orderevent',
+            index=models.Index(fields=['created_at'], name='orders_orde_created_45dd1a_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:12
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, PositiveIntegerField, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_cart_weight(apps, schema_editor):
+    Cart = apps.get_model('orders', 'Cart')
+    CartItem = apps.get_model('orders', 'CartItem')
+    items = CartItem.objects.filter(cart=OuterRef('pk')).values('cart')
+    Cart.objects.update(
+        weight=Coalesce(
+            Subquery(items.annotate(total=Sum(F('quantity') * F('product__weight'))).values('total')),
+            Value(0),
+            output_field=PositiveIntegerField(),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0015_order_event_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='weight',
+            field=models.PositiveIntegerField(default=0, help_text='Total item weight in grams'),
+        ),
+        migrations.RunPython(backfill_cart_weight, migrations.RunPython.noop),
+    ]
@@ -5,17 +5,27 @@ Contains models for:
 - Order processing and tracking
 - Customer information
 - Delivery management
+- Stock reservations during checkout
+- Order and delivery status timeline
+- Idempotency keys for retried requests
+- Shipping rate tables
+- Daily sales rollups for reporting
+- Archive tables for old completed orders
+- Restock suggestions from sales forecasts
+- Customer RFM segments for targeting
 """
 import uuid
 from decimal import Decimal
 from typing import Optional
 
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Greatest
 from django.utils import timezone
 from phonenumber_field.modelfields import PhoneNumberField
 
-from store.models import Product
+from store.models import Category, Product
 from users.models import CustomUser
 
 
@@ -69,11 +79,28 @@ class Order(models.Model):
     total_price = models.DecimalField(max_digits=8, decimal_places=2,
                                 validators=[MinValueValidator(0)], default=0)
 
+    is_archived = False
+
     def __str__(self):
         return f"{self.customer.user.username} | {self.status}"
 
+    class Meta:
+        indexes = [
+            # Order history: newest placed orders per customer
+            models.Index(fields=["customer", "is_draft", "-registered_at"]),
+        ]
+
     def calculate_total(self):
-        total = sum(item.total_price for item in self.order_items.all())
+        """Recompute the total as checkout does: lines plus delivery cost.
+
+        ``orders.audit`` applies the same rule to all orders at once.
+        Placed orders without a Delivery row predate delivery records and
+        have shipping baked into their total, so theirs is left as is.
+        """
+        delivery_costs = list(Delivery.objects.filter(order=self).values_list('delivery_cost', flat=True)[:1])
+        if not delivery_costs and not self.is_draft:
+            return self.total_price
+        total = sum(item.total_price for item in self.order_items.all()) + (delivery_costs[0] if delivery_costs else 0)
         self.total_price = total
         self.save(update_fields=["total_price"])
         return total
@@ -158,6 +185,11 @@ class Delivery(models.Model):
         default=0,
         validators=[MinValueValidator(0)]
     )
+    rate_version = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        help_text='Shipping rate table version the cost was quoted from'
+    )
     estimated_delivery_date = models.DateField(blank=True, null=True)
     actual_delivery_date = models.DateField(blank=True, null=True)
     delivery_address = models.TextField()
@@ -190,7 +222,16 @@ class Delivery(models.Model):
 
 
 class Cart(models.Model):
-    """Model representing a shopping cart for a user."""
+    """Model representing a shopping cart for a user.
+    
+    ``item_count``, ``subtotal`` and ``weight`` are a denormalized header
+    kept in step with the cart items through F() expression updates, so
+    totals never require iterating the items. ``weight`` uses product
+    weights as of the last write of each line and only feeds the cart
+    page quote; checkout quotes from the loaded items. ``prices_changed_at`` is set when
+    catalog price changes repriced the items, until checkout has shown
+    the customer what changed.
+    """
     
     id: uuid.UUID = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.OneToOneField(
@@ -198,19 +239,82 @@ class Cart(models.Model):
         on_delete=models.CASCADE,
         related_name="cart"
     )
+    item_count: int = models.PositiveIntegerField(default=0)
+    subtotal: Decimal = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    weight: int = models.PositiveIntegerField(default=0, help_text='Total item weight in grams')
+    prices_changed_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    # Indexed for the empty/abandoned cart sweeper
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self) -> str:
         return f"Cart for {self.user.username}"
 
     def get_total_price(self) -> Decimal:
-        """Calculate total cart value."""
-        return sum(item.get_total_price() for item in self.items.all())
+        """Get total cart value."""
+        return self.subtotal
 
     def get_total_items(self) -> int:
         """Get total number of items in cart."""
-        return sum(item.quantity for item in self.items.all())
+        return self.item_count
+
+    @staticmethod
+    def adjust_totals(cart_id, quantity, amount, weight=0) -> None:
+        """Shift the cart header by a delta in a single UPDATE.
+        
+        ``weight`` is clamped at zero: a product made heavier after it
+        was added would otherwise take off more than the line put on.
+        """
+        Cart.objects.filter(pk=cart_id).update(
+            item_count=F('item_count') + quantity,
+            subtotal=F('subtotal') + amount,
+            weight=Greatest(F('weight') + weight, 0),
+            updated_at=timezone.now(),
+        )
+
+    def shift_totals(self, quantity, amount, weight=0) -> None:
+        """Apply ``adjust_totals`` and the same delta to this loaded header.
+        
+        Lets views answer with the new totals without reading the cart
+        back after the write.
+        """
+        Cart.adjust_totals(self.pk, quantity, amount, weight)
+        self.item_count += quantity
+        self.subtotal += amount
+        self.weight = max(self.weight + weight, 0)
+
+    def clear(self) -> None:
+        """Delete all items and zero the header."""
+        with transaction.atomic():
+            self.items.all().delete()
+            Cart.objects.filter(pk=self.pk).update(
+                item_count=0, subtotal=0, weight=0, updated_at=timezone.now()
+            )
+        self.item_count = 0
+        self.subtotal = Decimal('0.00')
+        self.weight = 0
+
+    def recalculate_totals(self) -> None:
+        """Rebuild the header from the items with one aggregate.
+        
+        Reconciliation fallback for writes that bypass
+        ``CartItem.save()``/``delete()`` (bulk updates) and for product
+        weights edited since their lines were written.
+        """
+        totals = self.items.aggregate(
+            item_count=Sum('quantity'),
+            subtotal=Sum(F('price') * F('quantity')),
+            weight=Sum(F('quantity') * F('product__weight')),
+        )
+        self.item_count = totals['item_count'] or 0
+        self.subtotal = totals['subtotal'] or Decimal('0.00')
+        self.weight = totals['weight'] or 0
+        Cart.objects.filter(pk=self.pk).update(
+            item_count=self.item_count,
+            subtotal=self.subtotal,
+            weight=self.weight,
+            updated_at=timezone.now(),
+        )
 
     class Meta:
         verbose_name = 'Cart'
@@ -233,12 +337,63 @@ class CartItem(models.Model):
     )
     quantity: int = models.PositiveIntegerField(default=1)
     price: Decimal = models.DecimalField(max_digits=10, decimal_places=2)
+    previous_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        blank=True,
+        null=True,
+        help_text='Price before the last catalog repricing, until shown at checkout'
+    )
     added_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self) -> str:
         return f"{self.quantity}x {self.product.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember stored values so save()/delete() can push deltas to the cart
+        instance._stored_totals = (
+            instance.__dict__.get('quantity', 0),
+            instance.__dict__.get('price') or Decimal('0.00'),
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Save item and shift the cart header by the change."""
+        if self._state.adding:
+            stored = (0, Decimal('0.00'))
+        else:
+            stored = getattr(self, '_stored_totals', None)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if stored is None:
+                self.cart.recalculate_totals()
+            else:
+                old_quantity, old_price = stored
+                self._shift_cart(
+                    self.quantity - old_quantity,
+                    self.get_total_price() - old_price * old_quantity,
+                    (self.quantity - old_quantity) * self.product.weight,
+                )
+        self._stored_totals = (self.quantity, self.price)
+
+    def delete(self, *args, **kwargs):
+        """Delete item and take its value off the cart header."""
+        quantity, price = getattr(self, '_stored_totals', (self.quantity, self.price))
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            self._shift_cart(-quantity, -(price * quantity), -quantity * self.product.weight)
+        return result
+
+    def _shift_cart(self, quantity, amount, weight):
+        """Shift the cart header, and the loaded cart if there is one."""
+        if CartItem.cart.is_cached(self):
+            self.cart.shift_totals(quantity, amount, weight)
+        else:
+            Cart.adjust_totals(self.cart_id, quantity, amount, weight)
+
     def get_total_price(self) -> Decimal:
         """Calculate total price for this item."""
         return self.price * self.quantity
@@ -251,3 +406,445 @@ class CartItem(models.Model):
             models.Index(fields=["cart"]),
             models.Index(fields=["product"]),
         ]
+
+
+
+class StockReservation(models.Model):
+    """Model representing a temporary hold on product stock.
+
+    Created when a customer enters checkout and consumed when the
+    order is placed. Expired holds stop counting immediately and are
+    removed in batches by the ``release_reservations`` command.
+    """
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="reservations"
+    )
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name="stock_reservations"
+    )
+    quantity: int = models.PositiveIntegerField()
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"{self.quantity}x {self.product_id} for {self.user_id}"
+
+    class Meta:
+        verbose_name = 'Stock Reservation'
+        verbose_name_plural = 'Stock Reservations'
+        unique_together = ('user', 'product')
+        indexes = [
+            models.Index(fields=["product", "expires_at"]),
+        ]
+
+
+class OrderEvent(models.Model):
+    """Model representing one status transition of an order or its delivery.
+    
+    Appended by ``orders.transitions``; never edited. Indexed for
+    per-order timelines and for "how long in status X" dashboards.
+    """
+    class Kind(models.TextChoices):
+        ORDER = "order", "Order status"
+        DELIVERY = "delivery", "Delivery status"
+
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name="events"
+    )
+    kind = models.CharField(max_length=10, choices=Kind.choices, default=Kind.ORDER)
+    from_status = models.CharField(max_length=20, blank=True)
+    status = models.CharField(max_length=20)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self) -> str:
+        return f"{self.order_id}: {self.from_status or '-'} -> {self.status}"
+
+    class Meta:
+        verbose_name = 'Order Event'
+        verbose_name_plural = 'Order Events'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=["order", "created_at"]),
+            models.Index(fields=["status", "created_at"]),
+            models.Index(fields=["created_at"]),
+        ]
+
+
+class IdempotencyKey(models.Model):
+    """Model storing the response to a request sent with an idempotency key.
+
+    A row is claimed before the request runs (``status_code`` is null
+    while in flight) and completed with a compact copy of the response:
+    the redirect location or the JSON body. Replays with the same key
+    return that copy without running the view again. Expired keys are
+    removed in batches by the ``purge_idempotency_keys`` command.
+    """
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name="idempotency_keys"
+    )
+    key: str = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    content_type: str = models.CharField(max_length=100, blank=True)
+    body: str = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self) -> str:
+        return f"{self.key} for {self.user_id}"
+
+    class Meta:
+        verbose_name = 'Idempotency Key'
+        verbose_name_plural = 'Idempotency Keys'
+        unique_together = ('user', 'key')
+
+
+class ShippingRateTable(models.Model):
+    """Model representing a versioned set of shipping rates.
+
+    Exactly one table is active at a time. Rates are read into memory
+    by ``orders.shipping`` and every delivery records the version its
+    cost was quoted from, so edited prices never rewrite history:
+    publish a new version instead of changing an active one.
+    """
+    version = models.PositiveIntegerField(unique=True)
+    is_active = models.BooleanField(default=False, db_index=True)
+    notes = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"Rates v{self.version}{' (active)' if self.is_active else ''}"
+
+    class Meta:
+        verbose_name = 'Shipping Rate Table'
+        verbose_name_plural = 'Shipping Rate Tables'
+        ordering = ['-version']
+
+
+class ShippingRate(models.Model):
+    """Model representing the price of one delivery method in one zone.
+
+    Cost is ``base_cost`` plus ``per_kg_cost`` for every started
+    kilogram above ``included_weight``; orders whose subtotal reaches
+    ``free_over`` ship free.
+    """
+    class Zone(models.TextChoices):
+        DOMESTIC = "domestic", "Domestic"
+        INTERNATIONAL = "international", "International"
+
+    table = models.ForeignKey(
+        ShippingRateTable,
+        on_delete=models.CASCADE,
+        related_name="rates"
+    )
+    method = models.CharField(max_length=20, choices=Delivery.DeliveryMethod.choices)
+    zone = models.CharField(max_length=20, choices=Zone.choices, default=Zone.DOMESTIC)
+    base_cost = models.DecimalField(max_digits=8, decimal_places=2, validators=[MinValueValidator(0)])
+    per_kg_cost = models.DecimalField(max_digits=8, decimal_places=2, default=0, validators=[MinValueValidator(0)])
+    included_weight = models.PositiveIntegerField(default=2000, help_text='Grams covered by the base cost')
+    free_over = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        blank=True,
+        null=True,
+        help_text='Subtotal from which shipping is free'
+    )
+    min_days = models.PositiveSmallIntegerField(default=0)
+    max_days = models.PositiveSmallIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.get_method_display()} / {self.get_zone_display()} (v{self.table.version})"
+
+    class Meta:
+        verbose_name = 'Shipping Rate'
+        verbose_name_plural = 'Shipping Rates'
+        unique_together = ('table', 'method', 'zone')
+
+
+class DailyProductSales(models.Model):
+    """Model holding units and revenue sold per product per day.
+
+    Rollup rows are rebuilt by ``orders.rollups`` from placed orders;
+    the day is the local date the order was registered.
+    """
+    day = models.DateField()
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="daily_sales"
+    )
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    def __str__(self) -> str:
+        return f"{self.day} {self.product_id}: {self.units}"
+
+    class Meta:
+        verbose_name = 'Daily Product Sales'
+        verbose_name_plural = 'Daily Product Sales'
+        unique_together = ('day', 'product')
+        ordering = ['-day']
+
+
+class DailyCategorySales(models.Model):
+    """Model holding units and revenue sold per category per day."""
+    day = models.DateField()
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name="daily_sales"
+    )
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    def __str__(self) -> str:
+        return f"{self.day} {self.category_id}: {self.units}"
+
+    class Meta:
+        verbose_name = 'Daily Category Sales'
+        verbose_name_plural = 'Daily Category Sales'
+        unique_together = ('day', 'category')
+        ordering = ['-day']
+
+
+class DailyStatusSales(models.Model):
+    """Model holding order count, units and revenue per order status per day.
+
+    ``revenue`` sums order lines; ``total`` sums order totals including
+    shipping.
+    """
+    day = models.DateField()
+    status = models.CharField(max_length=1, choices=Order.StatusChoice.choices)
+    orders = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    def __str__(self) -> str:
+        return f"{self.day} {self.get_status_display()}: {self.orders}"
+
+    class Meta:
+        verbose_name = 'Daily Status Sales'
+        verbose_name_plural = 'Daily Status Sales'
+        unique_together = ('day', 'status')
+        ordering = ['-day', 'status']
+
+
+class RollupWatermark(models.Model):
+    """Model recording how far a rollup has consumed the order event log."""
+    name = models.CharField(max_length=50, unique=True)
+    position = models.BigIntegerField(default=0, help_text='Last processed OrderEvent id')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.name} @ {self.position}"
+
+    class Meta:
+        verbose_name = 'Rollup Watermark'
+        verbose_name_plural = 'Rollup Watermarks'
+
+
+class RestockSuggestion(models.Model):
+    """Model holding the latest demand forecast and reorder advice for a product.
+
+    Rewritten as a whole by ``orders.forecasting``; ``daily_demand`` is
+    an exponentially weighted average of daily unit sales.
+    """
+    class Urgency(models.IntegerChoices):
+        OK = 0, "Enough stock"
+        SOON = 1, "Reorder soon"
+        CRITICAL = 2, "Runs out within lead time"
+        OUT_OF_STOCK = 3, "Out of stock"
+
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="restock_suggestion"
+    )
+    stock = models.PositiveIntegerField(default=0)
+    daily_demand = models.FloatField(default=0)
+    days_of_cover = models.FloatField(blank=True, null=True, help_text='Empty when there is no demand')
+    suggested_quantity = models.PositiveIntegerField(default=0)
+    urgency = models.PositiveSmallIntegerField(choices=Urgency.choices, default=Urgency.OK)
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self) -> str:
+        return f"{self.product_id}: {self.get_urgency_display()}"
+
+    class Meta:
+        verbose_name = 'Restock Suggestion'
+        verbose_name_plural = 'Restock Suggestions'
+        ordering = ['-urgency', 'days_of_cover']
+        indexes = [
+            models.Index(fields=["-urgency", "days_of_cover"]),
+        ]
+
+
+class CustomerSegment(models.Model):
+    """Model holding a customer's RFM scores and segment label.
+
+    Rewritten as a whole by ``orders.segmentation``. Scores run from 1
+    to 5 (5 is best: most recent, most frequent, biggest spender) and
+    are quantile buckets over all buying customers; customers without
+    orders are prospects with zero scores.
+    """
+    class Segment(models.TextChoices):
+        CHAMPIONS = "champions", "Champions"
+        LOYAL = "loyal", "Loyal"
+        NEW = "new", "New customers"
+        PROMISING = "promising", "Promising"
+        AT_RISK = "at_risk", "At risk"
+        HIBERNATING = "hibernating", "Hibernating"
+        LOST = "lost", "Lost"
+        PROSPECT = "prospect", "Prospects"
+
+    customer = models.OneToOneField(
+        Customer,
+        on_delete=models.CASCADE,
+        related_name="segment"
+    )
+    segment = models.CharField(max_length=12, choices=Segment.choices, db_index=True)
+    rfm = models.CharField(max_length=3, help_text='Recency, frequency and monetary scores, e.g. 545')
+    recency_days = models.PositiveIntegerField(blank=True, null=True)
+    frequency = models.PositiveIntegerField(default=0)
+    monetary = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self) -> str:
+        return f"{self.customer_id}: {self.get_segment_display()} ({self.rfm})"
+
+    class Meta:
+        verbose_name = 'Customer Segment'
+        verbose_name_plural = 'Customer Segments'
+
+
+# ===== Order Archive =====
+
+class ArchivedOrder(models.Model):
+    """Model holding a completed order moved out of the hot tables.
+
+    Archive tables mirror ``Order``, ``OrderElement``, ``Delivery`` and
+    ``OrderEvent`` column for column and keep the original primary
+    keys, so rows are moved with INSERT ... SELECT by
+    ``orders.archive`` and restored the same way.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    uuid = models.UUIDField(editable=False, unique=True)
+    status = models.CharField(max_length=1, choices=Order.StatusChoice.choices)
+    customer = models.ForeignKey(
+        Customer,
+        on_delete=models.CASCADE,
+        related_name="archived_orders",
+    )
+    address = models.TextField()
+    is_draft = models.BooleanField(default=False)
+    order_note = models.TextField(max_length=200, blank=True)
+    registered_at = models.DateTimeField()
+    called_at = models.DateTimeField(blank=True, null=True)
+    delivered_at = models.DateTimeField(blank=True, null=True)
+    total_price = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    is_archived = True
+
+    def __str__(self):
+        return f"{self.customer.user.username} | {self.status} (archived)"
+
+    class Meta:
+        verbose_name = 'Archived Order'
+        verbose_name_plural = 'Archived Orders'
+        indexes = [
+            models.Index(fields=["customer", "is_draft", "-registered_at"]),
+        ]
+
+
+class ArchivedOrderElement(models.Model):
+    """Model holding a line of an archived order."""
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(
+        ArchivedOrder,
+        on_delete=models.CASCADE,
+        related_name="order_items"
+    )
+    product = models.ForeignKey(
+        Product,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="archived_order_elements"
+    )
+    price = models.DecimalField(max_digits=8, decimal_places=2)
+    quantity = models.PositiveIntegerField(default=1)
+
+    @property
+    def total_price(self) -> Decimal:
+        return self.price * self.quantity
+
+    class Meta:
+        verbose_name = 'Archived Order Element'
+        verbose_name_plural = 'Archived Order Elements'
+
+
+class ArchivedDelivery(models.Model):
+    """Model holding the delivery of an archived order."""
+    id = models.UUIDField(primary_key=True, editable=False)
+    order = models.OneToOneField(
+        ArchivedOrder,
+        on_delete=models.CASCADE,
+        related_name="delivery"
+    )
+    method = models.CharField(max_length=20, choices=Delivery.DeliveryMethod.choices)
+    status = models.CharField(max_length=20, choices=Delivery.DeliveryStatus.choices)
+    tracking_number = models.CharField(max_length=100, blank=True, null=True, db_index=True)
+    delivery_cost = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    rate_version = models.PositiveIntegerField(blank=True, null=True)
+    estimated_delivery_date = models.DateField(blank=True, null=True)
+    actual_delivery_date = models.DateField(blank=True, null=True)
+    delivery_address = models.TextField()
+    delivery_notes = models.TextField(blank=True)
+    recipient_name = models.CharField(max_length=255, blank=True)
+    recipient_phone = PhoneNumberField(blank=True)
+    signature_required = models.BooleanField(default=False)
+    insurance = models.BooleanField(default=False)
+    insurance_cost = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"Delivery for archived Order {self.order_id} - {self.get_status_display()}"
+
+    class Meta:
+        verbose_name = 'Archived Delivery'
+        verbose_name_plural = 'Archived Deliveries'
+
+
+class ArchivedOrderEvent(models.Model):
+    """Model holding a status transition of an archived order."""
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(
+        ArchivedOrder,
+        on_delete=models.CASCADE,
+        related_name="events"
+    )
+    kind = models.CharField(max_length=10, choices=OrderEvent.Kind.choices)
+    from_status = models.CharField(max_length=20, blank=True)
+    status = models.CharField(max_length=20)
+    created_at = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"{self.order_id}: {self.from_status or '-'} -> {self.status}"
+
+    class Meta:
+        verbose_name = 'Archived Order Event'
+        verbose_name_plural = 'Archived Order Events'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=["order", "created_at"]),
+        ]
@@ -0,0 +1,222 @@
+"""Daily sales rollups.
+
+Keeps ``DailyProductSales``, ``DailyCategorySales`` and
+``DailyStatusSales`` in step with placed orders so reports never scan
+order lines. Every placed order and status change appends an
+``OrderEvent``; ``refresh_sales_rollups`` reads events past its
+watermark, rebuilds only the days those orders were registered on and
+moves the watermark, so a rerun with nothing new or recent costs two
+queries. History is rebuilt in date-range chunks by
+``backfill_sales_rollups``. Archived orders are read alongside hot
+ones, so rebuilding an old day after ``archive_orders`` keeps its
+totals.
+
+Event ids are handed out before commit, so a slow transaction can
+commit an event below a watermark that has already moved past it.
+Each refresh therefore also re-reads the events created since
+``ROLLUP_REFRESH_LAG`` seconds before the previous refresh started;
+the lag must exceed the longest transaction that writes events.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core.jobs import job
+from core.models import Job
+from orders.models import (
+    ArchivedOrder, ArchivedOrderElement, DailyCategorySales, DailyProductSales, DailyStatusSales, Order,
+    OrderElement, OrderEvent, RollupWatermark
+)
+
+WATERMARK = 'daily_sales'
+CHUNK_DAYS = 31
+
+# (order model, line model) pairs read by rebuilds
+SOURCES = [(Order, OrderElement), (ArchivedOrder, ArchivedOrderElement)]
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _day_groups(days, chunk_days=CHUNK_DAYS):
+    """Split sorted days into groups spanning at most ``chunk_days``."""
+    group = []
+    for day in sorted(days):
+        if group and (day - group[0]).days >= chunk_days:
+            yield group
+            group = []
+        group.append(day)
+    if group:
+        yield group
+
+
+# ===== Rebuilding =====
+
+def rebuild_days(days, chunk_days=CHUNK_DAYS):
+    """Recompute the rollups of the given local dates.
+
+    Each group of up to ``chunk_days`` consecutive days costs two
+    aggregate queries per source (hot and archived orders), one delete
+    per table and one insert per table.
+
+    Returns:
+        int: number of days rebuilt
+    """
+    rebuilt = 0
+    for group in _day_groups(set(days), chunk_days):
+        wanted = set(group)
+        start, end = _day_start(group[0]), _day_start(group[-1] + timedelta(days=1))
+
+        products = defaultdict(lambda: [0, Decimal('0.00')])
+        categories = defaultdict(lambda: [0, Decimal('0.00')])
+        statuses = defaultdict(lambda: [0, Decimal('0.00')])
+        placed = defaultdict(lambda: [0, Decimal('0.00')])
+        for order_model, line_model in SOURCES:
+            lines = (
+                line_model.objects.filter(
+                    order__is_draft=False, order__registered_at__gte=start, order__registered_at__lt=end
+                )
+                .annotate(day=TruncDate('order__registered_at'))
+                .values('day', 'order__status', 'product_id', 'product__category_id')
+                .annotate(units=Sum('quantity'), revenue=Sum(F('price') * F('quantity')))
+                .order_by()
+            )
+            orders = (
+                order_model.objects.filter(is_draft=False, registered_at__gte=start, registered_at__lt=end)
+                .annotate(day=TruncDate('registered_at'))
+                .values('day', 'status')
+                .annotate(orders=Count('pk'), total=Sum('total_price'))
+                .order_by()
+            )
+
+            for line in lines:
+                if line['day'] not in wanted:
+                    continue
+                amounts = (line['units'], line['revenue'] or Decimal('0.00'))
+                keys = [(statuses, (line['day'], line['order__status']))]
+                if line['product_id'] is not None:
+                    keys.append((products, (line['day'], line['product_id'])))
+                    keys.append((categories, (line['day'], line['product__category_id'])))
+                for totals, key in keys:
+                    totals[key][0] += amounts[0]
+                    totals[key][1] += amounts[1]
+            for row in orders:
+                if row['day'] in wanted:
+                    placed[row['day'], row['status']][0] += row['orders']
+                    placed[row['day'], row['status']][1] += row['total'] or Decimal('0.00')
+
+        status_rows = []
+        for (day, status), (count, total) in placed.items():
+            units, revenue = statuses.get((day, status), (0, Decimal('0.00')))
+            status_rows.append(DailyStatusSales(
+                day=day, status=status, orders=count, units=units, revenue=revenue, total=total,
+            ))
+
+        with transaction.atomic():
+            for model in (DailyProductSales, DailyCategorySales, DailyStatusSales):
+                model.objects.filter(day__in=group).delete()
+            DailyProductSales.objects.bulk_create([
+                DailyProductSales(day=day, product_id=product_id, units=units, revenue=revenue)
+                for (day, product_id), (units, revenue) in products.items()
+            ])
+            DailyCategorySales.objects.bulk_create([
+                DailyCategorySales(day=day, category_id=category_id, units=units, revenue=revenue)
+                for (day, category_id), (units, revenue) in categories.items()
+            ])
+            DailyStatusSales.objects.bulk_create(status_rows)
+        rebuilt += len(group)
+    return rebuilt
+
+
+def _advance_watermark(position, refreshed_at=None):
+    """Move the watermark forward to ``position``.
+
+    ``refreshed_at`` is when the refresh that read up to ``position``
+    started; the next refresh re-reads events from shortly before it.
+    """
+    watermark, _ = RollupWatermark.objects.get_or_create(name=WATERMARK)
+    if refreshed_at is not None:
+        RollupWatermark.objects.filter(pk=watermark.pk).update(
+            position=max(position, watermark.position), updated_at=refreshed_at
+        )
+    elif position > watermark.position:
+        RollupWatermark.objects.filter(pk=watermark.pk, position__lt=position).update(
+            position=position, updated_at=timezone.now()
+        )
+
+
+# ===== Incremental Refresh =====
+
+@job(max_attempts=3)
+def refresh_sales_rollups():
+    """Rebuild the days touched by order events past the watermark.
+
+    Events created shortly before the previous refresh are read again,
+    in case their transaction committed after it (see module docs).
+
+    Returns:
+        int: number of days rebuilt
+    """
+    started_at = timezone.now()
+    watermark, _ = RollupWatermark.objects.get_or_create(name=WATERMARK)
+    rescan_from = watermark.updated_at - timedelta(seconds=settings.ROLLUP_REFRESH_LAG)
+    events = OrderEvent.objects.filter(Q(pk__gt=watermark.position) | Q(created_at__gte=rescan_from))
+    upper = events.aggregate(upper=Max('pk'))['upper']
+    if upper is None:
+        return 0
+
+    days = (
+        events.filter(pk__lte=upper, kind=OrderEvent.Kind.ORDER)
+        .annotate(day=TruncDate('order__registered_at'))
+        .values_list('day', flat=True)
+        .distinct()
+        .order_by()
+    )
+    rebuilt = rebuild_days(list(days))
+    _advance_watermark(upper, refreshed_at=started_at)
+    return rebuilt
+
+
+def schedule_refresh():
+    """Queue a rollup refresh unless one is already waiting."""
+    if not Job.objects.filter(name=refresh_sales_rollups.job_name, status=Job.StatusChoice.QUEUED).exists():
+        refresh_sales_rollups.delay()
+
+
+# ===== Backfill =====
+
+def backfill_sales_rollups(start, end, chunk_days=CHUNK_DAYS):
+    """Rebuild every day from ``start`` to ``end`` inclusive, one chunk at a time.
+
+    The watermark is moved past all events that existed when the
+    backfill started, so the next refresh only handles newer changes.
+
+    Yields:
+        tuple: (first day, last day) of each finished chunk
+    """
+    upper = OrderEvent.objects.aggregate(upper=Max('pk'))['upper']
+    day = start
+    while day <= end:
+        last = min(day + timedelta(days=chunk_days - 1), end)
+        rebuild_days([day + timedelta(days=offset) for offset in range((last - day).days + 1)], chunk_days)
+        yield day, last
+        day = last + timedelta(days=1)
+    if upper is not None:
+        _advance_watermark(upper)
+
+
+# ===== Reading =====
+
+def sales_totals(queryset):
+    """Sum a filtered rollup queryset for dashboards."""
+    fields = {'units': Sum('units'), 'revenue': Sum('revenue')}
+    if queryset.model is DailyStatusSales:
+        fields.update(orders=Sum('orders'), total=Sum('total'))
+    return queryset.aggregate(**fields)
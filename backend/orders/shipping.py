@@ -0,0 +1,199 @@
+"""Server-side shipping rate engine.
+
+Quotes a delivery method for a cart from its subtotal, weight and
+destination zone. The destination country is kept in the session
+next to the delivery method, so the cart, the checkout page and order
+placement all quote the same zone. The active ``ShippingRateTable`` is held in process
+memory and only re-read when its version changes, which is checked at
+most every ``SHIPPING_RATES_CHECK_INTERVAL`` seconds, so quoting costs
+no queries on the hot path. Built-in defaults apply until a table is
+published in the admin.
+"""
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from orders.models import Delivery, ShippingRate, ShippingRateTable
+
+Method = Delivery.DeliveryMethod
+Zone = ShippingRate.Zone
+
+SESSION_KEY = 'shipping_method'
+COUNTRY_SESSION_KEY = 'shipping_country'
+MAX_COUNTRY_LENGTH = 100
+
+
+class Rate(NamedTuple):
+    base_cost: Decimal
+    per_kg_cost: Decimal
+    included_weight: int
+    free_over: Optional[Decimal]
+    min_days: int
+    max_days: int
+
+
+class ShippingQuote(NamedTuple):
+    """Price and delivery window of one method for one cart."""
+    method: str
+    cost: Decimal
+    min_days: int
+    max_days: int
+    version: Optional[int]
+
+    @property
+    def label(self) -> str:
+        return Method(self.method).label
+
+    @property
+    def estimated_delivery_date(self):
+        return timezone.localdate() + timedelta(days=self.max_days)
+
+
+# Used while no rate table is active (version None)
+DEFAULT_RATES = {
+    (Method.STANDARD, Zone.DOMESTIC): Rate(Decimal('10.00'), Decimal('2.00'), 2000, Decimal('50.00'), 5, 7),
+    (Method.EXPRESS, Zone.DOMESTIC): Rate(Decimal('20.00'), Decimal('3.00'), 2000, None, 2, 3),
+    (Method.OVERNIGHT, Zone.DOMESTIC): Rate(Decimal('35.00'), Decimal('5.00'), 2000, None, 1, 1),
+    (Method.PICKUP, Zone.DOMESTIC): Rate(Decimal('0.00'), Decimal('0.00'), 0, None, 0, 0),
+    (Method.STANDARD, Zone.INTERNATIONAL): Rate(Decimal('25.00'), Decimal('8.00'), 1000, None, 10, 20),
+    (Method.EXPRESS, Zone.INTERNATIONAL): Rate(Decimal('45.00'), Decimal('12.00'), 1000, None, 4, 7),
+}
+
+_lock = threading.Lock()
+_cache = {'version': None, 'rates': DEFAULT_RATES, 'checked_at': None}
+
+
+# ===== Rate Tables =====
+
+def _load_rates(version):
+    rows = ShippingRate.objects.filter(table__version=version).values_list(
+        'method', 'zone', 'base_cost', 'per_kg_cost', 'included_weight', 'free_over', 'min_days', 'max_days'
+    )
+    return {(method, zone): Rate(*values) for method, zone, *values in rows}
+
+
+def get_rates():
+    """Return ``(version, rates)`` for the active rate table.
+
+    Rates map (method, zone) to a ``Rate``.
+    """
+    now = time.monotonic()
+    checked_at = _cache['checked_at']
+    if checked_at is not None and now - checked_at < settings.SHIPPING_RATES_CHECK_INTERVAL:
+        return _cache['version'], _cache['rates']
+
+    with _lock:
+        version = ShippingRateTable.objects.filter(is_active=True).values_list('version', flat=True).first()
+        if version != _cache['version'] or _cache['checked_at'] is None:
+            _cache['rates'] = _load_rates(version) if version is not None else DEFAULT_RATES
+            _cache['version'] = version
+        _cache['checked_at'] = now
+    return _cache['version'], _cache['rates']
+
+
+def invalidate_rates():
+    """Force the next quote in this process to re-check the active table."""
+    _cache['checked_at'] = None
+
+
+# ===== Quoting =====
+
+def destination_zone(country=''):
+    """Map a free-text country to a rate zone (blank means domestic)."""
+    country = (country or '').strip().lower()
+    if not country or country in settings.SHIPPING_DOMESTIC_COUNTRIES:
+        return Zone.DOMESTIC
+    return Zone.INTERNATIONAL
+
+
+def quote_shipping(method, subtotal, weight=0, zone=Zone.DOMESTIC):
+    """Quote one delivery method.
+
+    Args:
+        method: Delivery.DeliveryMethod value
+        subtotal: cart subtotal (Decimal)
+        weight: cart weight in grams
+        zone: ShippingRate.Zone value
+
+    Returns:
+        ShippingQuote or None if the method is not offered in the zone
+    """
+    version, rates = get_rates()
+    rate = rates.get((method, zone))
+    if rate is None:
+        return None
+
+    if subtotal <= 0 or (rate.free_over is not None and subtotal >= rate.free_over):
+        cost = Decimal('0.00')
+    else:
+        extra_kg = -(-max(weight - rate.included_weight, 0) // 1000)
+        cost = rate.base_cost + rate.per_kg_cost * extra_kg
+    return ShippingQuote(method, cost, rate.min_days, rate.max_days, version)
+
+
+def shipping_options(subtotal, weight=0, zone=Zone.DOMESTIC):
+    """Quote every method offered in the zone, in DeliveryMethod order."""
+    quotes = (quote_shipping(method, subtotal, weight, zone) for method in Method.values)
+    return [quote for quote in quotes if quote is not None]
+
+
+def cart_weight(cart):
+    """Total weight in grams of a database cart, in one query."""
+    return cart.items.aggregate(
+        weight=Sum(F('quantity') * F('product__weight'))
+    )['weight'] or 0
+
+
+def items_weight(items):
+    """Total weight in grams of already loaded cart items."""
+    return sum(item.product.weight * item.quantity for item in items)
+
+
+# ===== Session Selection =====
+
+def get_shipping_method(session):
+    """Delivery method chosen in the session, defaulting to standard."""
+    method = session.get(SESSION_KEY)
+    return method if method in Method.values else Method.STANDARD
+
+
+def set_shipping_method(session, method):
+    """Store a valid delivery method in the session. Returns False if invalid."""
+    if method not in Method.values:
+        return False
+    session[SESSION_KEY] = method
+    return True
+
+
+def get_shipping_country(session):
+    """Destination country entered at checkout, blank until then."""
+    return session.get(COUNTRY_SESSION_KEY, '')
+
+
+def set_shipping_country(session, country):
+    """Store the destination country the session is quoted for."""
+    session[COUNTRY_SESSION_KEY] = (country or '').strip()[:MAX_COUNTRY_LENGTH]
+
+
+def selected_zone(session):
+    """Rate zone of the session's destination country."""
+    return destination_zone(get_shipping_country(session))
+
+
+def quote_selected(session, subtotal, weight=0, zone=None):
+    """Quote the session's method, falling back to standard in zones without it.
+
+    The zone defaults to the session's destination (``selected_zone``).
+    """
+    if zone is None:
+        zone = selected_zone(session)
+    return (
+        quote_shipping(get_shipping_method(session), subtotal, weight, zone)
+        or quote_shipping(Method.STANDARD, subtotal, weight, zone)
+    )
@@ -1,12 +1,20 @@
 """Django signals for orders app.
 
-Automatically creates Customer profile when a new user is created.
+Automatically creates Customer profile when a new user is created,
+queues cart repricing when catalog prices change and takes deleted
+products off the cart headers.
 """
-from django.db.models.signals import post_save
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_save, pre_delete
 from django.dispatch import receiver
+from django.utils import timezone
 
+from store.models import Product
+from store.signals import prices_changed
 from users.models import CustomUser
-from .models import Customer
+from .models import Cart, CartItem, Customer
+from .utils import reprice_cart_items
 
 
 @receiver(post_save, sender=CustomUser)
@@ -27,3 +35,26 @@ def save_customer_profile(sender, instance, **kwargs):
     """
     if hasattr(instance, 'customer'):
         instance.customer.save()
+
+
+@receiver(prices_changed)
+def reprice_carts(sender, product_ids, **kwargs):
+    """Queue repricing of cart lines holding the changed products."""
+    reprice_cart_items.delay([str(pk) for pk in product_ids])
+
+
+@receiver(pre_delete, sender=Product)
+def release_deleted_product_lines(sender, instance, **kwargs):
+    """Take a product's cart lines off their carts' headers.
+    
+    The lines themselves go with the product's cascade, which bypasses
+    ``CartItem.delete()``; one UPDATE shifts every affected cart.
+    """
+    line = CartItem.objects.filter(cart=OuterRef('pk'), product=instance)
+    quantity = Subquery(line.values('quantity'))
+    Cart.objects.filter(items__product=instance).update(
+        item_count=F('item_count') - quantity,
+        subtotal=F('subtotal') - Subquery(line.values(total=F('price') * F('quantity'))),
+        weight=Greatest(F('weight') - quantity * instance.weight, 0),
+        updated_at=timezone.now(),
+    )
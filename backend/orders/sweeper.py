@@ -0,0 +1,103 @@
+"""Sweeping of empty carts, abandoned carts and expired sessions.
+
+Every logged-in visitor gets a ``Cart`` row on first cart action, and
+expired sessions stay in the session table until someone clears them.
+The sweeper deletes them in bounded chunks selected on indexed columns
+(``Cart.updated_at``, ``Session.expire_date``), each chunk its own short
+transaction, pausing between chunks so it can run at peak hours without
+holding locks that block checkout writes.
+"""
+import time
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+
+from orders.models import Cart
+
+BATCH_SIZE = 500
+PAUSE = 0.1  # seconds between chunks
+
+DB_SESSION_ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+
+def delete_in_chunks(queryset, order_field, batch_size=BATCH_SIZE, pause=PAUSE):
+    """Delete the rows of ``queryset`` one chunk at a time.
+
+    Chunks walk the queryset in ``(order_field, pk)`` order, resuming
+    after the last row of the previous chunk, so each one is a range
+    read of the index on ``order_field`` rather than a scan over random
+    UUID keys. Each chunk selects primary keys first, then deletes only
+    those rows that still match the queryset's filters, so rows touched
+    in between (a cart that just received an item) survive.
+
+    Args:
+        queryset: rows to delete
+        order_field: indexed column the queryset filters on
+        batch_size: rows per DELETE
+        pause: seconds to sleep between chunks (rate limit)
+
+    Returns:
+        int: number of rows deleted
+    """
+    deleted = 0
+    last = None
+    while True:
+        chunk = queryset.order_by(order_field, 'pk')
+        if last is not None:
+            last_value, last_pk = last
+            chunk = chunk.filter(**{f'{order_field}__gte': last_value}).exclude(
+                **{order_field: last_value, 'pk__lte': last_pk}
+            )
+        rows = list(chunk.values_list(order_field, 'pk')[:batch_size])
+        if not rows:
+            return deleted
+        last = rows[-1]
+        _, per_model = queryset.filter(pk__in=[pk for _, pk in rows]).delete()
+        deleted += per_model.get(queryset.model._meta.label, 0)
+        if pause:
+            time.sleep(pause)
+
+
+# ===== Carts =====
+
+def empty_carts():
+    """Carts without items untouched for ``EMPTY_CART_GRACE`` seconds.
+
+    The grace period keeps the cart a visitor is filling right now.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.EMPTY_CART_GRACE)
+    return Cart.objects.filter(updated_at__lt=cutoff, item_count=0)
+
+
+def abandoned_carts(days=None):
+    """Carts untouched for ``days`` (default ``CART_ABANDONED_AFTER_DAYS``)."""
+    if days is None:
+        days = settings.CART_ABANDONED_AFTER_DAYS
+    return Cart.objects.filter(updated_at__lt=timezone.now() - timedelta(days=days))
+
+
+# ===== Sessions =====
+
+def expired_sessions():
+    return Session.objects.filter(expire_date__lt=timezone.now())
+
+
+def clear_expired_sessions(batch_size=BATCH_SIZE, pause=PAUSE):
+    """Delete expired sessions.
+
+    Database-backed sessions are deleted in chunks; other engines fall
+    back to their own ``clear_expired``.
+
+    Returns:
+        int or None: sessions deleted, None if the engine does not report it
+    """
+    if settings.SESSION_ENGINE in DB_SESSION_ENGINES:
+        return delete_in_chunks(expired_sessions(), 'expire_date', batch_size, pause)
+    import_module(settings.SESSION_ENGINE).SessionStore.clear_expired()
+    return None
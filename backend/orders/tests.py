@@ -0,0 +1,158 @@
+"""Tests for the orders app."""
+import threading
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from orders.models import Cart, CartItem, Order, OrderElement, StockReservation
+from orders.utils import InsufficientStockError, decrement_stock, reserve_stock
+from store.models import Category, Product
+from users.models import CustomUser
+
+
+class ReservationTests(TestCase):
+    """Stock holds taken at checkout and the guarded decrement at placement."""
+
+    def setUp(self):
+        category = Category.objects.create(title='Castles', slug='castles')
+        self.castle = Product.objects.create(
+            name='Castle', slug='castle', price=Decimal('19.99'), stock=3, category=category
+        )
+        self.ship = Product.objects.create(
+            name='Ship', slug='ship', price=Decimal('29.99'), stock=10, category=category
+        )
+        self.first, self.second = CustomUser.objects.bulk_create([
+            CustomUser(username='first', email='first@example.com'),
+            CustomUser(username='second', email='second@example.com'),
+        ])
+
+    def test_earlier_hold_keeps_priority(self):
+        self.assertEqual(reserve_stock(self.first, {self.castle.pk: 2}), [])
+        self.assertEqual(reserve_stock(self.second, {self.castle.pk: 2}), [self.castle.pk])
+
+        self.assertTrue(StockReservation.objects.filter(user=self.first, quantity=2).exists())
+        self.assertFalse(StockReservation.objects.filter(user=self.second).exists())
+        with self.assertRaises(InsufficientStockError):
+            decrement_stock({self.castle.pk: 2}, user=self.second)
+        decrement_stock({self.castle.pk: 2}, user=self.first)
+        self.castle.refresh_from_db()
+        self.assertEqual(self.castle.stock, 1)
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_expired_hold_stops_counting(self):
+        StockReservation.objects.create(
+            user=self.first, product=self.castle, quantity=3, expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(reserve_stock(self.second, {self.castle.pk: 3}), [])
+        decrement_stock({self.castle.pk: 3}, user=self.second)
+        self.castle.refresh_from_db()
+        self.assertEqual(self.castle.stock, 0)
+
+    def test_short_product_rolls_back_whole_order(self):
+        with self.assertRaises(InsufficientStockError):
+            decrement_stock({self.ship.pk: 4, self.castle.pk: 5}, user=self.first)
+        self.castle.refresh_from_db()
+        self.ship.refresh_from_db()
+        self.assertEqual((self.castle.stock, self.ship.stock), (3, 10))
+
+    def test_active_hold_of_another_customer_is_not_sold(self):
+        reserve_stock(self.first, {self.castle.pk: 3})
+        with self.assertRaises(InsufficientStockError):
+            decrement_stock({self.ship.pk: 1, self.castle.pk: 1}, user=self.second)
+        self.ship.refresh_from_db()
+        self.assertEqual(self.ship.stock, 10)
+
+
+class CartHeaderTests(TestCase):
+    """Denormalized cart totals following writes that bypass ``CartItem``."""
+
+    def test_deleted_product_leaves_the_header(self):
+        category = Category.objects.create(title='Castles', slug='castles')
+        castle, ship = Product.objects.bulk_create([
+            Product(name='Castle', slug='castle', price=Decimal('19.99'), stock=3, weight=800, category=category),
+            Product(name='Ship', slug='ship', price=Decimal('29.99'), stock=10, weight=500, category=category),
+        ])
+        cart = Cart.objects.create(user=CustomUser.objects.create(username='first', email='first@example.com'))
+        CartItem.objects.create(cart=cart, product=castle, quantity=2, price=castle.price)
+        CartItem.objects.create(cart=cart, product=ship, quantity=1, price=ship.price)
+
+        castle.delete()
+        cart.refresh_from_db()
+        self.assertEqual((cart.item_count, cart.subtotal, cart.weight), (1, Decimal('29.99'), 500))
+
+
+class ConcurrentCheckoutTests(TransactionTestCase):
+    """Customers racing through checkout for the last units of a product.
+
+    Every buyer runs in its own thread with its own database connection,
+    so reservations and the stock decrement really interleave.
+    """
+    buyers = 200
+    stock = 5
+
+    def setUp(self):
+        category = Category.objects.create(title='Castles', slug='castles')
+        self.product = Product.objects.create(
+            name='Castle', slug='castle', price=Decimal('19.99'), stock=self.stock, category=category
+        )
+        # Bulk inserts: hashing hundreds of passwords would dominate the run
+        self.users = CustomUser.objects.bulk_create([
+            CustomUser(username=f'buyer{i}', email=f'buyer{i}@example.com') for i in range(self.buyers)
+        ])
+        carts = Cart.objects.bulk_create([
+            Cart(user=user, item_count=1, subtotal=self.product.price) for user in self.users
+        ])
+        CartItem.objects.bulk_create([
+            CartItem(cart=cart, product=self.product, quantity=1, price=self.product.price) for cart in carts
+        ])
+
+    def checkout(self, user, barrier, results):
+        """Open the checkout page and place the order, as a browser would."""
+        client = Client()
+        client.force_login(user)
+        try:
+            barrier.wait()
+            page = client.get(reverse('orders:checkout'))
+            response = client.post(reverse('orders:place_order'), {
+                'idempotency_key': page.context['idempotency_key'],
+                'name': user.username,
+                'phone': '+905551112233',
+                'address': 'Brick Lane 1',
+                'country': 'Turkey',
+                'shipping_cost': page.context['shipping_cost'],
+            })
+            results.append(response['Location'])
+        finally:
+            connection.close()
+
+    def test_last_units_are_not_oversold(self):
+        barrier = threading.Barrier(self.buyers)
+        results = []
+        threads = [
+            threading.Thread(target=self.checkout, args=(user, barrier, results))
+            for user in self.users
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), self.buyers)
+        self.product.refresh_from_db()
+        sold = sum(OrderElement.objects.filter(product=self.product).values_list('quantity', flat=True))
+        placed = sum('confirmation' in location for location in results)
+
+        # No oversell: every unit sold came out of stock, and no more
+        self.assertGreater(sold, 0)
+        self.assertLessEqual(sold, self.stock)
+        self.assertEqual(sold + self.product.stock, self.stock)
+        self.assertEqual(Order.objects.filter(is_draft=False).count(), placed)
+        self.assertEqual(sold, placed)
+
+        # No orphaned reservation: buyers consumed their holds, the others
+        # were released when their checkout failed
+        self.assertFalse(StockReservation.objects.exists())
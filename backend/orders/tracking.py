@@ -0,0 +1,217 @@
+"""Bulk ingestion of carrier tracking updates.
+
+Carrier files are read as a stream of rows with ``tracking_number``,
+``status`` and an optional ``delivered_on`` (YYYY-MM-DD) column. CSV
+and JSON Lines stream row by row; a plain JSON array is read whole.
+
+Rows are applied in batches: one lookup on the unique
+``tracking_number`` index, one UPDATE per (target status, delivery
+date) group of changed deliveries, one event insert and one UPDATE per
+carrier delivery date stamping ``delivered_at`` on delivered orders
+(the start of that day, or the ingestion time without a date). Grouped UPDATEs stay a
+handful of statements per batch, where ``bulk_update`` would build a
+CASE expression per row. Carriers often skip scans, so a status is
+accepted whenever the transition map can reach it from the current
+one (pending -> delivered passes through in transit).
+"""
+import csv
+import json
+from collections import defaultdict, deque
+from datetime import date, datetime, time
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from orders.models import Delivery, Order, OrderEvent
+from orders.transitions import DELIVERY_TRANSITIONS
+
+DeliveryStatus = Delivery.DeliveryStatus
+
+BATCH_SIZE = 1000
+
+# Carrier vocabularies mapped onto our statuses
+STATUS_ALIASES = {
+    'picked_up': DeliveryStatus.IN_TRANSIT,
+    'shipped': DeliveryStatus.IN_TRANSIT,
+    'in_transit': DeliveryStatus.IN_TRANSIT,
+    'out_for_delivery': DeliveryStatus.OUT_FOR_DELIVERY,
+    'delivered': DeliveryStatus.DELIVERED,
+    'exception': DeliveryStatus.FAILED,
+    'failed': DeliveryStatus.FAILED,
+    'failed_attempt': DeliveryStatus.FAILED,
+    'returned': DeliveryStatus.RETURNED,
+    'return_to_sender': DeliveryStatus.RETURNED,
+}
+
+
+class TrackingReport:
+    """Counters of one ingestion run."""
+
+    def __init__(self):
+        self.received = 0
+        self.matched = 0
+        self.changed = 0
+        self.rejected = 0
+        self.unmatched = 0
+
+    def as_dict(self) -> dict:
+        return {
+            'received': self.received,
+            'matched': self.matched,
+            'changed': self.changed,
+            'rejected': self.rejected,
+            'unmatched': self.unmatched,
+        }
+
+    def __str__(self) -> str:
+        return ', '.join(f'{key} {value}' for key, value in self.as_dict().items())
+
+
+# ===== Parsing =====
+
+def read_rows(lines, file_format='csv'):
+    """Yield row dicts from an iterable of text lines.
+
+    Args:
+        lines: iterable of str lines (open file, decoded request body)
+        file_format: 'csv', 'jsonl' or 'json'
+    """
+    if file_format == 'csv':
+        yield from csv.DictReader(lines)
+    elif file_format == 'jsonl':
+        for line in lines:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield {}
+    elif file_format == 'json':
+        yield from json.loads(''.join(lines))
+    else:
+        raise ValueError(f'Unknown tracking file format: {file_format}')
+
+
+def normalize_status(value):
+    """Map a carrier status string to a DeliveryStatus, or None."""
+    key = str(value or '').strip().lower().replace(' ', '_').replace('-', '_')
+    return STATUS_ALIASES.get(key)
+
+
+def _parse_row(row):
+    """Return (tracking_number, status, delivered_on) or None if invalid."""
+    if not isinstance(row, dict):
+        return None
+    tracking_number = str(row.get('tracking_number') or '').strip()
+    status = normalize_status(row.get('status'))
+    if not tracking_number or status is None:
+        return None
+    delivered_on = None
+    if row.get('delivered_on'):
+        try:
+            delivered_on = date.fromisoformat(str(row['delivered_on'])[:10])
+        except ValueError:
+            return None
+    return tracking_number, status, delivered_on
+
+
+def _reachable(current, target):
+    """True if ``target`` can be reached from ``current`` in the transition map."""
+    queue, seen = deque([DeliveryStatus(current)]), set()
+    while queue:
+        status = queue.popleft()
+        for following in DELIVERY_TRANSITIONS[status]:
+            if following == target:
+                return True
+            if following not in seen:
+                seen.add(following)
+                queue.append(following)
+    return False
+
+
+# ===== Ingestion =====
+
+def _apply_batch(updates, report):
+    """Apply one batch of {tracking_number: (status, delivered_on)}."""
+    deliveries = Delivery.objects.filter(tracking_number__in=list(updates)).only(
+        'id', 'order_id', 'tracking_number', 'status', 'actual_delivery_date'
+    )
+    now = timezone.now()
+    groups = defaultdict(list)
+    delivered_orders = defaultdict(list)
+    events = []
+    found = 0
+    for delivery in deliveries:
+        found += 1
+        status, delivered_on = updates[delivery.tracking_number]
+        if status == delivery.status:
+            continue
+        if not _reachable(delivery.status, status):
+            report.rejected += 1
+            continue
+        events.append(OrderEvent(
+            order_id=delivery.order_id,
+            kind=OrderEvent.Kind.DELIVERY,
+            from_status=delivery.status,
+            status=status,
+            created_at=now,
+        ))
+        if status == DeliveryStatus.DELIVERED:
+            groups[status, delivered_on or now.date()].append(delivery.pk)
+            delivered_orders[delivered_on].append(delivery.order_id)
+        else:
+            groups[status, None].append(delivery.pk)
+
+    report.matched += found
+    report.unmatched += len(updates) - found
+    if not events:
+        return
+
+    with transaction.atomic():
+        for (status, delivered_on), pks in groups.items():
+            changes = {'status': status, 'updated_at': now}
+            if delivered_on is not None:
+                changes['actual_delivery_date'] = Coalesce(F('actual_delivery_date'), delivered_on)
+            Delivery.objects.filter(pk__in=pks).update(**changes)
+        OrderEvent.objects.bulk_create(events)
+        for delivered_on, order_ids in delivered_orders.items():
+            delivered_at = now if delivered_on is None else timezone.make_aware(
+                datetime.combine(delivered_on, time.min)
+            )
+            Order.objects.filter(pk__in=order_ids).update(
+                delivered_at=Coalesce(F('delivered_at'), delivered_at)
+            )
+    report.changed += len(events)
+
+
+def ingest_tracking_updates(rows, batch_size=BATCH_SIZE):
+    """Apply carrier tracking rows to deliveries.
+
+    Within a batch the last row for a tracking number wins; matched,
+    unmatched and changed count distinct parcels per batch.
+
+    Args:
+        rows: iterable of row dicts (see ``read_rows``)
+        batch_size: tracking numbers looked up per query
+
+    Returns:
+        TrackingReport
+    """
+    report = TrackingReport()
+    batch = {}
+    for row in rows:
+        report.received += 1
+        parsed = _parse_row(row)
+        if parsed is None:
+            report.rejected += 1
+            continue
+        tracking_number, status, delivered_on = parsed
+        batch[tracking_number] = (status, delivered_on)
+        if len(batch) >= batch_size:
+            _apply_batch(batch, report)
+            batch = {}
+    if batch:
+        _apply_batch(batch, report)
+    return report
@@ -0,0 +1,203 @@
+"""Status transition engine for orders and deliveries.
+
+Validates moves against the allowed transition maps, stamps the order
+timeline fields and appends an ``OrderEvent`` per transition. Bulk
+transitions run in a fixed number of statements per chunk. Order
+events queue a sales rollup refresh once the transaction commits.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from orders.models import Delivery, Order, OrderEvent
+from orders.rollups import schedule_refresh
+
+OrderStatus = Order.StatusChoice
+DeliveryStatus = Delivery.DeliveryStatus
+
+ORDER_TRANSITIONS = {
+    OrderStatus.NEW: {OrderStatus.PROCESSED},
+    OrderStatus.PROCESSED: {OrderStatus.SHIPPED},
+    OrderStatus.SHIPPED: {OrderStatus.COMPLETED},
+    OrderStatus.COMPLETED: set(),
+}
+
+DELIVERY_TRANSITIONS = {
+    DeliveryStatus.PENDING: {DeliveryStatus.IN_TRANSIT, DeliveryStatus.FAILED},
+    DeliveryStatus.IN_TRANSIT: {
+        DeliveryStatus.OUT_FOR_DELIVERY, DeliveryStatus.DELIVERED,
+        DeliveryStatus.FAILED, DeliveryStatus.RETURNED,
+    },
+    DeliveryStatus.OUT_FOR_DELIVERY: {
+        DeliveryStatus.DELIVERED, DeliveryStatus.FAILED, DeliveryStatus.RETURNED,
+    },
+    DeliveryStatus.FAILED: {DeliveryStatus.IN_TRANSIT, DeliveryStatus.RETURNED},
+    DeliveryStatus.DELIVERED: {DeliveryStatus.RETURNED},
+    DeliveryStatus.RETURNED: set(),
+}
+
+CHUNK_SIZE = 1000
+
+
+class InvalidTransition(Exception):
+    """Raised when a status change is not allowed from the current status."""
+
+
+def allowed_sources(transitions, status):
+    """Statuses from which ``status`` may be entered."""
+    return [source for source, targets in transitions.items() if status in targets]
+
+
+def _chunks(items, size=CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# ===== Order Status =====
+
+def record_order_created(order):
+    """Start the timeline of a freshly placed order."""
+    event = OrderEvent.objects.create(order=order, status=order.status, created_at=order.registered_at)
+    transaction.on_commit(schedule_refresh)
+    return event
+
+
+def transition_orders(orders, status):
+    """Move every eligible order in a queryset to ``status``.
+
+    Orders whose current status cannot move to ``status`` are skipped.
+    Entering Processed stamps ``called_at`` and entering Completed stamps
+    ``delivered_at`` unless already set.
+
+    Args:
+        orders: Order queryset to transition
+        status: target Order.StatusChoice
+
+    Returns:
+        int: number of orders transitioned
+    """
+    status = OrderStatus(status)
+    sources = allowed_sources(ORDER_TRANSITIONS, status)
+    now = timezone.now()
+
+    changes = {'status': status}
+    if status == OrderStatus.PROCESSED:
+        changes['called_at'] = Coalesce(F('called_at'), now)
+    elif status == OrderStatus.COMPLETED:
+        changes['delivered_at'] = Coalesce(F('delivered_at'), now)
+
+    with transaction.atomic():
+        rows = list(
+            orders.select_for_update()
+            .filter(status__in=sources)
+            .order_by()
+            .values_list('pk', 'status')
+        )
+        for chunk in _chunks(rows):
+            Order.objects.filter(pk__in=[pk for pk, _ in chunk]).update(**changes)
+            OrderEvent.objects.bulk_create([
+                OrderEvent(order_id=pk, from_status=from_status, status=status, created_at=now)
+                for pk, from_status in chunk
+            ])
+        if rows:
+            transaction.on_commit(schedule_refresh)
+    return len(rows)
+
+
+def transition_order(order, status):
+    """Move a single order to ``status``.
+
+    Raises:
+        InvalidTransition: if the move is not allowed
+    """
+    if status not in ORDER_TRANSITIONS[OrderStatus(order.status)]:
+        raise InvalidTransition(
+            f'Cannot move order from {order.get_status_display()} to {OrderStatus(status).label}'
+        )
+    if not transition_orders(Order.objects.filter(pk=order.pk), status):
+        raise InvalidTransition('Order status changed concurrently')
+    order.refresh_from_db(fields=['status', 'called_at', 'delivered_at'])
+
+
+# ===== Delivery Status =====
+
+def transition_deliveries(deliveries, status):
+    """Move every eligible delivery in a queryset to ``status``.
+
+    Entering Delivered stamps ``actual_delivery_date`` on the delivery
+    and ``delivered_at`` on its order unless already set.
+
+    Args:
+        deliveries: Delivery queryset to transition
+        status: target Delivery.DeliveryStatus
+
+    Returns:
+        int: number of deliveries transitioned
+    """
+    status = DeliveryStatus(status)
+    sources = allowed_sources(DELIVERY_TRANSITIONS, status)
+    now = timezone.now()
+
+    changes = {'status': status, 'updated_at': now}
+    if status == DeliveryStatus.DELIVERED:
+        changes['actual_delivery_date'] = Coalesce(F('actual_delivery_date'), now.date())
+
+    with transaction.atomic():
+        rows = list(
+            deliveries.select_for_update()
+            .filter(status__in=sources)
+            .order_by()
+            .values_list('pk', 'order_id', 'status')
+        )
+        for chunk in _chunks(rows):
+            Delivery.objects.filter(pk__in=[pk for pk, _, _ in chunk]).update(**changes)
+            if status == DeliveryStatus.DELIVERED:
+                Order.objects.filter(pk__in=[order_id for _, order_id, _ in chunk]).update(
+                    delivered_at=Coalesce(F('delivered_at'), now)
+                )
+            OrderEvent.objects.bulk_create([
+                OrderEvent(
+                    order_id=order_id,
+                    kind=OrderEvent.Kind.DELIVERY,
+                    from_status=from_status,
+                    status=status,
+                    created_at=now,
+                )
+                for _, order_id, from_status in chunk
+            ])
+    return len(rows)
+
+
+def transition_delivery(delivery, status):
+    """Move a single delivery to ``status``.
+
+    Raises:
+        InvalidTransition: if the move is not allowed
+    """
+    if status not in DELIVERY_TRANSITIONS[DeliveryStatus(delivery.status)]:
+        raise InvalidTransition(
+            f'Cannot move delivery from {delivery.get_status_display()} to {DeliveryStatus(status).label}'
+        )
+    if not transition_deliveries(Delivery.objects.filter(pk=delivery.pk), status):
+        raise InvalidTransition('Delivery status changed concurrently')
+    delivery.refresh_from_db(fields=['status', 'actual_delivery_date', 'updated_at'])
+
+
+# ===== Dashboards =====
+
+def orders_stuck_in(status, older_than=timedelta(hours=48)):
+    """Orders that entered ``status`` before the cutoff and are still there.
+
+    The events are a range scan on the (status, created_at) index,
+    read as an ``IN`` subquery against the orders still holding that
+    status, so no join fans out and no DISTINCT is needed.
+    """
+    entered = OrderEvent.objects.filter(
+        status=status,
+        created_at__lt=timezone.now() - older_than,
+        kind=OrderEvent.Kind.ORDER,
+    ).values('order_id')
+    return Order.objects.filter(status=status, pk__in=entered)
@@ -14,10 +14,15 @@ urlpatterns = [
     path('cart/remove/', views.RemoveFromCartView.as_view(), name='remove_from_cart'),
     path('cart/update/', views.UpdateCartItemView.as_view(), name='update_cart'),
     path('cart/clear/', views.ClearCartView.as_view(), name='clear_cart'),
+    path('cart/batch/', views.BatchCartView.as_view(), name='batch_cart'),
+    path('cart/shipping/', views.ShippingMethodView.as_view(), name='set_shipping'),
     
     # ===== Checkout & Orders =====
     path('checkout/', views.CheckoutView.as_view(), name='checkout'),
     path('order/place/', views.PlaceOrderView.as_view(), name='place_order'),
     path('order/<uuid:order_uuid>/confirmation/', views.OrderConfirmationView.as_view(), name='order_confirmation'),
     path('orders/', views.OrderListView.as_view(), name='order_list'),
+    
+    # ===== Carrier Tracking =====
+    path('deliveries/tracking/', views.TrackingIngestView.as_view(), name='tracking_ingest'),
 ]
\ No newline at end of file
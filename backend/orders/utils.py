@@ -0,0 +1,397 @@
+"""Utility functions for orders app.
+
+Provides bookkeeping used by the cart and checkout process:
+- Conditional, single-statement stock decrements
+- Time-limited stock reservations
+- Set-based cart repricing after catalog price changes
+
+And read helpers:
+- Cursor-paginated order history across hot and archived orders
+- Order detail loaded in a fixed number of queries
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models import Case, F, OuterRef, PositiveIntegerField, Prefetch, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from core.jobs import job
+from orders.models import (
+    ArchivedOrder, ArchivedOrderElement, Cart, CartItem, Order, OrderElement, StockReservation
+)
+from orders.sweeper import PAUSE, delete_in_chunks
+from store.models import Product
+
+
+class InsufficientStockError(Exception):
+    """Raised when a product cannot cover the requested quantity."""
+
+
+# ===== Stock Reservations =====
+
+def active_reservations(exclude_user=None):
+    """Return reservations that still hold stock.
+
+    Args:
+        exclude_user: optional user whose own holds should not count
+    """
+    reservations = StockReservation.objects.filter(expires_at__gt=timezone.now())
+    if exclude_user is not None:
+        reservations = reservations.exclude(user=exclude_user)
+    return reservations
+
+
+def reserved_quantities(product_ids, exclude_user=None):
+    """Sum active reservations per product in a single query.
+
+    Returns:
+        dict: product id -> reserved quantity (missing means 0)
+    """
+    return dict(
+        active_reservations(exclude_user)
+        .filter(product_id__in=product_ids)
+        .values('product_id')
+        .annotate(total=Sum('quantity'))
+        .values_list('product_id', 'total')
+    )
+
+
+def with_held_stock(products, exclude_user=None):
+    """Annotate a product queryset with ``held``: stock reserved by others.
+
+    Lets callers load products and check availability in one query.
+    """
+    held = (
+        active_reservations(exclude_user)
+        .filter(product=OuterRef('pk'))
+        .values('product')
+        .annotate(total=Sum('quantity'))
+        .values('total')
+    )
+    return products.annotate(held=Coalesce(Subquery(held), Value(0)))
+
+
+def available_stock(products, exclude_user=None):
+    """Compute stock that is neither sold nor held by other customers.
+
+    Reads the reservation table only; the product rows are not locked.
+
+    Returns:
+        dict: product id -> available quantity
+    """
+    reserved = reserved_quantities([product.pk for product in products], exclude_user)
+    return {
+        product.pk: max(product.stock - reserved.get(product.pk, 0), 0)
+        for product in products
+    }
+
+
+def reserve_stock(user, quantities):
+    """Hold stock for a user's checkout for ``STOCK_RESERVATION_TTL`` seconds.
+
+    Holds are upserted first and verified afterwards against every hold
+    that was placed no later than this one, so earlier customers keep
+    priority and the product row is never locked. The conditional
+    UPDATE in ``decrement_stock`` remains the final oversell guard.
+
+    Args:
+        user: CustomUser entering checkout
+        quantities: dict mapping product id to the quantity in the cart
+
+    Returns:
+        list: product ids that could not be reserved
+    """
+    StockReservation.objects.filter(user=user).exclude(product_id__in=quantities).delete()
+    if not quantities:
+        return []
+
+    expires_at = timezone.now() + timedelta(seconds=settings.STOCK_RESERVATION_TTL)
+    StockReservation.objects.bulk_create(
+        [
+            StockReservation(user=user, product_id=product_id, quantity=quantity, expires_at=expires_at)
+            for product_id, quantity in quantities.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['user', 'product'],
+        update_fields=['quantity', 'expires_at'],
+    )
+
+    stock = dict(Product.objects.filter(pk__in=quantities).values_list('pk', 'stock'))
+    reserved = dict(
+        active_reservations()
+        .filter(product_id__in=quantities, expires_at__lte=expires_at)
+        .values('product_id')
+        .annotate(total=Sum('quantity'))
+        .values_list('product_id', 'total')
+    )
+    unavailable = [
+        product_id for product_id in quantities
+        if reserved.get(product_id, 0) > stock.get(product_id, 0)
+    ]
+    if unavailable:
+        StockReservation.objects.filter(user=user, product_id__in=unavailable).delete()
+    return unavailable
+
+
+def release_reservations(user):
+    """Drop every hold of a user whose checkout ended without an order.
+
+    Returns:
+        int: number of reservations released
+    """
+    return StockReservation.objects.filter(user=user).delete()[0]
+
+
+def release_expired_reservations(batch_size=1000, pause=PAUSE):
+    """Delete expired reservations with ``sweeper.delete_in_chunks``.
+
+    Returns:
+        int: number of reservations released
+    """
+    return delete_in_chunks(
+        StockReservation.objects.filter(expires_at__lte=timezone.now()), 'expires_at', batch_size, pause
+    )
+
+
+# ===== Stock Management =====
+
+def decrement_stock(quantities, user=None):
+    """Take stock for several products in one UPDATE statement.
+
+    Every row is guarded by ``stock - held >= quantity``, where ``held``
+    is stock reserved by other customers ahead of this buyer, so stock
+    never goes negative and earlier holds are honoured. If any product
+    falls short, nothing is decremented. The buyer's own reservations
+    are consumed.
+
+    Args:
+        quantities: dict mapping product id to the quantity to take
+        user: optional buyer whose reservations are being consumed
+
+    Raises:
+        InsufficientStockError: if at least one product lacks stock
+    """
+    if not quantities:
+        return
+
+    own_holds = {}
+    if user is not None:
+        own_holds = dict(
+            active_reservations()
+            .filter(user=user, product_id__in=quantities)
+            .values_list('product_id', 'expires_at')
+        )
+
+    condition = Q()
+    for product_id, quantity in quantities.items():
+        held = active_reservations(exclude_user=user).filter(product=OuterRef('pk'))
+        if product_id in own_holds:
+            held = held.filter(expires_at__lt=own_holds[product_id])
+        held = Coalesce(
+            Subquery(held.values('product').annotate(total=Sum('quantity')).values('total')),
+            Value(0),
+        )
+        condition |= Q(pk=product_id, stock__gte=held + quantity)
+
+    with transaction.atomic():
+        updated = Product.objects.filter(condition).update(
+            stock=Case(
+                *[When(pk=product_id, then=F('stock') - quantity)
+                  for product_id, quantity in quantities.items()],
+                default=F('stock'),
+                output_field=PositiveIntegerField(),
+            )
+        )
+        if updated != len(quantities):
+            raise InsufficientStockError('Some items in your cart are no longer in stock')
+        if user is not None:
+            StockReservation.objects.filter(user=user).delete()
+
+
+# ===== Cart Pricing =====
+
+REPRICE_BATCH_SIZE = 500
+
+
+@job()
+def reprice_cart_items(product_ids, batch_size=REPRICE_BATCH_SIZE):
+    """Bring cart lines of the given products to the current catalog price.
+
+    Queued by the ``prices_changed`` receiver with product ids as
+    strings.
+
+    Per batch of products: one query for the affected carts, one UPDATE
+    of the stale lines (keeping the first old price in
+    ``previous_price``) and one UPDATE rebuilding those carts' subtotal
+    and setting ``prices_changed_at``. ``updated_at`` is left alone so
+    repricing does not count as cart activity.
+
+    Returns:
+        int: number of cart lines repriced
+    """
+    product_ids = list(product_ids)
+    current_price = Product.objects.filter(pk=OuterRef('product_id')).values('price')[:1]
+    subtotal = (
+        CartItem.objects.filter(cart=OuterRef('pk'))
+        .values('cart')
+        .annotate(total=Sum(F('price') * F('quantity')))
+        .values('total')
+    )
+    repriced = 0
+    for start in range(0, len(product_ids), batch_size):
+        stale = CartItem.objects.filter(product_id__in=product_ids[start:start + batch_size]).exclude(
+            price=F('product__price')
+        )
+        with transaction.atomic():
+            cart_ids = list(stale.values_list('cart_id', flat=True).distinct())
+            if not cart_ids:
+                continue
+            repriced += stale.update(
+                previous_price=Coalesce(F('previous_price'), F('price')),
+                price=Subquery(current_price),
+            )
+            Cart.objects.filter(pk__in=cart_ids).update(
+                subtotal=Coalesce(Subquery(subtotal), Value(Decimal('0.00'))),
+                prices_changed_at=timezone.now(),
+            )
+    return repriced
+
+
+def acknowledge_price_changes(cart, cart_items):
+    """Return the loaded lines whose price changed and clear the notices.
+
+    Reads ``previous_price`` from lines already loaded, so checkout
+    needs no extra query unless there is something to clear.
+    """
+    if cart.prices_changed_at is None:
+        return []
+    changed = [
+        item for item in cart_items
+        if item.previous_price is not None and item.previous_price != item.price
+    ]
+    with transaction.atomic():
+        CartItem.objects.filter(cart=cart, previous_price__isnull=False).update(previous_price=None)
+        Cart.objects.filter(pk=cart.pk).update(prices_changed_at=None)
+    cart.prices_changed_at = None
+    return changed
+
+
+# ===== Order History =====
+
+ORDER_HISTORY_PAGE_SIZE = 20
+
+
+def encode_order_cursor(order):
+    """Encode an order's position in the history as an opaque cursor."""
+    return urlsafe_base64_encode(force_bytes(f'{order.registered_at.isoformat()}|{order.pk}'))
+
+
+def decode_order_cursor(cursor):
+    """Decode a history cursor. Returns (registered_at, pk) or None."""
+    try:
+        registered_at, pk = urlsafe_base64_decode(cursor).decode().split('|')
+        return datetime.fromisoformat(registered_at), int(pk)
+    except (TypeError, ValueError):
+        return None
+
+
+def _history_query(order_model, element_model, customer, position):
+    item_count = (
+        element_model.objects.filter(order=OuterRef('pk'))
+        .values('order')
+        .annotate(total=Sum('quantity'))
+        .values('total')
+    )
+    orders = (
+        order_model.objects.filter(customer=customer, is_draft=False)
+        .annotate(item_count=Coalesce(Subquery(item_count), Value(0)))
+        .prefetch_related(Prefetch(
+            'order_items',
+            queryset=element_model.objects.select_related('product').order_by('pk')[:1],
+            to_attr='preview_items',
+        ))
+        .order_by('-registered_at', '-pk')
+    )
+    if position:
+        registered_at, pk = position
+        orders = orders.filter(
+            Q(registered_at__lt=registered_at) | Q(registered_at=registered_at, pk__lt=pk)
+        )
+    return orders
+
+
+def order_history(customer, cursor=None, limit=ORDER_HISTORY_PAGE_SIZE):
+    """Fetch one page of a customer's placed orders, newest first.
+
+    Keyset pagination on (registered_at, id) walks the
+    (customer, is_draft, -registered_at) index, so every page costs the
+    same however many orders the customer has. Each order carries an
+    ``item_count`` annotation and a ``preview_items`` list holding its
+    first line with the product, prefetched with a sliced queryset.
+    Hot and archived orders share one id sequence, so a page is the
+    merge of one keyset query against each table.
+
+    Args:
+        customer: Customer whose orders to list
+        cursor: value returned as ``next_cursor`` by the previous page
+        limit: page size
+
+    Returns:
+        tuple: (list of orders, next_cursor or None)
+    """
+    position = decode_order_cursor(cursor) if cursor else None
+    page = sorted(
+        [
+            *_history_query(Order, OrderElement, customer, position)[:limit + 1],
+            *_history_query(ArchivedOrder, ArchivedOrderElement, customer, position)[:limit + 1],
+        ],
+        key=lambda order: (order.registered_at, order.pk),
+        reverse=True,
+    )[:limit + 1]
+    next_cursor = encode_order_cursor(page[limit - 1]) if len(page) > limit else None
+    return page[:limit], next_cursor
+
+
+def get_order_detail(user, order_uuid):
+    """Load a user's order with everything its detail page shows.
+
+    One query for the order with its customer, user and delivery, one
+    for the lines with product and category (``order.lines``) and one
+    for the status timeline (``order.timeline``), whatever the number
+    of lines. Archived orders are looked up only when the hot table has
+    no match.
+
+    Returns:
+        Order, ArchivedOrder or None
+    """
+    for order_model, line_model in ((Order, OrderElement), (ArchivedOrder, ArchivedOrderElement)):
+        order = (
+            order_model.objects.filter(customer__user=user, uuid=order_uuid)
+            .select_related('customer__user', 'delivery')
+            .prefetch_related(
+                Prefetch(
+                    'order_items',
+                    queryset=line_model.objects.select_related('product__category').order_by('pk'),
+                    to_attr='lines',
+                ),
+                Prefetch('events', to_attr='timeline'),
+            )
+            .first()
+        )
+        if order is not None:
+            return order
+    return None
+
+
+def order_delivery(order):
+    """The delivery loaded with ``get_order_detail``, or None."""
+    try:
+        return order.delivery
+    except ObjectDoesNotExist:
+        return None
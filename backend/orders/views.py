@@ -5,95 +5,161 @@ and order history management.
 """
 from django.shortcuts import redirect, get_object_or_404
 from django.views.generic import TemplateView, View, DetailView
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib import messages
-from django.http import JsonResponse
-from decimal import Decimal
+from django.http import Http404, JsonResponse
+from django.db import transaction
+from django.utils import timezone
+from decimal import Decimal, InvalidOperation
+import codecs
+import json
+import uuid
 
 from store.models import Product
-from orders.models import Cart, CartItem, Customer, Order, OrderElement, Delivery
-from orders.models import Order, Customer, OrderElement
+from orders.models import Cart, CartItem, Customer, Order, OrderElement, OrderEvent, Delivery
+from orders.guest_cart import GuestCart
+from orders.idempotency import IdempotentPostMixin
+from orders.shipping import (
+    get_shipping_country, items_weight, quote_selected, selected_zone, set_shipping_country,
+    set_shipping_method, shipping_options
+)
+from orders.tracking import ingest_tracking_updates, read_rows
+from orders.transitions import record_order_created
+from orders.utils import (
+    InsufficientStockError, acknowledge_price_changes, available_stock, decrement_stock, get_order_detail,
+    order_delivery, order_history, release_reservations, reserve_stock, with_held_stock
+)
 
 
 # ===== Cart Views =====
 
-class CartView(LoginRequiredMixin, TemplateView):
+class CartView(TemplateView):
     """Display user's shopping cart with items and totals.
     
     Shows cart items, prices, shipping cost, and grand total.
-    Requires authentication.
+    Anonymous visitors see their cookie-backed guest cart.
     """
     template_name = 'orders/cart/cart.html'
-    login_url = 'users:login'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        cart, _ = Cart.objects.get_or_create(user=self.request.user)
         
-        shipping_cost = self._get_shipping_cost()
+        if not self.request.user.is_authenticated:
+            cart_items = GuestCart(self.request).get_items()
+            total_price = sum((item.get_total_price() for item in cart_items), Decimal('0.00'))
+            context.update({
+                'cart_items': cart_items,
+                'total_price': total_price,
+                'total_items': sum(item.quantity for item in cart_items),
+            })
+        else:
+            # Viewing the cart does not create one; the first add does
+            cart = Cart.objects.filter(user=self.request.user).first()
+            cart_items = list(cart.items.select_related('product')) if cart else []
+            total_price = cart.get_total_price() if cart else Decimal('0.00')
+            context.update({
+                'cart': cart,
+                'cart_items': cart_items,
+                'total_price': total_price,
+                'total_items': cart.get_total_items() if cart else 0,
+            })
         
+        # Quote shipping from the loaded items, no extra queries, for the
+        # destination entered at checkout
+        weight = items_weight(cart_items)
+        zone = selected_zone(self.request.session)
+        quote = quote_selected(self.request.session, total_price, weight, zone)
+        shipping_cost = quote.cost if quote else Decimal('0.00')
         context.update({
-            'cart': cart,
-            'cart_items': cart.items.select_related('product'),
-            'total_price': cart.get_total_price(),
-            'total_items': cart.get_total_items(),
+            'shipping_options': shipping_options(total_price, weight, zone),
+            'shipping_country': get_shipping_country(self.request.session),
+            'shipping_method': quote.method if quote else None,
             'shipping_cost': shipping_cost,
-            'grand_total': cart.get_total_price() + shipping_cost
+            'grand_total': total_price + shipping_cost
         })
         
         return context
-    
-    def _get_shipping_cost(self):
-        """Helper to get shipping cost from session"""
-        try:
-            return Decimal(self.request.session.get('shipping_cost', '10.00'))
-        except:
-            return Decimal('10.00')
 
 
 class CartActionView(View):
     """Base class for cart action views.
     
     Provides common functionality:
-    - Authentication checking
+    - Guest cart for anonymous users (signed cookie, no DB writes)
     - Cart retrieval
     - Standardized JSON responses
     
     Used by: AddToCartView, RemoveFromCartView, UpdateCartItemView, ClearCartView
     """
+    guest_cart = None
+    # Header loaded by the action; writes shift it in place
+    cart = None
     
     def dispatch(self, request, *args, **kwargs):
         if not request.user.is_authenticated:
-            return JsonResponse({
-                'success': False,
-                'message': 'Please log in to manage cart',
-                'requires_login': True
-            }, status=401)
+            self.guest_cart = GuestCart(request)
         return super().dispatch(request, *args, **kwargs)
     
+    @property
+    def stock_user(self):
+        """User whose own reservations don't count against availability"""
+        return self.request.user if self.guest_cart is None else None
+    
     def get_cart(self):
         """Get or create cart for current user"""
-        cart, _ = Cart.objects.get_or_create(user=self.request.user)
-        return cart
+        self.cart, _ = Cart.objects.get_or_create(user=self.request.user)
+        return self.cart
     
     def cart_response(self, success=True, message='', **extra):
-        """Standard cart response format"""
-        cart = self.get_cart()
+        """Standard cart response format.
+        
+        Totals come from the denormalized cart header the action
+        already loaded and shifted, read in one query only when the
+        action never loaded it, or from one batched product lookup for
+        guest carts. They include the shipping quote for the selected
+        method.
+        """
+        if self.guest_cart is not None:
+            items = self.guest_cart.get_items()
+            totals = {
+                'item_count': sum(item.quantity for item in items),
+                'subtotal': sum((item.get_total_price() for item in items), Decimal('0.00')),
+                'weight': items_weight(items),
+            }
+        elif self.cart is not None:
+            totals = {
+                'item_count': self.cart.item_count,
+                'subtotal': self.cart.subtotal,
+                'weight': self.cart.weight,
+            }
+        else:
+            totals = Cart.objects.filter(user=self.request.user).values(
+                'item_count', 'subtotal', 'weight'
+            ).first() or {'item_count': 0, 'subtotal': Decimal('0.00'), 'weight': 0}
+        quote = quote_selected(self.request.session, totals['subtotal'], totals['weight'])
+        shipping_cost = quote.cost if quote else Decimal('0.00')
         response = {
             'success': success,
             'message': message,
-            'cart_count': cart.get_total_items(),
-            'cart_total': str(cart.get_total_price()),
+            'cart_count': totals['item_count'],
+            'cart_total': str(totals['subtotal']),
+            'shipping_method': quote.method if quote else None,
+            'shipping_cost': str(shipping_cost),
+            'grand_total': str(totals['subtotal'] + shipping_cost),
         }
         response.update(extra)
-        return JsonResponse(response, status=200 if success else 400)
+        response = JsonResponse(response, status=200 if success else 400)
+        if self.guest_cart is not None:
+            self.guest_cart.save(response)
+        return response
 
 
-class AddToCartView(CartActionView):
+class AddToCartView(IdempotentPostMixin, CartActionView):
     """Add product to shopping cart.
     
     AJAX endpoint that validates stock, creates or updates cart item.
     Returns JSON with success status and updated cart totals.
+    Retries sent with the same idempotency key replay the first response.
     """
 
     def post(self, request, *args, **kwargs):
@@ -114,22 +180,34 @@ class AddToCartView(CartActionView):
             except Product.DoesNotExist:
                 return self.cart_response(False, 'Product not found')
             
-            # Check stock
-            if product.stock < quantity:
+            # Check stock not held by other customers
+            available = available_stock([product], exclude_user=self.stock_user)[product.pk]
+            if available < quantity:
                 return self.cart_response(
                     False, 
-                    f'Only {product.stock} items available'
+                    f'Only {available} items available'
+                )
+            
+            # Add to guest cart
+            if self.guest_cart is not None:
+                if not self.guest_cart.add(product.pk, quantity):
+                    return self.cart_response(False, 'Your cart is full')
+                return self.cart_response(
+                    True,
+                    f'{product.name} added to cart',
+                    requires_login=False
                 )
             
             # Add to cart
             cart = self.get_cart()
-            cart_item, created = CartItem.objects.get_or_create(
-                cart=cart,
+            cart_item, created = cart.items.get_or_create(
                 product=product,
                 defaults={'price': product.price, 'quantity': quantity}
             )
             
             if not created:
+                # Reuse the loaded product for the weight delta
+                cart_item.product = product
                 cart_item.quantity += quantity
                 cart_item.save()
             
@@ -158,10 +236,17 @@ class RemoveFromCartView(CartActionView):
             if not cart_item_id:
                 return self.cart_response(False, 'Cart item ID required')
             
-            cart_item = CartItem.objects.get(
+            # Guest cart items are keyed by product ID
+            if self.guest_cart is not None:
+                if not self.guest_cart.remove(cart_item_id):
+                    return self.cart_response(False, 'Item not found')
+                return self.cart_response(True, 'Item removed')
+            
+            cart_item = CartItem.objects.select_related('product', 'cart').get(
                 id=cart_item_id, 
                 cart__user=request.user
             )
+            self.cart = cart_item.cart
             product_name = cart_item.product.name
             cart_item.delete()
             
@@ -181,21 +266,26 @@ class UpdateCartItemView(CartActionView):
             cart_item_id = request.POST.get('cart_item_id')
             quantity = int(request.POST.get('quantity', 1))
             
-            cart_item = CartItem.objects.get(
+            if self.guest_cart is not None:
+                return self._update_guest_item(cart_item_id, quantity)
+            
+            cart_item = CartItem.objects.select_related('product', 'cart').get(
                 id=cart_item_id,
                 cart__user=request.user
             )
+            self.cart = cart_item.cart
             
             # Remove if quantity < 1
             if quantity < 1:
                 cart_item.delete()
                 return self.cart_response(True, 'Item removed')
             
-            # Check stock
-            if cart_item.product.stock < quantity:
+            # Check stock not held by other customers
+            available = available_stock([cart_item.product], exclude_user=request.user)[cart_item.product_id]
+            if available < quantity:
                 return self.cart_response(
                     False,
-                    f'Only {cart_item.product.stock} items available'
+                    f'Only {available} items available'
                 )
             
             cart_item.quantity = quantity
@@ -211,6 +301,34 @@ class UpdateCartItemView(CartActionView):
             return self.cart_response(False, 'Item not found')
         except Exception as e:
             return self.cart_response(False, str(e))
+    
+    def _update_guest_item(self, product_id, quantity):
+        """Update guest cart line keyed by product ID"""
+        if not self.guest_cart.get_quantity(product_id):
+            return self.cart_response(False, 'Item not found')
+        
+        if quantity < 1:
+            self.guest_cart.remove(product_id)
+            return self.cart_response(True, 'Item removed')
+        
+        try:
+            product = Product.objects.get(id=product_id, is_active=True)
+        except Product.DoesNotExist:
+            return self.cart_response(False, 'Item not found')
+        
+        available = available_stock([product])[product.pk]
+        if available < quantity:
+            return self.cart_response(
+                False,
+                f'Only {available} items available'
+            )
+        
+        self.guest_cart.set(product.pk, quantity)
+        return self.cart_response(
+            True,
+            'Cart updated',
+            item_total=str(product.price * quantity)
+        )
 
 
 class ClearCartView(CartActionView):
@@ -222,20 +340,226 @@ class ClearCartView(CartActionView):
 
     def post(self, request, *args, **kwargs):
         try:
-            cart = self.get_cart()
-            cart.items.all().delete()
+            if self.guest_cart is not None:
+                self.guest_cart.clear()
+            else:
+                self.get_cart().clear()
             return self.cart_response(True, 'Cart cleared')
         except Exception as e:
             return self.cart_response(False, str(e))
 
 
+class BatchCartView(CartActionView):
+    """Apply several cart operations in one request.
+    
+    AJAX endpoint accepting a JSON body such as::
+    
+        {"operations": [
+            {"op": "add", "product_id": "...", "quantity": 2},
+            {"op": "update", "cart_item_id": "...", "quantity": 3},
+            {"op": "remove", "product_id": "..."}
+        ]}
+    
+    Operations are applied in order to an in-memory copy of the cart.
+    Stock for every affected product is validated in one query and the
+    result is written with bulk_create, bulk_update and a single delete.
+    Nothing is written unless every operation is valid.
+    """
+    MAX_OPERATIONS = 100
+
+    def post(self, request, *args, **kwargs):
+        try:
+            operations = json.loads(request.body).get('operations')
+        except (ValueError, AttributeError):
+            return self.cart_response(False, 'Invalid request format')
+        
+        if not isinstance(operations, list) or not operations:
+            return self.cart_response(False, 'No operations given')
+        if len(operations) > self.MAX_OPERATIONS:
+            return self.cart_response(False, f'At most {self.MAX_OPERATIONS} operations per request')
+        
+        # Current cart state keyed by product ID
+        if self.guest_cart is not None:
+            cart, items = None, {}
+            current = dict(self.guest_cart.lines)
+            item_products = {}
+        else:
+            cart = self.get_cart()
+            items = {item.product_id: item for item in cart.items.select_related('product')}
+            current = {product_id: item.quantity for product_id, item in items.items()}
+            item_products = {item.pk: product_id for product_id, item in items.items()}
+        
+        try:
+            desired = self._apply_operations(operations, current, item_products)
+        except LookupError:
+            return self.cart_response(False, 'Item not found')
+        except (ValueError, TypeError, AttributeError):
+            return self.cart_response(False, 'Invalid operation')
+        
+        changed = [
+            product_id for product_id in current.keys() | desired.keys()
+            if current.get(product_id) != desired.get(product_id)
+        ]
+        if not changed:
+            return self.cart_response(True, 'Cart unchanged', items=[])
+        if self.guest_cart is not None and len(desired) > GuestCart.MAX_LINES:
+            return self.cart_response(False, 'Your cart is full')
+        
+        # Validate stock for every affected product in one query
+        kept = [product_id for product_id in changed if desired.get(product_id)]
+        products = {
+            product.pk: product
+            for product in with_held_stock(
+                Product.objects.filter(pk__in=kept, is_active=True),
+                exclude_user=self.stock_user
+            )
+        }
+        errors = []
+        for product_id in kept:
+            product = products.get(product_id)
+            if product is None:
+                errors.append({'product_id': str(product_id), 'message': 'Product not found'})
+                continue
+            available = max(product.stock - product.held, 0)
+            if desired[product_id] > current.get(product_id, 0) and desired[product_id] > available:
+                errors.append({
+                    'product_id': str(product_id),
+                    'message': f'Only {available} {product.name} available'
+                })
+        if errors:
+            return self.cart_response(False, errors[0]['message'], errors=errors)
+        
+        if self.guest_cart is not None:
+            for product_id in changed:
+                self.guest_cart.set(product_id, desired.get(product_id, 0))
+            lines = [
+                (product_id, product_id, products[product_id].price)
+                for product_id in kept
+            ]
+        else:
+            lines = self._write_changes(cart, items, products, changed, desired)
+        
+        return self.cart_response(
+            True,
+            'Cart updated',
+            items=[
+                {
+                    'product_id': str(product_id),
+                    'cart_item_id': str(item_id),
+                    'quantity': desired[product_id],
+                    'item_total': str(price * desired[product_id]),
+                }
+                for product_id, item_id, price in lines
+            ]
+        )
+    
+    def _apply_operations(self, operations, current, item_products):
+        """Replay operations over current quantities.
+        
+        Raises LookupError for updates of items not in the cart and
+        ValueError/TypeError for malformed operations.
+        """
+        desired = dict(current)
+        for operation in operations:
+            if 'product_id' in operation:
+                product_id = uuid.UUID(str(operation['product_id']))
+            else:
+                item_id = uuid.UUID(str(operation['cart_item_id']))
+                # Guest cart items are keyed by product ID
+                product_id = item_id if self.guest_cart is not None else item_products[item_id]
+            
+            op = operation.get('op')
+            if op == 'remove':
+                desired.pop(product_id, None)
+                continue
+            
+            quantity = int(operation.get('quantity', 1))
+            if op == 'add':
+                if quantity < 1:
+                    raise ValueError('Invalid quantity')
+                desired[product_id] = desired.get(product_id, 0) + quantity
+            elif op == 'update':
+                if product_id not in desired:
+                    raise LookupError(product_id)
+                if quantity < 1:
+                    desired.pop(product_id)
+                else:
+                    desired[product_id] = quantity
+            else:
+                raise ValueError(f'Unknown operation {op!r}')
+        return desired
+    
+    def _write_changes(self, cart, items, products, changed, desired):
+        """Write the diff in bulk and shift the cart header once.
+        
+        Returns (product_id, cart_item_id, price) for lines kept in the cart.
+        """
+        new_items, updated_items, removed_ids, lines = [], [], [], []
+        quantity_delta, amount_delta, weight_delta = 0, Decimal('0.00'), 0
+        now = timezone.now()
+        
+        for product_id in changed:
+            quantity = desired.get(product_id, 0)
+            item = items.get(product_id)
+            if item is None:
+                product = products[product_id]
+                item = CartItem(cart=cart, product=product, quantity=quantity, price=product.price)
+                new_items.append(item)
+                quantity_delta += quantity
+                amount_delta += item.get_total_price()
+                weight_delta += quantity * product.weight
+            elif quantity == 0:
+                removed_ids.append(item.pk)
+                quantity_delta -= item.quantity
+                amount_delta -= item.get_total_price()
+                weight_delta -= item.quantity * item.product.weight
+                continue
+            else:
+                quantity_delta += quantity - item.quantity
+                amount_delta += item.price * (quantity - item.quantity)
+                weight_delta += (quantity - item.quantity) * item.product.weight
+                item.quantity = quantity
+                item.updated_at = now
+                updated_items.append(item)
+            lines.append((product_id, item.pk, item.price))
+        
+        with transaction.atomic():
+            if new_items:
+                CartItem.objects.bulk_create(new_items)
+            if updated_items:
+                CartItem.objects.bulk_update(updated_items, ['quantity', 'updated_at'])
+            if removed_ids:
+                CartItem.objects.filter(pk__in=removed_ids).delete()
+            cart.shift_totals(quantity_delta, amount_delta, weight_delta)
+        return lines
+
+
+class ShippingMethodView(CartActionView):
+    """Select the delivery method and/or destination country for the cart.
+    
+    Stores them in the session; the cost is always quoted server-side
+    for the session's destination zone. Returns JSON with the updated
+    shipping and totals.
+    """
+
+    def post(self, request, *args, **kwargs):
+        if 'country' in request.POST:
+            set_shipping_country(request.session, request.POST['country'])
+            if 'shipping_method' not in request.POST:
+                return self.cart_response(True, 'Shipping destination updated')
+        method = request.POST.get('shipping_method')
+        if not set_shipping_method(request.session, method):
+            return self.cart_response(False, 'Unknown shipping method')
+        return self.cart_response(True, f'Shipping method set to {Delivery.DeliveryMethod(method).label}')
+
+
 # ===== Checkout Views =====
 
 class CheckoutView(LoginRequiredMixin, TemplateView):
     """Display checkout page.
     
-    GET: Show checkout form with cart items and shipping options
-    POST: Handle shipping method selection (AJAX)
+    GET: Reserve cart stock and show checkout form with cart items
+         and the quoted shipping cost
     
     Requires authentication and non-empty cart.
     """
@@ -247,58 +571,54 @@ class CheckoutView(LoginRequiredMixin, TemplateView):
         
         try:
             cart = Cart.objects.get(user=self.request.user)
-            shipping_cost = self._get_shipping_cost()
+            cart_items = list(cart.items.select_related('product'))
+            price_changes = acknowledge_price_changes(cart, cart_items)
+            
+            # Hold stock while the customer fills in the form
+            unavailable = reserve_stock(
+                self.request.user,
+                {item.product_id: item.quantity for item in cart_items}
+            )
+            
+            total_price = cart.get_total_price()
+            quote = quote_selected(self.request.session, total_price, items_weight(cart_items))
+            shipping_cost = quote.cost if quote else Decimal('0.00')
             
             context.update({
                 'cart': cart,
-                'cart_items': cart.items.select_related('product'),
-                'total_price': cart.get_total_price(),
+                'cart_items': cart_items,
+                'unavailable_items': [item for item in cart_items if item.product_id in unavailable],
+                'price_changes': price_changes,
+                'total_price': total_price,
+                'shipping_quote': quote,
+                'shipping_country': get_shipping_country(self.request.session),
                 'shipping_cost': shipping_cost,
-                'grand_total': cart.get_total_price() + shipping_cost,
-                'customer': self._get_or_create_customer()
+                'grand_total': total_price + shipping_cost,
+                'customer': self._get_or_create_customer(),
+                'idempotency_key': uuid.uuid4().hex
             })
         except Cart.DoesNotExist:
             context['empty_cart'] = True
         
         return context
     
-    def post(self, request, *args, **kwargs):
-        """Handle shipping method selection via AJAX"""
-        try:
-            shipping_method = request.POST.get('shipping_method')
-            shipping_cost = request.POST.get('shipping_cost')
-            
-            # Store in session
-            request.session['shipping_method'] = shipping_method
-            request.session['shipping_cost'] = shipping_cost
-            request.session.modified = True
-            
-            return JsonResponse({
-                'success': True,
-                'message': f'Shipping method set to {shipping_method}'
-            })
-        except Exception as e:
-            return JsonResponse({
-                'success': False,
-                'message': 'Error setting shipping'
-            }, status=500)
-    
-    def _get_shipping_cost(self):
-        try:
-            return Decimal(self.request.session.get('shipping_cost', '10.00'))
-        except:
-            return Decimal('10.00')
-    
     def _get_or_create_customer(self):
         customer, _ = Customer.objects.get_or_create(user=self.request.user)
         return customer
 
 
-class PlaceOrderView(LoginRequiredMixin, View):
+class PlaceOrderView(LoginRequiredMixin, IdempotentPostMixin, View):
     """Process checkout and create order.
     
-    POST only: Creates order from cart items, updates customer info,
-    clears cart, and redirects to confirmation page.
+    POST only: Creates order and delivery from cart items, updates
+    customer info, takes stock, clears cart, and redirects to
+    confirmation page. All writes run in a single transaction. The checkout form carries
+    an idempotency key, so double submits redirect to the same order.
+    
+    Shipping is quoted for the submitted country, which becomes the
+    session's destination. If that cost differs from the one the form
+    showed (``shipping_cost``), nothing is charged and the checkout page
+    is shown again with the new quote.
     
     Validates non-empty cart before processing.
     """
@@ -307,43 +627,94 @@ class PlaceOrderView(LoginRequiredMixin, View):
     def post(self, request, *args, **kwargs):
         try:
             cart = Cart.objects.get(user=request.user)
+            cart_items = list(cart.items.values_list('product_id', 'quantity', 'price', 'product__weight'))
             
-            if not cart.items.exists():
+            if not cart_items:
                 messages.error(request, 'Your cart is empty')
                 return redirect('orders:cart')
             
+            # Prices changed since the checkout page was shown
+            if cart.prices_changed_at is not None:
+                messages.warning(request, 'Some prices in your cart have changed, please review your order')
+                return redirect('orders:checkout')
+            
             # Get or create customer
             customer, _ = Customer.objects.get_or_create(user=request.user)
             
             # Update customer info
             customer.phone = request.POST.get('phone', customer.phone)
             customer.address = request.POST.get('address', customer.address)
-            customer.save()
             
-            # Calculate total
-            shipping_cost = self._get_shipping_cost()
-            total = cart.get_total_price() + shipping_cost
+            # Calculate total with a server-side shipping quote
+            subtotal = sum(price * quantity for _, quantity, price, _ in cart_items)
+            weight = sum(weight * quantity for _, quantity, _, weight in cart_items)
+            country = request.POST.get('country', '')
+            set_shipping_country(request.session, country)
+            shipping = quote_selected(request.session, subtotal, weight)
+            if shipping is None:
+                messages.error(request, 'We cannot ship to this destination')
+                return redirect('orders:checkout')
+            try:
+                shown_cost = Decimal(request.POST.get('shipping_cost', ''))
+            except InvalidOperation:
+                shown_cost = None
+            if shown_cost != shipping.cost:
+                messages.warning(
+                    request, f'Shipping to {country or "your address"} costs ${shipping.cost}, please review your order'
+                )
+                return redirect('orders:checkout')
+            total = subtotal + shipping.cost
+            
+            quantities = {}
+            for product_id, quantity, _, _ in cart_items:
+                quantities[product_id] = quantities.get(product_id, 0) + quantity
             
-            # Create order
-            order = Order.objects.create(
-                customer=customer,
-                total_price=total,
-                status='N',
-                address=request.POST.get('address', customer.address) or 'Not provided',
-                is_draft=False
-            )
+            address = request.POST.get('address', customer.address) or 'Not provided'
+            delivery_address = ', '.join(filter(None, [
+                address,
+                request.POST.get('city', ''),
+                request.POST.get('state', ''),
+                request.POST.get('zip', ''),
+                country,
+            ]))
             
-            # Add order items
-            for cart_item in cart.items.all():
-                OrderElement.objects.create(
+            with transaction.atomic():
+                customer.save(update_fields=['phone', 'address'])
+                
+                # Create order
+                order = Order.objects.create(
+                    customer=customer,
+                    total_price=total,
+                    status=Order.StatusChoice.NEW,
+                    address=address,
+                    is_draft=False
+                )
+                record_order_created(order)
+                Delivery.objects.create(
                     order=order,
-                    product=cart_item.product,
-                    quantity=cart_item.quantity,
-                    price=cart_item.price
+                    method=shipping.method,
+                    delivery_cost=shipping.cost,
+                    rate_version=shipping.version,
+                    estimated_delivery_date=shipping.estimated_delivery_date,
+                    delivery_address=delivery_address,
+                    recipient_name=request.POST.get('name', ''),
+                    recipient_phone=customer.phone,
                 )
-            
-            # Clear cart
-            cart.items.all().delete()
+                
+                # Add order items and take stock
+                OrderElement.objects.bulk_create([
+                    OrderElement(
+                        order=order,
+                        product_id=product_id,
+                        quantity=quantity,
+                        price=price
+                    )
+                    for product_id, quantity, price, _ in cart_items
+                ])
+                decrement_stock(quantities, user=request.user)
+                
+                # Clear cart
+                cart.clear()
             
             messages.success(request, 'Order placed successfully!')
             return redirect('orders:order_confirmation', order_uuid=order.uuid)
@@ -351,44 +722,59 @@ class PlaceOrderView(LoginRequiredMixin, View):
         except Cart.DoesNotExist:
             messages.error(request, 'Cart not found')
             return redirect('orders:cart')
+        except InsufficientStockError as e:
+            # Holds of a failed checkout would block other customers until
+            # they expire; the next checkout reserves again
+            release_reservations(request.user)
+            messages.error(request, str(e))
+            return redirect('orders:cart')
         except Exception as e:
             messages.error(request, f'Error placing order: {str(e)}')
             return redirect('orders:checkout')
-    
-    def _get_shipping_cost(self):
-        try:
-            return Decimal(self.request.session.get('shipping_cost', '10.00'))
-        except:
-            return Decimal('10.00')
 
 
 class OrderConfirmationView(LoginRequiredMixin, DetailView):
-    """Order confirmation page"""
+    """Order confirmation and detail page.
+    
+    Renders from ``get_order_detail`` in three queries regardless of
+    the number of lines.
+    """
     model = Order
     template_name = 'orders/cart/order_confirmation.html'
     context_object_name = 'order'
     login_url = 'users:login'
 
-    def get_queryset(self):
-        return Order.objects.filter(customer__user=self.request.user)
-    
     def get_object(self, queryset=None):
-        if queryset is None:
-            queryset = self.get_queryset()
-        order_uuid = self.kwargs.get('order_uuid')
-        return get_object_or_404(queryset, uuid=order_uuid)
+        # Old completed orders may have been moved to the archive
+        order = get_order_detail(self.request.user, self.kwargs.get('order_uuid'))
+        if order is None:
+            raise Http404('Order not found')
+        return order
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['order_items'] = self.get_object().order_items.all()
-        context['shipping_cost'] = Decimal('10.00')
+        order_items = self.object.lines
+        subtotal = sum((item.total_price for item in order_items), Decimal('0.00'))
+        delivery = order_delivery(self.object)
+        context.update({
+            'order_items': order_items,
+            'delivery': delivery,
+            # First time the order reached each status, from the loaded timeline
+            'status_dates': {
+                event.status: event.created_at
+                for event in reversed(self.object.timeline) if event.kind == OrderEvent.Kind.ORDER
+            },
+            'subtotal': subtotal,
+            # Orders placed before deliveries were recorded: shipping is the remainder
+            'shipping_cost': delivery.delivery_cost if delivery else self.object.total_price - subtotal,
+        })
         return context
 
 
 # ============ ORDER LIST VIEW ============
 
 class OrderListView(LoginRequiredMixin, TemplateView):
-    """Display all user orders"""
+    """Display user orders, newest first, one cursor page at a time"""
     template_name = 'orders/order_list.html'
     login_url = 'users:login'
 
@@ -396,11 +782,49 @@ class OrderListView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         try:
             customer = self.request.user.customer
-            context['orders'] = Order.objects.filter(
-                customer=customer,
-                is_draft=False
-            ).order_by('-registered_at')
+            context['orders'], context['next_cursor'] = order_history(
+                customer,
+                cursor=self.request.GET.get('cursor')
+            )
         except:
             context['orders'] = []
         
         return context
+
+
+# ===== Carrier Tracking =====
+
+class TrackingIngestView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """Apply a carrier tracking file posted by staff.
+    
+    Accepts an uploaded ``file`` or a raw request body. The format comes
+    from ``?format=csv|jsonl|json`` or the Content-Type, and the body is
+    decoded and parsed as a stream, so large files are never held in
+    memory as a whole (except plain JSON arrays).
+    Returns JSON with the matched/changed/rejected counters.
+    """
+    login_url = 'users:login'
+    CONTENT_TYPES = {
+        'text/csv': 'csv',
+        'application/x-ndjson': 'jsonl',
+        'application/jsonl': 'jsonl',
+        'application/json': 'json',
+    }
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get('file')
+        source = upload if upload is not None else request
+        content_type = (upload.content_type if upload is not None else request.content_type) or ''
+        file_format = request.GET.get('format') or self.CONTENT_TYPES.get(content_type, 'csv')
+        if file_format not in ('csv', 'jsonl', 'json'):
+            return JsonResponse({'success': False, 'message': 'Unknown format'}, status=400)
+
+        try:
+            lines = codecs.iterdecode(source, 'utf-8')
+            report = ingest_tracking_updates(read_rows(lines, file_format))
+        except (UnicodeDecodeError, ValueError) as e:
+            return JsonResponse({'success': False, 'message': f'Unreadable file: {e}'}, status=400)
+        return JsonResponse({'success': True, **report.as_dict()})
@@ -28,14 +28,16 @@ function addToCart(productId, productName) {
     form.append('product_id', productId);
     form.append('quantity', 1);
 
+    const action = 'add-to-cart:' + productId;
     fetch("/orders/cart/add/", {
         method: 'POST',
         body: form,
         headers: {
-            'X-CSRFToken': getCookie('csrftoken')
+            'X-CSRFToken': getCookie('csrftoken'),
+            'Idempotency-Key': idempotencyKey(action)
         }
     })
-    .then(response => response.json())
+    .then(response => settleIdempotencyKey(action, response).json())
     .then(data => {
         if (data.success) {
             showNotification(productName + ' added to cart', 'success');
@@ -2,5 +2,7 @@
 window.CART_URLS = {
     'remove_from_cart': '/core/remove-from-cart/',
     'update_cart': '/core/update-cart/',
-    'clear_cart': '/core/clear-cart/'
+    'clear_cart': '/core/clear-cart/',
+    'batch_cart': '/orders/cart/batch/',
+    'set_shipping': '/orders/cart/shipping/'
 };
@@ -105,7 +105,7 @@ function removeFromCart(cartItemId) {
                     itemElement.remove();
                 }
                 updateCartCount(data.cart_count);
-                updateCartSummary(data.cart_total);
+                updateCartSummary(data);
                 showNotification(data.message, 'success');
                 
                 // Check if cart is now empty
@@ -126,10 +126,14 @@ function removeFromCart(cartItemId) {
     });
 }
 
+// Pending quantity changes, sent together once clicks pause
+const pendingQuantities = {};
+let quantityFlushTimer = null;
+const QUANTITY_DEBOUNCE_MS = 400;
+
 // Update quantity
 function updateQuantity(cartItemId, newQuantity) {
     const qtyInput = document.querySelector(`[data-item-id="${cartItemId}"] .qty-input`);
-    const itemElement = document.querySelector(`[data-item-id="${cartItemId}"]`);
     const oldQuantity = parseInt(qtyInput.value);
     
     newQuantity = parseInt(newQuantity);
@@ -139,60 +143,96 @@ function updateQuantity(cartItemId, newQuantity) {
         return;
     }
 
-    if (newQuantity === oldQuantity) {
+    if (newQuantity === oldQuantity && !(cartItemId in pendingQuantities)) {
         return; // No change needed
     }
 
-    // Store original quantity for potential revert
-    const originalQuantity = oldQuantity;
+    // Remember the last confirmed quantity for a potential revert
+    if (!(cartItemId in pendingQuantities)) {
+        pendingQuantities[cartItemId] = { original: oldQuantity };
+    }
+    pendingQuantities[cartItemId].quantity = newQuantity;
     
     // Update UI immediately (optimistic update)
     qtyInput.value = newQuantity;
-    itemElement.style.opacity = '0.7';
-    itemElement.style.pointerEvents = 'none';
+    
+    clearTimeout(quantityFlushTimer);
+    quantityFlushTimer = setTimeout(flushQuantityUpdates, QUANTITY_DEBOUNCE_MS);
+}
 
-    const form = new FormData();
-    form.append('cart_item_id', cartItemId);
-    form.append('quantity', newQuantity);
+// Send all pending quantity changes in a single batch request
+function flushQuantityUpdates() {
+    const updates = Object.assign({}, pendingQuantities);
+    Object.keys(pendingQuantities).forEach(id => delete pendingQuantities[id]);
+    
+    const itemIds = Object.keys(updates);
+    if (itemIds.length === 0) {
+        return;
+    }
+    
+    const setLoading = (loading) => {
+        itemIds.forEach(id => {
+            const itemElement = document.querySelector(`[data-item-id="${id}"]`);
+            if (itemElement) {
+                itemElement.style.opacity = loading ? '0.7' : '1';
+            }
+        });
+    };
+    
+    const revert = () => {
+        itemIds.forEach(id => {
+            const qtyInput = document.querySelector(`[data-item-id="${id}"] .qty-input`);
+            if (qtyInput) {
+                qtyInput.value = updates[id].original;
+            }
+        });
+    };
+    
+    setLoading(true);
 
-    fetch(window.CART_URLS.update_cart, {
+    fetch(window.CART_URLS.batch_cart, {
         method: 'POST',
-        body: form,
+        body: JSON.stringify({
+            operations: itemIds.map(id => ({
+                op: 'update',
+                cart_item_id: id,
+                quantity: updates[id].quantity
+            }))
+        }),
         headers: {
+            'Content-Type': 'application/json',
             'X-CSRFToken': getCookie('csrftoken')
         }
     })
     .then(response => response.json())
     .then(data => {
+        setLoading(false);
         if (data.success) {
-            // Update item total
-            const itemTotalElement = itemElement.querySelector('.item-total');
-            itemTotalElement.textContent = '$' + parseFloat(data.item_total).toFixed(2);
-            itemTotalElement.style.animation = 'slideUp 0.3s ease';
+            // Update item totals
+            data.items.forEach(item => {
+                const itemTotalElement = document.querySelector(`[data-item-id="${item.cart_item_id}"] .item-total`);
+                if (itemTotalElement) {
+                    itemTotalElement.textContent = '$' + parseFloat(item.item_total).toFixed(2);
+                    itemTotalElement.style.animation = 'slideUp 0.3s ease';
+                }
+            });
             
             // Update all totals
             updateCartSummary(data);
             updateCartCount(data.cart_count);
             
-            // Remove loading state
-            itemElement.style.opacity = '1';
-            itemElement.style.pointerEvents = 'auto';
-            
             showNotification('Cart updated successfully', 'success');
         } else {
-            // Revert quantity to original value
-            qtyInput.value = originalQuantity;
-            itemElement.style.opacity = '1';
-            itemElement.style.pointerEvents = 'auto';
+            // Revert quantities to original values
+            revert();
             showNotification(data.message || 'Error updating quantity', 'error');
         }
     })
     .catch(error => {
         console.error('Error:', error);
-        // Revert quantity to original value on error
-        qtyInput.value = originalQuantity;
-        itemElement.style.opacity = '1';
-        itemElement.style.pointerEvents = 'auto';
+        // Revert quantities to original values on error
+        setLoading(false);
+        revert();
         showNotification('Error updating quantity', 'error');
     });
 }
@@ -205,8 +245,11 @@ function updateCartSummary(cartData) {
         cartTotal = cartData.cart_total || cartData.grand_total || 0;
     }
     
+    // Shipping is quoted by the server with every cart response
     const subtotal = parseFloat(cartTotal);
-    const shipping = subtotal > 0 ? 10.00 : 0.00;
+    const shipping = typeof cartData === 'object' && cartData.shipping_cost !== undefined
+        ? parseFloat(cartData.shipping_cost)
+        : 0.00;
     const grandTotal = (subtotal + shipping).toFixed(2);
     
     // Update subtotal
@@ -284,20 +327,16 @@ function clearCart() {
 function handleShippingChange() {
     const selectedOption = document.querySelector('input[name="shipping_method"]:checked');
     if (selectedOption) {
-        const cost = parseFloat(selectedOption.dataset.cost);
-        const method = selectedOption.value;
-        updateShippingCost(cost);
-        saveShippingSelection(method, cost);
+        saveShippingSelection(selectedOption.value);
     }
 }
 
-// Save shipping selection to session
-function saveShippingSelection(method, cost) {
+// Save shipping selection to session; the server quotes the cost
+function saveShippingSelection(method) {
     const formData = new FormData();
     formData.append('shipping_method', method);
-    formData.append('shipping_cost', cost);
     
-    fetch('/orders/set-shipping/', {
+    fetch(window.CART_URLS.set_shipping, {
         method: 'POST',
         body: formData,
         headers: {
@@ -307,7 +346,7 @@ function saveShippingSelection(method, cost) {
     .then(response => response.json())
     .then(data => {
         if (data.success) {
-            console.log('Shipping method saved: ' + method + ' - $' + cost);
+            updateShippingCost(parseFloat(data.shipping_cost));
         }
     })
     .catch(error => console.error('Error saving shipping:', error));
@@ -24,6 +24,46 @@ document.addEventListener('DOMContentLoaded', function() {
 
     // Form validation
     const checkoutForm = document.querySelector('.checkout-form');
+
+    // Re-quote shipping for the entered country; the form carries the
+    // quoted cost so the order is only placed at the price shown
+    const countryInput = document.getElementById('country');
+    if (checkoutForm && countryInput) {
+        const placeButton = checkoutForm.querySelector('.btn-place-order');
+        let requote = null;
+
+        countryInput.addEventListener('input', function() {
+            placeButton.disabled = true;
+            clearTimeout(requote);
+            requote = setTimeout(updateShippingQuote, 400);
+        });
+
+        function updateShippingQuote() {
+            const formData = new FormData();
+            formData.append('country', countryInput.value);
+
+            fetch(checkoutForm.dataset.shippingUrl, {
+                method: 'POST',
+                body: formData,
+                headers: {
+                    'X-CSRFToken': checkoutForm.querySelector('[name="csrfmiddlewaretoken"]').value
+                }
+            })
+            .then(response => response.json())
+            .then(data => {
+                if (data.success) {
+                    checkoutForm.querySelector('[name="shipping_cost"]').value = data.shipping_cost;
+                    document.querySelector('.checkout-shipping').textContent = '$' + data.shipping_cost;
+                    document.querySelector('.checkout-total').textContent = '$' + data.grand_total;
+                }
+            })
+            .catch(error => console.error('Error quoting shipping:', error))
+            .finally(() => {
+                placeButton.disabled = false;
+            });
+        }
+    }
+
     if (checkoutForm) {
         checkoutForm.addEventListener('submit', function(e) {
             const terms = document.querySelector('input[name="terms"]');
@@ -121,14 +121,17 @@ function addToCart(e, productId) {
     form.append('product_id', productId);
     form.append('quantity', 1);
 
+    const action = 'add-to-cart:' + productId;
     fetch('/orders/cart/add/', {
         method: 'POST',
         body: form,
         headers: {
-            'X-CSRFToken': getCookie('csrftoken')
+            'X-CSRFToken': getCookie('csrftoken'),
+            'Idempotency-Key': idempotencyKey(action)
         }
     })
     .then(response => {
+        settleIdempotencyKey(action, response);
         if (response.status === 302 || response.redirected) {
             showNotification('Please log in to add items to cart', 'warning');
             window.location.href = '/users/login/';
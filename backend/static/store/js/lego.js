@@ -18,20 +18,52 @@ function getCookie(name) {
     return cookieValue;
 }
 
+// Unique key per user action, so retried requests are not applied twice
+function newIdempotencyKey() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    return Date.now().toString(36) + Math.random().toString(36).slice(2);
+}
+
+// Keys of the actions on this page (e.g. 'add-to-cart:12'). A double
+// click or a retry after a network error reuses the action's key, so the
+// server applies it once; the key is only rotated once the server has
+// answered, making the next click a new action.
+const idempotencyKeys = {};
+
+function idempotencyKey(action) {
+    if (!idempotencyKeys[action]) {
+        idempotencyKeys[action] = newIdempotencyKey();
+    }
+    return idempotencyKeys[action];
+}
+
+// Call with the response of the request that sent the action's key
+function settleIdempotencyKey(action, response) {
+    // 5xx and 409 (still in progress) leave the key unused on the server
+    if (response.status < 500 && response.status !== 409) {
+        delete idempotencyKeys[action];
+    }
+    return response;
+}
+
 // Add to cart via AJAX
 function addToCart(productId, productName) {
     const form = new FormData();
     form.append('product_id', productId);
     form.append('quantity', 1);
 
+    const action = 'add-to-cart:' + productId;
     fetch("/orders/cart/add/", {
         method: 'POST',
         body: form,
         headers: {
-            'X-CSRFToken': getCookie('csrftoken')
+            'X-CSRFToken': getCookie('csrftoken'),
+            'Idempotency-Key': idempotencyKey(action)
         }
     })
-    .then(response => response.json())
+    .then(response => settleIdempotencyKey(action, response).json())
     .then(data => {
         if (data.success) {
             showNotification(productName + ' added to cart', 'success');
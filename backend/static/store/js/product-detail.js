@@ -167,14 +167,18 @@ function addToCart(productId, productName) {
     form.append('product_id', productId);
     form.append('quantity', quantity);
 
+    // Another quantity is another action
+    const action = 'add-to-cart:' + productId + ':' + quantity;
     fetch(addToCartUrl, {
         method: 'POST',
         body: form,
         headers: {
-            'X-CSRFToken': getCookie('csrftoken')
+            'X-CSRFToken': getCookie('csrftoken'),
+            'Idempotency-Key': idempotencyKey(action)
         }
     })
     .then(response => {
+        settleIdempotencyKey(action, response);
         console.log('Response status:', response.status);
         console.log('Response ok:', response.ok);
         
@@ -46,14 +46,16 @@ function addToCart(e, productId) {
     form.append('product_id', productId);
     form.append('quantity', 1);
 
+    const action = 'add-to-cart:' + productId;
     fetch(document.body.dataset.addToCartUrl, {
         method: 'POST',
         body: form,
         headers: {
-            'X-CSRFToken': getCookie('csrftoken')
+            'X-CSRFToken': getCookie('csrftoken'),
+            'Idempotency-Key': idempotencyKey(action)
         }
     })
-    .then(response => response.json())
+    .then(response => settleIdempotencyKey(action, response).json())
     .then(data => {
         if (data.success) {
             showNotification(data.message, 'success');
@@ -17,12 +17,13 @@ class ProductAdmin(admin.ModelAdmin):
     search_fields = ['name', 'slug', 'description']
     prepopulated_fields = {'slug': ('name',)}
     readonly_fields = ['created_at', 'updated_at']
+    list_select_related = ['category']
     fieldsets = (
         ('Basic Information', {
             'fields': ('name',"status" ,'slug', 'category', 'description')
         }),
         ('Pricing & Stock', {
-            'fields': ('price', 'stock')
+            'fields': ('price', 'stock', 'weight')
         }),
         ('Media', {
             'fields': ('picture',)
@@ -49,6 +50,9 @@ class ReviewAdmin(admin.ModelAdmin):
         'created_at'
     )
     list_filter = ('rating', 'is_approved', 'created_at')
+    list_select_related = ('product', 'author')
+    autocomplete_fields = ('product',)
+    raw_id_fields = ('author',)
     search_fields = (
         'product__name',
         'author__username',
@@ -0,0 +1,52 @@
+"""Import product prices from a CSV file with ``slug`` and ``price`` columns.
+
+Prices are written with ``bulk_update`` in batches, which sends
+``prices_changed`` so carts holding the products are repriced.
+"""
+import csv
+import sys
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+
+from store.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Update product prices from a CSV file (slug,price)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV file, or '-' for stdin")
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Products updated per statement')
+
+    def handle(self, *args, **options):
+        try:
+            source = sys.stdin if options['path'] == '-' else open(options['path'], newline='', encoding='utf-8')
+        except OSError as e:
+            raise CommandError(str(e))
+
+        prices, skipped = {}, 0
+        with source:
+            for row in csv.DictReader(source):
+                try:
+                    price = Decimal(row['price'])
+                except (KeyError, TypeError, InvalidOperation):
+                    skipped += 1
+                    continue
+                if price < 0 or not row.get('slug'):
+                    skipped += 1
+                    continue
+                prices[row['slug']] = price
+
+        updated = 0
+        slugs = list(prices)
+        for start in range(0, len(slugs), options['batch_size']):
+            changed = []
+            for product in Product.objects.filter(slug__in=slugs[start:start + options['batch_size']]).only('pk', 'slug', 'price'):
+                if product.price != prices[product.slug]:
+                    product.price = prices[product.slug]
+                    changed.append(product)
+            Product.objects.bulk_update(changed, ['price'])
+            updated += len(changed)
+        self.stdout.write(self.style.SUCCESS(f'Updated {updated} price(s), skipped {skipped} row(s)'))
@@ -6,9 +6,10 @@ Contains models for:
 """
 import uuid
 
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
 from decimal import Decimal
+from store.signals import BATCH_SIZE, send_prices_changed
 from users.models import CustomUser
 
 class Category(models.Model):
@@ -32,6 +33,38 @@ class Category(models.Model):
             models.Index(fields=["slug"]),
             models.Index(fields=["title"])
         ]
+
+
+class ProductQuerySet(models.QuerySet):
+    """Product queries that announce price writes.
+
+    ``update(price=...)`` and ``bulk_update(..., ['price'])`` skip
+    ``save()``, so they send ``prices_changed`` themselves.
+    """
+
+    def update(self, **kwargs):
+        if 'price' not in kwargs:
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            # Ids are read before the UPDATE (it may change what the filter
+            # matches), by keyset in chunks, each announced on its own
+            pks = self.order_by('pk').values_list('pk', flat=True)
+            chunk = list(pks[:BATCH_SIZE])
+            while chunk:
+                send_prices_changed(Product, chunk, using=self.db)
+                chunk = list(pks.filter(pk__gt=chunk[-1])[:BATCH_SIZE])
+            updated = super().update(**kwargs)
+        return updated
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            updated = super().bulk_update(objs, fields, batch_size=batch_size)
+            if 'price' in fields:
+                send_prices_changed(Product, [obj.pk for obj in objs], using=self.db)
+        return updated
+
+
 class Product(models.Model):
     """Model representing a product.
     
@@ -55,6 +88,7 @@ class Product(models.Model):
     picture = models.ImageField(blank=True, upload_to="products", default="products/default.png")
     price: float = models.DecimalField(max_digits=10, decimal_places=2)
     stock: int = models.PositiveIntegerField(default=0)
+    weight: int = models.PositiveIntegerField(default=0, help_text='Shipping weight in grams')
     category = models.ForeignKey(
         Category,
         on_delete=models.CASCADE,
@@ -64,9 +98,27 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ProductQuerySet.as_manager()
+
     def __str__(self) -> str:
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored price so save() can announce a change
+        instance._stored_price = instance.__dict__.get('price')
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Save product and send ``prices_changed`` if the price moved."""
+        stored_price = getattr(self, '_stored_price', None)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if stored_price is not None and stored_price != self.price:
+                send_prices_changed(Product, [self.pk])
+        self._stored_price = self.price
+
     def get_absolute_url(self):
         from django.urls import reverse
         return reverse('store:product_detail', kwargs={'slug': self.slug})
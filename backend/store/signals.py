@@ -0,0 +1,30 @@
+"""Signals sent by the store app.
+
+``prices_changed`` is sent with ``product_ids`` whenever product prices
+are written: ``Product.save()``, ``Product.objects.update(price=...)``
+and ``bulk_update`` with ``price``. Apps holding copied prices (carts)
+listen to it instead of being imported by the catalog.
+
+Signals are sent once the writing transaction commits, with at most
+``BATCH_SIZE`` ids each, so a catalog-wide price update becomes several
+bounded announcements instead of one carrying every product id.
+"""
+from functools import partial
+
+from django.db import transaction
+from django.dispatch import Signal
+
+prices_changed = Signal()
+
+# Most product ids announced by one signal
+BATCH_SIZE = 1000
+
+
+def send_prices_changed(sender, product_ids, using=None):
+    """Send ``prices_changed`` for ``product_ids`` once the current transaction commits."""
+    product_ids = list(product_ids)
+    for start in range(0, len(product_ids), BATCH_SIZE):
+        transaction.on_commit(
+            partial(prices_changed.send, sender=sender, product_ids=product_ids[start:start + BATCH_SIZE]),
+            using=using,
+        )
@@ -3,17 +3,20 @@
 Provides email sending functionality for:
 - Email verification during registration
 - Password reset requests
+
+Emails are rendered from compiled templates in the request and queued
+in the email outbox.
 """
 from django.conf import settings
-from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
 from django.contrib.sites.shortcuts import get_current_site
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
 
+from core.emails import render_email
+from core.outbox import queue_email
+
 
 # ===== Email Verification =====
 
@@ -25,17 +28,13 @@ def send_verification_email(request, user):
         user: CustomUser instance to send verification to
         
     Returns:
-        bool: True if email sent successfully, False otherwise
+        bool: True if email was queued successfully, False otherwise
     """
     try:
         # Ensure user is saved
         if not user.pk:
             user.save()
         
-        # Get fresh user from database
-        User = get_user_model()
-        user = User.objects.get(pk=user.pk)
-        
         # Generate token
         token = default_token_generator.make_token(user)
         uid = urlsafe_base64_encode(force_bytes(user.pk))
@@ -51,20 +50,12 @@ def send_verification_email(request, user):
         
         # Send email
         subject = "Email confirmation - Bricky"
-        message = render_to_string("users/email/verify.html", {
-            "user": user,
+        text, message = render_email("users/email/verify.html", {
             "verify_url": verify_url,
             "domain": domain,
         })
 
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=None,
-            recipient_list=[user.email],
-            html_message=message,
-            fail_silently=False
-        )
+        queue_email(subject, text, [user.email], html_message=message)
         
         return True
         
@@ -84,7 +75,7 @@ def send_password_reset_email(request, user):
         user: CustomUser instance to send reset link to
         
     Returns:
-        bool: True if email sent successfully, False otherwise
+        bool: True if email was queued successfully, False otherwise
     """
     try:
         # Generate token
@@ -102,20 +93,13 @@ def send_password_reset_email(request, user):
         
         # Send email
         subject = "Password Reset - Bricky"
-        message = render_to_string("users/email/password_reset.html", {
-            "user": user,
+        text, message = render_email("users/email/password_reset.html", {
+            "name": user.first_name or user.username,
             "reset_url": reset_url,
             "domain": domain,
         })
         
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=None,
-            recipient_list=[user.email],
-            html_message=message,
-            fail_silently=False
-        )
+        queue_email(subject, text, [user.email], html_message=message)
         
         return True
         
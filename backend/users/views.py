@@ -18,7 +18,8 @@ from users.forms import (
 )
 from users.models import CustomUser
 from users.utils import send_verification_email, send_password_reset_email
-from orders.models import Order
+from orders.guest_cart import GuestCart
+from orders.utils import order_history
 from notifications.models import NewsletterSubscription
 
 
@@ -28,7 +29,7 @@ class LoginView(TemplateView):
     """Handle user login.
     
     GET: Display login form
-    POST: Authenticate user and redirect to home
+    POST: Authenticate user, merge guest cart and redirect to home
     """
     template_name = 'users/auth/login.html'
 
@@ -45,7 +46,11 @@ class LoginView(TemplateView):
             user = authenticate(username=username, password=password)
             if user:
                 login(request, user)
-                return redirect('store:index')
+                response = redirect('store:index')
+                guest_cart = GuestCart(request)
+                guest_cart.merge_into(user)
+                guest_cart.save(response)
+                return response
         return self.get(request, *args, **kwargs)
 
 
@@ -53,7 +58,7 @@ class RegisterView(TemplateView):
     """Handle user registration.
     
     GET: Display registration form
-    POST: Create new user account and send verification email
+    POST: Create new user account, merge guest cart and send verification email
     """
     template_name = 'users/auth/register.html'
 
@@ -74,7 +79,11 @@ class RegisterView(TemplateView):
             login(request, user)
             send_verification_email(request, user)
             
-            return redirect('store:index')
+            response = redirect('store:index')
+            guest_cart = GuestCart(request)
+            guest_cart.merge_into(user)
+            guest_cart.save(response)
+            return response
         
         context = self.get_context_data(**kwargs)
         context['form'] = form
@@ -110,10 +119,7 @@ class ProfileView(LoginRequiredMixin, TemplateView):
         # Get recent orders
         try:
             customer = user.customer
-            context['orders'] = Order.objects.filter(
-                customer=customer,
-                is_draft=False
-            ).order_by('-registered_at')[:5]
+            context['orders'], _ = order_history(customer, limit=5)
         except:
             context['orders'] = []
         